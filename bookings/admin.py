@@ -1,9 +1,10 @@
 from django.contrib import admin
-from .models import CustomUser, Occasion, SeatingType, Booking, Payment, TimeSlot, Table
+from .models import CustomUser, Occasion, SeatingType, Booking, BookingTable, Payment, TimeSlot, Table, Task, WaitlistEntry
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
 from .models import CustomUser
+from .assignment import plan_table_assignments, apply_table_assignment_plan
 
 class CustomUserAdmin(BaseUserAdmin):
     ordering = ['email']
@@ -24,10 +25,67 @@ class CustomUserAdmin(BaseUserAdmin):
         }),
     )
 
+@admin.action(description="Optimize table assignments for the selected bookings' days")
+def optimize_table_assignments(modeladmin, request, queryset):
+    days = sorted({booking_datetime.date() for booking_datetime in queryset.values_list('booking_datetime', flat=True)})
+    for day in days:
+        plan = plan_table_assignments(day)
+        moved = apply_table_assignment_plan(plan)
+        modeladmin.message_user(
+            request,
+            f"{day}: moved {moved} bookings, {plan.seated_covers} covers seated"
+            + (f", {len(plan.unseated)} bookings could not be seated" if plan.unseated else "")
+        )
+
+class BookingTableInline(admin.TabularInline):
+    model = BookingTable
+    extra = 0
+    raw_id_fields = ('table',)
+
+class BookingAdmin(admin.ModelAdmin):
+    actions = [optimize_table_assignments]
+    inlines = [BookingTableInline]
+    # Booking.__str__ reads the user
+    list_select_related = ('user',)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        # The table choices render Table.__str__, which reads the seating type
+        if db_field.name == 'table':
+            kwargs['queryset'] = Table.objects.select_related('seating_type')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+class TableAdmin(admin.ModelAdmin):
+    # Table.__str__ reads the seating type
+    list_select_related = ('seating_type',)
+    filter_horizontal = ('adjacent_tables',)
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        # The adjacent table choices render Table.__str__, which reads the seating type
+        if db_field.name == 'adjacent_tables':
+            kwargs['queryset'] = Table.objects.select_related('seating_type')
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
+
+class PaymentAdmin(admin.ModelAdmin):
+    # A booking dropdown would render Booking.__str__, and load the user, once per booking
+    raw_id_fields = ('booking',)
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'run_after', 'locked_by')
+    list_filter = ('status', 'name')
+    readonly_fields = ('created_at', 'updated_at')
+
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'number_of_guests', 'booking_datetime', 'seating_type', 'status', 'created_at')
+    list_filter = ('status', 'seating_type')
+    list_select_related = ('user', 'seating_type')
+    raw_id_fields = ('user', 'booking')
+
 admin.site.register(CustomUser, CustomUserAdmin)
 admin.site.register(Occasion)
 admin.site.register(SeatingType)
-admin.site.register(Booking)
-admin.site.register(Payment)
+admin.site.register(Booking, BookingAdmin)
+admin.site.register(Payment, PaymentAdmin)
 admin.site.register(TimeSlot)
-admin.site.register(Table)
\ No newline at end of file
+admin.site.register(Table, TableAdmin)
+admin.site.register(Task, TaskAdmin)
+admin.site.register(WaitlistEntry, WaitlistEntryAdmin)
\ No newline at end of file
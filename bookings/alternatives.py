@@ -0,0 +1,163 @@
+# bookings/alternatives.py
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from .availability import TableIntervals, availability_index, held_table_intervals
+from .combinations import table_combination_cache
+from .models import SeatingType, Table, TimeSlot
+from .slots import time_slot_cache
+import logging
+logger = logging.getLogger(__name__)
+
+# Distance between neighbouring candidate start times when searching outward from a request.
+ALTERNATIVE_TIME_STEP = getattr(settings, 'ALTERNATIVE_TIME_STEP', timedelta(minutes=30))
+
+# Added to an option's distance when it uses another seating type than the one requested, so a
+# different seating type only wins over a time shift of more than this.
+ALTERNATIVE_SEATING_TYPE_PENALTY = getattr(settings, 'ALTERNATIVE_SEATING_TYPE_PENALTY', timedelta(minutes=90))
+
+# Defaults and upper bounds of the search, keeping the pre-fetched booking window small.
+DEFAULT_ALTERNATIVES = 5
+MAX_ALTERNATIVES = 20
+DEFAULT_ALTERNATIVE_STEPS = 4
+MAX_ALTERNATIVE_STEPS = 12
+DEFAULT_ALTERNATIVE_DAYS = 1
+MAX_ALTERNATIVE_DAYS = 7
+
+
+def suggest_alternatives(booking_datetime, number_of_guests, seating_type_id, max_results=DEFAULT_ALTERNATIVES,
+                         slot_steps=DEFAULT_ALTERNATIVE_STEPS, day_range=DEFAULT_ALTERNATIVE_DAYS, now=None):
+    """
+    Find the bookable options closest to a request, in time and seating type.
+
+    Args:
+        booking_datetime (datetime): The requested start time.
+        number_of_guests (int): The number of guests that need seating.
+        seating_type_id (int): The requested SeatingType.
+        max_results (int): Number of options to return, at most MAX_ALTERNATIVES.
+        slot_steps (int): Candidate start times tried on each side of the requested time, in
+                          ALTERNATIVE_TIME_STEP increments, at most MAX_ALTERNATIVE_STEPS.
+        day_range (int): Adjacent days tried on each side of the requested day, at most
+                         MAX_ALTERNATIVE_DAYS.
+        now (datetime, optional): Options before this time are skipped. Defaults to timezone.now().
+
+    Returns:
+        list[dict]: Up to `max_results` options, closest first, each with booking_datetime,
+                    seating_type_id, seating_type, table_id, capacity and distance_minutes.
+                    Options on a combination of adjacent tables also carry table_ids, the
+                    largest table first, and their total capacity.
+
+    Behavior:
+    - Candidates are every start time `booking_datetime + days + steps * ALTERNATIVE_TIME_STEP`
+      inside a time slot and not in the past, for the requested seating type and every other
+      active seating type that is compatible (accessible if the requested one is).
+    - Candidates are ranked by their distance from the request, plus
+      ALTERNATIVE_SEATING_TYPE_PENALTY for another seating type, and checked in that order
+      until `max_results` are found. Each option is the best-fit free table of its candidate or,
+      when no single table is free, its smallest free combination of adjacent tables, as
+      allocate_booking would seat the party.
+    - Bookings of the whole search window come from the in-memory availability index when it is
+      loaded and covers the window, otherwise from a single query, so the search runs a constant
+      number of queries however many candidates it checks.
+    """
+    now = now or timezone.now()
+    max_results = min(max_results, MAX_ALTERNATIVES)
+    slot_steps = min(slot_steps, MAX_ALTERNATIVE_STEPS)
+    day_range = min(day_range, MAX_ALTERNATIVE_DAYS)
+
+    seating_types = {
+        seating_type['id']: seating_type
+        for seating_type in SeatingType.objects.filter(is_active=True).values('id', 'name', 'is_accessible')
+    }
+    requested = seating_types.get(seating_type_id)
+    if requested is None:
+        return []
+    compatible_ids = [
+        type_id for type_id, seating_type in seating_types.items()
+        if seating_type['is_accessible'] or not requested['is_accessible']
+    ]
+
+    slot_table = time_slot_cache.get_table()
+    candidates = []
+    for day in range(-day_range, day_range + 1):
+        for step in range(-slot_steps, slot_steps + 1):
+            start = booking_datetime + timedelta(days=day) + step * ALTERNATIVE_TIME_STEP
+            if start < now or not slot_table.lookup(start.time(), limit=1):
+                continue
+            distance = abs(start - booking_datetime)
+            for type_id in compatible_ids:
+                score = distance if type_id == seating_type_id else distance + ALTERNATIVE_SEATING_TYPE_PENALTY
+                candidates.append((score, start, type_id))
+    if not candidates:
+        return []
+    candidates.sort()
+
+    tables_by_type = {}
+    for table in Table.objects.filter(
+        seating_type_id__in=compatible_ids,
+        capacity__gte=number_of_guests,
+        is_active=True
+    ).order_by('capacity', 'table_number').values('id', 'capacity', 'seating_type_id'):
+        tables_by_type.setdefault(table['seating_type_id'], []).append(table)
+    combinations = table_combination_cache.get()
+    combinations_by_type = {
+        type_id: list(combinations.candidates(type_id, number_of_guests)) for type_id in compatible_ids
+    }
+    table_ids = {table['id'] for tables in tables_by_type.values() for table in tables}
+    for candidates_of_type in combinations_by_type.values():
+        for ids in candidates_of_type:
+            table_ids.update(ids)
+
+    window_start = min(start for _, start, _ in candidates)
+    window_end = max(start + TimeSlot.get_booking_duration(start, slot_table) for _, start, _ in candidates)
+    is_table_free = _window_checker(window_start, window_end, table_ids)
+
+    alternatives = []
+    for score, start, type_id in candidates:
+        end = start + TimeSlot.get_booking_duration(start, slot_table)
+        option = {
+            'booking_datetime': start,
+            'seating_type_id': type_id,
+            'seating_type': seating_types[type_id]['name'],
+            'distance_minutes': int(abs(start - booking_datetime).total_seconds() // 60),
+        }
+        table = next((table for table in tables_by_type.get(type_id, ()) if is_table_free(table['id'], start, end)), None)
+        if table is not None:
+            option.update(table_id=table['id'], capacity=table['capacity'])
+        else:
+            combination = next(
+                (ids for ids in combinations_by_type[type_id] if all(is_table_free(table_id, start, end) for table_id in ids)),
+                None
+            )
+            if combination is None:
+                continue
+            option.update(
+                table_id=combination[0],
+                capacity=sum(combinations.tables[table_id].capacity for table_id in combination),
+                table_ids=list(combination),
+            )
+        alternatives.append(option)
+        if len(alternatives) == max_results:
+            break
+
+    logger.debug(f"Checked {len(candidates)} alternative candidates, found {len(alternatives)}")
+    return alternatives
+
+
+def _window_checker(window_start, window_end, table_ids):
+    """
+    Return an is_table_free(table_id, start, end) callable for checks of `table_ids` inside
+    [window_start, window_end).
+    """
+    if availability_index.is_current_for(window_start, window_end):
+        return availability_index.is_table_free
+
+    intervals = {}
+    for booking_id, table_id, start, end in held_table_intervals(window_start, window_end, table_ids=list(table_ids)):
+        intervals.setdefault(table_id, TableIntervals()).add(booking_id, start, end)
+
+    def is_table_free(table_id, start, end):
+        table_intervals = intervals.get(table_id)
+        return table_intervals is None or table_intervals.is_free(start, end)
+
+    return is_table_free
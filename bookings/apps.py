@@ -3,3 +3,9 @@ from django.apps import AppConfig
 class BookingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bookings'
+
+    def ready(self):
+        # Register signal handlers
+        from . import signals  # noqa: F401
+        # Register background task handlers
+        from . import tasks  # noqa: F401
@@ -0,0 +1,314 @@
+# bookings/assignment.py
+from datetime import datetime, time, timedelta
+from django.db import transaction
+from .models import Booking, BookingStatus, BookingTable, Table
+from .availability import RELEASED_BOOKING_STATUSES, TableIntervals, held_table_intervals
+import logging
+logger = logging.getLogger(__name__)
+
+# Only bookings in these states are reassigned; all other bookings keep their table.
+REASSIGNABLE_STATUSES = (BookingStatus.PENDING, BookingStatus.CONFIRMED)
+
+# Booking ID used in the schedule for intervals that cannot move (booking IDs start at 1).
+FIXED_BLOCKER_ID = 0
+
+
+class TableAssignmentPlan:
+    """
+    Result of a table assignment run.
+
+    Attributes:
+        assignments (dict): booking_id -> table_id for every booking the plan seats.
+        unseated (list): IDs of bookings the plan could not seat without a conflict.
+        moves (list): (booking_id, old_table_id, new_table_id) for bookings that change table.
+        seated_covers (int): Guests seated by the plan.
+        current_seated_covers (int): Guests seated conflict-free by the current assignment.
+    """
+
+    def __init__(self, assignments, unseated, moves, seated_covers, current_seated_covers):
+        self.assignments = assignments
+        self.unseated = unseated
+        self.moves = moves
+        self.seated_covers = seated_covers
+        self.current_seated_covers = current_seated_covers
+
+
+def solve_table_assignment(bookings, tables, blockers=()):
+    """
+    Assign bookings to tables so that as many guests as possible are seated.
+
+    Args:
+        bookings (list[dict]): Bookings to place, each with id, start, end, guests,
+                               seating_type_id and table_id (the current table).
+        tables (list[dict]): Available tables, each with id, capacity, seating_type_id and table_number.
+        blockers (iterable): (table_id, start, end) intervals that are already taken and cannot move.
+
+    Returns:
+        tuple: (assignments dict booking_id -> table_id, list of unseated booking IDs)
+
+    Behavior:
+    - Works on interval scheduling with capacities: a booking fits a table of its seating type with
+      enough capacity that is free for the booking's whole interval.
+    - Places the largest parties first, since they have the fewest options and carry the most covers,
+      each on the smallest fitting free table (best fit). Among equal tables it keeps the current table,
+      so the plan moves as few bookings as possible.
+    - When a booking does not fit anywhere, tries an augmenting move: pick a table, and move every
+      booking overlapping it to another free table. If that succeeds the booking is seated there.
+    - The result is a heuristic, not a guaranteed optimum: an optimal layout of intervals on tables
+      of different capacities is NP-hard in general, and a greedy pass with one augmenting step per
+      booking can miss layouts that need longer chains of moves. It stays within a few milliseconds
+      for hundreds of bookings and tables.
+    """
+    tables_by_type = {}
+    for table in sorted(tables, key=lambda t: (t['capacity'], t['table_number'])):
+        tables_by_type.setdefault(table['seating_type_id'], []).append(table)
+
+    schedule = {table['id']: TableIntervals() for table in tables}
+    for table_id, start, end in blockers:
+        if table_id in schedule:
+            schedule[table_id].add(FIXED_BLOCKER_ID, start, end)
+
+    # Bookings placed on each table, used to find who has to move for an augmenting step.
+    placed = {table['id']: [] for table in tables}
+    assignments = {}
+    unseated = []
+
+    def fits(booking, table):
+        return table['capacity'] >= booking['guests'] and schedule[table['id']].is_free(booking['start'], booking['end'])
+
+    def place(booking, table):
+        schedule[table['id']].add(booking['id'], booking['start'], booking['end'])
+        placed[table['id']].append(booking)
+        assignments[booking['id']] = table['id']
+
+    def unplace(booking):
+        table_id = assignments.pop(booking['id'])
+        schedule[table_id].remove(booking['id'], booking['start'])
+        placed[table_id].remove(booking)
+
+    def candidates(booking):
+        return sorted(
+            (t for t in tables_by_type.get(booking['seating_type_id'], []) if t['capacity'] >= booking['guests']),
+            key=lambda t: (t['capacity'], t['id'] != booking['table_id'], t['table_number'])
+        )
+
+    def augment(booking):
+        for table in candidates(booking):
+            blocking = [
+                other for other in placed[table['id']]
+                if other['start'] < booking['end'] and other['end'] > booking['start']
+            ]
+            # Free tables were already tried; skip tables held by a fixed blocker.
+            if not blocking or _blocked_by_fixed(schedule[table['id']], booking):
+                continue
+
+            for other in blocking:
+                unplace(other)
+            place(booking, table)
+
+            moved = []
+            for other in blocking:
+                target = next((t for t in candidates(other) if fits(other, t)), None)
+                if target is None:
+                    break
+                place(other, target)
+                moved.append(other)
+            else:
+                return True
+
+            # Roll back this attempt.
+            for other in moved:
+                unplace(other)
+            unplace(booking)
+            for other in blocking:
+                place(other, table)
+        return False
+
+    for booking in sorted(bookings, key=lambda b: (-b['guests'], b['start'], b['id'])):
+        table = next((t for t in candidates(booking) if fits(booking, t)), None)
+        if table is not None:
+            place(booking, table)
+        elif not augment(booking):
+            unseated.append(booking['id'])
+
+    return assignments, unseated
+
+
+def _blocked_by_fixed(intervals, booking):
+    """
+    Return True if a fixed blocker overlaps the booking on this table.
+    """
+    return any(
+        booking_id == FIXED_BLOCKER_ID and start < booking['end'] and end > booking['start']
+        for start, booking_id, end in intervals.entries
+    )
+
+
+def _current_seated_covers(bookings, tables):
+    """
+    Count guests whose current table fits them and is not double booked.
+    """
+    capacities = {table['id']: table['capacity'] for table in tables}
+    by_table = {}
+    for booking in bookings:
+        by_table.setdefault(booking['table_id'], []).append(booking)
+
+    covers = 0
+    for table_id, table_bookings in by_table.items():
+        for booking in table_bookings:
+            clash = any(
+                other is not booking and other['start'] < booking['end'] and other['end'] > booking['start']
+                for other in table_bookings
+            )
+            if not clash and capacities.get(table_id, 0) >= booking['guests']:
+                covers += booking['guests']
+    return covers
+
+
+def plan_table_assignments(day, booking_ids=None):
+    """
+    Build a table assignment plan for all reassignable bookings starting on `day`.
+
+    Args:
+        day (date): The day to optimize.
+        booking_ids (iterable, optional): Restrict the run to these bookings; other bookings of the
+                                          day stay where they are and act as fixed blockers.
+
+    Returns:
+        TableAssignmentPlan
+
+    Notes:
+        - Runs four queries: active tables, the additional tables of combined bookings, the day's
+          bookings and bookings from neighbouring days that overlap it.
+        - A booking keeps the seating type of its current table. Combined bookings keep all of
+          their tables and block them for the others.
+        - Cancelled and expired bookings are ignored; they no longer hold a table.
+    """
+    day_start = datetime.combine(day, time.min)
+    day_end = day_start + timedelta(days=1)
+    if booking_ids is not None:
+        booking_ids = set(booking_ids)
+
+    tables = list(
+        Table.objects.filter(is_active=True).values('id', 'capacity', 'seating_type_id', 'table_number')
+    )
+
+    rows = Booking.objects.filter(
+        booking_datetime__gte=day_start,
+        booking_datetime__lt=day_end,
+    ).exclude(status__in=RELEASED_BOOKING_STATUSES).values('id', 'booking_datetime', 'booking_end_datetime', 'number_of_guests', 'table_id', 'table__seating_type_id', 'status')
+
+    blockers = []
+    combined_ids = set()
+    for booking_id, table_id, start, end in BookingTable.objects.filter(
+        booking__booking_datetime__lt=day_end,
+        booking__booking_end_datetime__gt=day_start,
+    ).exclude(booking__status__in=RELEASED_BOOKING_STATUSES).values_list(
+        'booking_id', 'table_id', 'booking__booking_datetime', 'booking__booking_end_datetime'
+    ):
+        blockers.append((table_id, start, end))
+        combined_ids.add(booking_id)
+
+    movable = []
+    for row in rows:
+        if (
+            row['status'] in REASSIGNABLE_STATUSES
+            and row['id'] not in combined_ids
+            and (booking_ids is None or row['id'] in booking_ids)
+        ):
+            movable.append({
+                'id': row['id'],
+                'start': row['booking_datetime'],
+                'end': row['booking_end_datetime'],
+                'guests': row['number_of_guests'],
+                'seating_type_id': row['table__seating_type_id'],
+                'table_id': row['table_id'],
+            })
+        else:
+            blockers.append((row['table_id'], row['booking_datetime'], row['booking_end_datetime']))
+
+    blockers.extend(
+        Booking.objects.filter(
+            booking_datetime__lt=day_end,
+            booking_end_datetime__gt=day_start,
+        ).exclude(
+            booking_datetime__gte=day_start,
+            booking_datetime__lt=day_end,
+        ).exclude(status__in=RELEASED_BOOKING_STATUSES).values_list('table_id', 'booking_datetime', 'booking_end_datetime')
+    )
+
+    assignments, unseated = solve_table_assignment(movable, tables, blockers)
+    moves = [
+        (booking['id'], booking['table_id'], assignments[booking['id']])
+        for booking in movable
+        if booking['id'] in assignments and assignments[booking['id']] != booking['table_id']
+    ]
+    seated_covers = sum(booking['guests'] for booking in movable if booking['id'] in assignments)
+
+    return TableAssignmentPlan(
+        assignments=assignments,
+        unseated=unseated,
+        moves=moves,
+        seated_covers=seated_covers,
+        current_seated_covers=_current_seated_covers(movable, tables),
+    )
+
+
+def apply_table_assignment_plan(plan):
+    """
+    Save the table changes of a plan in one transaction.
+
+    Plans that would seat fewer guests than the current assignment are not applied.
+    Bookings the plan could not seat keep their current table and are left for staff to resolve.
+
+    Returns:
+        int: Number of bookings moved; 0 if the plan was not applied.
+
+    Behavior:
+    - Follows the locking protocol of allocate_booking: locks the destination table rows in
+      primary key order, then the moved bookings, so it cannot race a concurrent allocation
+      onto the same tables.
+    - Re-validates every move under those locks against the bookings now holding the
+      destination tables. If a moved booking changed since planning, or any move would now
+      overlap another booking, nothing is saved.
+    """
+    if plan.seated_covers < plan.current_seated_covers or not plan.moves:
+        return 0
+
+    moved_ids = [booking_id for booking_id, _, _ in plan.moves]
+    destination_ids = sorted({new_table_id for _, _, new_table_id in plan.moves})
+    with transaction.atomic():
+        list(Table.objects.select_for_update().filter(pk__in=destination_ids).order_by('pk').values_list('pk'))
+        bookings = Booking.objects.select_for_update().in_bulk(moved_ids)
+
+        for booking_id, old_table_id, _ in plan.moves:
+            booking = bookings.get(booking_id)
+            if booking is None or booking.table_id != old_table_id or booking.status not in REASSIGNABLE_STATUSES:
+                logger.warning(f"Table assignment plan not applied: booking {booking_id} changed since planning")
+                return 0
+
+        # Everything else now holding the destination tables, with the moved bookings taken off
+        schedule = {table_id: TableIntervals() for table_id in destination_ids}
+        for booking_id, table_id, start, end in held_table_intervals(
+            min(booking.booking_datetime for booking in bookings.values()),
+            max(booking.booking_end_datetime for booking in bookings.values()),
+            table_ids=destination_ids,
+        ):
+            if booking_id not in bookings:
+                schedule[table_id].add(booking_id, start, end)
+
+        for booking_id, _, new_table_id in plan.moves:
+            booking = bookings[booking_id]
+            if not schedule[new_table_id].is_free(booking.booking_datetime, booking.booking_end_datetime):
+                logger.warning(f"Table assignment plan not applied: table {new_table_id} is no longer free for booking {booking_id}")
+                return 0
+            schedule[new_table_id].add(booking_id, booking.booking_datetime, booking.booking_end_datetime)
+
+        for booking_id, _, new_table_id in plan.moves:
+            booking = bookings[booking_id]
+            booking.table_id = new_table_id
+            # save() (not bulk_update) so signals keep the availability index current
+            booking.save(update_fields=['table', 'updated_at'])
+
+    logger.info(f"Applied table assignment plan: {len(plan.moves)} bookings moved")
+    return len(plan.moves)
@@ -0,0 +1,155 @@
+# bookings/async_views.py
+"""
+Async-native versions of the availability and price endpoints, for ASGI deployments
+(e.g. `uvicorn littlelemon.asgi:application`).
+
+DRF views are synchronous, so these are plain Django async views that speak the same JSON as
+their DRF counterparts in views.py. While a request waits on the database the worker serves
+other requests instead of blocking a thread. Authentication uses the JWT claims only (see
+StatelessJWTAuthentication), so a valid token costs no user query. DRF throttling does not
+apply to these views.
+"""
+import json
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.utils.encoders import JSONEncoder
+from .alternatives import suggest_alternatives
+from .authentication import StatelessJWTAuthentication
+from .availability import afind_available_table, find_table_combination
+from .models import SeatingType
+from .pricing import acalculate_booking_price
+import logging
+logger = logging.getLogger(__name__)
+
+
+def _json_response(data, status=200):
+    return JsonResponse(data, status=status, encoder=JSONEncoder, safe=False)
+
+
+async def _authenticate(request):
+    """
+    Return None if the request carries a valid access token, otherwise the error response.
+
+    Tokens issued before the role claims existed are checked against the database.
+    """
+    authentication = StatelessJWTAuthentication()
+    try:
+        header = authentication.get_header(request)
+        raw_token = authentication.get_raw_token(header) if header is not None else None
+        if raw_token is None:
+            return _json_response({"detail": "Authentication credentials were not provided."}, status=401)
+        validated_token = authentication.get_validated_token(raw_token)
+        if not authentication.has_user_claims(validated_token):
+            # JWTAuthentication.get_user loads the user and rejects inactive ones.
+            await sync_to_async(authentication.get_user)(validated_token)
+    except APIException as e:
+        return _json_response({"detail": e.detail}, status=e.status_code)
+    return None
+
+
+def _request_data(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+@csrf_exempt
+@require_POST
+async def check_availability(request):
+    """
+    Async version of views.check_availability.
+
+    Request body (JSON):
+        - seating_type_id, number_of_guests, booking_datetime (ISO 8601).
+    """
+    error = await _authenticate(request)
+    if error is not None:
+        return error
+
+    data = _request_data(request)
+    if data is None:
+        return _json_response({"detail": "Request body must be a JSON object."}, status=400)
+
+    seating_type_id = data.get('seating_type_id')
+    number_of_guests = data.get('number_of_guests')
+    booking_datetime = data.get('booking_datetime')
+
+    if not booking_datetime or not number_of_guests or not seating_type_id:
+        return _json_response({"detail": "Missing required fields."}, status=400)
+
+    booking_datetime = parse_datetime(booking_datetime)
+    if booking_datetime is None:
+        return _json_response({"detail": "Invalid date format."}, status=400)
+
+    try:
+        available_table = await afind_available_table(booking_datetime, number_of_guests, seating_type_id)
+    except Exception as e:
+        logger.exception("Async availability check failed")
+        return _json_response({"detail": str(e)}, status=500)
+
+    if available_table:
+        return _json_response({
+            "available": True,
+            "table_id": available_table.id,
+            "capacity": available_table.capacity,
+        })
+    try:
+        combination = await sync_to_async(find_table_combination)(booking_datetime, int(number_of_guests), int(seating_type_id))
+        if combination:
+            return _json_response({
+                "available": True,
+                "table_id": combination[0].id,
+                "capacity": sum(table.capacity for table in combination),
+                "table_ids": [table.id for table in combination],
+            })
+        alternatives = await sync_to_async(suggest_alternatives)(booking_datetime, int(number_of_guests), int(seating_type_id))
+    except Exception as e:
+        logger.exception("Async alternatives search failed")
+        return _json_response({"detail": str(e)}, status=500)
+    return _json_response({
+        "available": False,
+        "detail": "No available table for the selected time and criteria.",
+        "alternatives": alternatives,
+    })
+
+
+@csrf_exempt
+@require_POST
+async def get_total_price(request):
+    """
+    Async version of views.get_total_price.
+
+    Request body (JSON):
+        - number_of_guests, booking_datetime (ISO 8601), seating_type_id.
+
+    The seating type and the time slot are resolved concurrently.
+    """
+    error = await _authenticate(request)
+    if error is not None:
+        return error
+
+    data = _request_data(request)
+    if data is None:
+        return _json_response({"detail": "Request body must be a JSON object."}, status=400)
+
+    try:
+        number_of_guests = int(data.get('number_of_guests'))
+        booking_datetime = parse_datetime(data.get('booking_datetime') or '')
+        seating_type_id = data.get('seating_type_id')
+        if not (number_of_guests and booking_datetime and seating_type_id):
+            raise ValidationError("Missing required fields.")
+        total, _, _ = await acalculate_booking_price(number_of_guests, booking_datetime, seating_type_id)
+    except SeatingType.DoesNotExist:
+        return _json_response(["Invalid seating type."], status=400)
+    except ValidationError as e:
+        return _json_response(e.detail, status=400)
+    except (TypeError, ValueError) as e:
+        return _json_response([str(e)], status=400)
+
+    return _json_response({"total_price": total})
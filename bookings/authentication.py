@@ -0,0 +1,96 @@
+# bookings/authentication.py
+from django.utils.functional import LazyObject
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from .models import CustomUser
+
+# Claims MyTokenObtainPairSerializer adds that the stateless path needs. Tokens issued before
+# these claims existed fall back to the regular database lookup.
+STATELESS_USER_CLAIMS = ('is_staff', 'is_superuser', 'is_manager')
+
+
+class TokenClaimsUser(LazyObject):
+    """
+    Request user built from JWT claims, backed by a lazily loaded CustomUser.
+
+    id/pk, email, is_staff, is_superuser and is_manager are answered from the token, so views
+    that only need those run no user query. Any other attribute (names, groups, assignment to
+    a foreign key, ...) loads the CustomUser on first use and delegates to it.
+
+    Claims reflect the user when the token was issued: role or activation changes take
+    effect when the client gets a new access token.
+    """
+
+    def __init__(self, token):
+        super().__init__()
+        self.__dict__['_token'] = token
+
+    def _setup(self):
+        try:
+            self._wrapped = CustomUser.objects.get(**{api_settings.USER_ID_FIELD: self.pk})
+        except CustomUser.DoesNotExist as e:
+            raise AuthenticationFailed("User not found", code="user_not_found") from e
+
+    @property
+    def pk(self):
+        return CustomUser._meta.pk.to_python(self._token[api_settings.USER_ID_CLAIM])
+
+    id = pk
+
+    @property
+    def email(self):
+        return self._token.get('email')
+
+    @property
+    def is_staff(self):
+        return self._token['is_staff']
+
+    @property
+    def is_superuser(self):
+        return self._token['is_superuser']
+
+    @property
+    def is_manager(self):
+        return self._token['is_manager']
+
+    @property
+    def is_active(self):
+        return True
+
+    @property
+    def is_authenticated(self):
+        return True
+
+    @property
+    def is_anonymous(self):
+        return False
+
+    def __bool__(self):
+        # Permission checks test `request.user and ...`; answer without loading the user.
+        return True
+
+    def __str__(self):
+        return self.email or str(self.pk)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that skips the per-request CustomUser query.
+
+    Returns a TokenClaimsUser when the token carries STATELESS_USER_CLAIMS, otherwise behaves
+    like JWTAuthentication. Because the user is not read, inactive or deleted users keep access
+    until their access token expires (the deleted case fails as soon as the user is loaded).
+
+    Enable it with JWT_AUTHENTICATION_CLASS=bookings.authentication.StatelessJWTAuthentication.
+    """
+
+    @staticmethod
+    def has_user_claims(validated_token):
+        """Return True if the token carries every claim TokenClaimsUser needs."""
+        return all(claim in validated_token for claim in (api_settings.USER_ID_CLAIM, *STATELESS_USER_CLAIMS))
+
+    def get_user(self, validated_token):
+        if not self.has_user_claims(validated_token):
+            return super().get_user(validated_token)
+        return TokenClaimsUser(validated_token)
@@ -1,11 +1,220 @@
 # bookings/availability.py
-from datetime import timedelta
-from django.db.models import F, ExpressionWrapper, Q, DateTimeField
-from .models import Booking, Table
+import asyncio
+import bisect
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import OperationalError, transaction
+from django.utils import timezone
+from .models import Booking, BookingStatus, BookingTable, Table, TimeSlot
+from .slots import get_time_slots, time_slot_cache
+from .combinations import table_combination_cache
 import logging
 logger = logging.getLogger(__name__)
 
-DEFAULT_BOOKING_DURATION = timedelta(hours=2)
+DEFAULT_BOOKING_DURATION = getattr(settings, 'BOOKING_DURATION', timedelta(hours=2))
+
+# Bookings in these states no longer hold their table, so availability checks ignore them.
+RELEASED_BOOKING_STATUSES = (BookingStatus.CANCELLED, BookingStatus.EXPIRED)
+
+# How far ahead of "now" the in-memory index keeps bookings. Requests beyond
+# the horizon fall back to a database query.
+AVAILABILITY_INDEX_HORIZON = timedelta(days=60)
+
+# How far back the index loads bookings, so that bookings which started
+# shortly before "now" still block their table.
+AVAILABILITY_INDEX_LOOKBACK = timedelta(days=1)
+
+# Longest date range, in days, that build_availability_grid accepts.
+MAX_GRID_DAYS = 31
+
+# Seconds after which the index is rebuilt from the database. Signals keep the
+# index current within this process; the rebuild picks up writes made by other
+# worker processes.
+AVAILABILITY_INDEX_TTL = 300
+
+
+class TableIntervals:
+    """
+    Sorted list of booking intervals for a single table.
+
+    Entries are stored as (start, booking_id, end) tuples ordered by start time,
+    so inserts, removals and overlap checks use binary search.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.max_duration = timedelta(0)
+
+    def add(self, booking_id, start, end):
+        bisect.insort(self.entries, (start, booking_id, end))
+        self.max_duration = max(self.max_duration, end - start)
+
+    def remove(self, booking_id, start):
+        i = bisect.bisect_left(self.entries, (start, booking_id))
+        if i < len(self.entries) and self.entries[i][:2] == (start, booking_id):
+            del self.entries[i]
+
+    def is_free(self, start, end, exclude_booking_id=None):
+        """
+        Return True if no stored interval overlaps [start, end).
+
+        Only entries starting before `end` and after `start - max_duration`
+        can overlap, so the scan is bounded to that slice of the list.
+        """
+        i = bisect.bisect_left(self.entries, (end,))
+        earliest_start = start - self.max_duration
+        while i > 0:
+            i -= 1
+            entry_start, booking_id, entry_end = self.entries[i]
+            if entry_start <= earliest_start:
+                break
+            if entry_end > start and booking_id != exclude_booking_id:
+                return False
+        return True
+
+
+class AvailabilityIndex:
+    """
+    Process-local index of booking intervals per table for a rolling horizon.
+
+    The index is loaded lazily on first use and rebuilt every
+    AVAILABILITY_INDEX_TTL seconds. Booking post_save/post_delete signals keep
+    it up to date in between, once their transaction commits (see bookings/signals.py).
+    """
+
+    def __init__(self, horizon=AVAILABILITY_INDEX_HORIZON, lookback=AVAILABILITY_INDEX_LOOKBACK, ttl=AVAILABILITY_INDEX_TTL):
+        self.horizon = horizon
+        self.lookback = lookback
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        """Drop all loaded data; the next lookup reloads from the database."""
+        with self._lock:
+            self._tables = {}
+            self._bookings = {}
+            self._combined = set()
+            self._window_start = None
+            self._loaded_from = None
+            self._loaded_until = None
+            self._loaded_at = None
+
+    def load(self):
+        """Load all bookings inside the rolling window from the database."""
+        now = timezone.now()
+        window_start = now - self.lookback
+        loaded_until = now + self.horizon
+
+        tables = {}
+        bookings = {}
+        for booking_id, table_id, start, end in held_table_intervals(window_start, loaded_until).iterator():
+            tables.setdefault(table_id, TableIntervals()).add(booking_id, start, end)
+            bookings.setdefault(booking_id, (start, end, []))[2].append(table_id)
+
+        with self._lock:
+            self._tables = tables
+            self._bookings = bookings
+            self._combined = {booking_id for booking_id, (_, _, table_ids) in bookings.items() if len(table_ids) > 1}
+            self._window_start = window_start
+            self._loaded_from = now
+            self._loaded_until = loaded_until
+            self._loaded_at = time.monotonic()
+
+        logger.debug(f"Availability index loaded: {len(bookings)} bookings on {len(tables)} tables")
+
+    def _ensure_loaded(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl:
+            self.load()
+
+    def covers(self, start, end):
+        """Return True if the index can answer queries for [start, end)."""
+        self._ensure_loaded()
+        return self._loaded_from <= start and end <= self._loaded_until
+
+    def is_current_for(self, start, end):
+        """
+        Return True if the index is loaded, within its TTL and covers [start, end).
+
+        Unlike covers(), never loads the index, so async callers can check it without
+        running a synchronous query.
+        """
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at <= self.ttl
+            and self._loaded_from <= start and end <= self._loaded_until
+        )
+
+    def is_table_free(self, table_id, start, end, exclude_booking_id=None):
+        with self._lock:
+            intervals = self._tables.get(table_id)
+            if intervals is None:
+                return True
+            return intervals.is_free(start, end, exclude_booking_id)
+
+    def update_booking(self, booking):
+        """Insert or move a booking after it has been saved, or drop it once it is released."""
+        if self._loaded_at is None:
+            return
+        table_ids = [booking.table_id]
+        if booking.pk in self._combined:
+            # A combined booking also holds its additional tables
+            table_ids += list(BookingTable.objects.filter(booking_id=booking.pk).values_list('table_id', flat=True))
+        with self._lock:
+            self._discard(booking.pk)
+            start = booking.booking_datetime
+            if booking.status in RELEASED_BOOKING_STATUSES:
+                return
+            if self._window_start <= start < self._loaded_until:
+                end = booking.booking_end_datetime
+                for table_id in table_ids:
+                    self._tables.setdefault(table_id, TableIntervals()).add(booking.pk, start, end)
+                self._bookings[booking.pk] = (start, end, table_ids)
+
+    def remove_booking(self, booking_id):
+        """Remove a booking after it has been deleted."""
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            self._discard(booking_id)
+            self._combined.discard(booking_id)
+
+    def add_table_hold(self, booking_id, table_id):
+        """Block an additional table of an indexed combined booking."""
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            self._combined.add(booking_id)
+            existing = self._bookings.get(booking_id)
+            if existing and table_id not in existing[2]:
+                start, end, table_ids = existing
+                self._tables.setdefault(table_id, TableIntervals()).add(booking_id, start, end)
+                table_ids.append(table_id)
+
+    def remove_table_hold(self, booking_id, table_id):
+        """Free an additional table that a combined booking no longer holds."""
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            existing = self._bookings.get(booking_id)
+            if existing and table_id in existing[2]:
+                start, _, table_ids = existing
+                self._tables[table_id].remove(booking_id, start)
+                table_ids.remove(table_id)
+
+    def _discard(self, booking_id):
+        existing = self._bookings.pop(booking_id, None)
+        if existing:
+            start, _, table_ids = existing
+            for table_id in table_ids:
+                self._tables[table_id].remove(booking_id, start)
+
+
+availability_index = AvailabilityIndex()
+
 
 def find_available_table(booking_datetime, number_of_guests, seating_type_id, booking_to_exclude=None):
     """
@@ -24,55 +233,356 @@ def find_available_table(booking_datetime, number_of_guests, seating_type_id, bo
                        otherwise returns None.
 
     Behavior:
-    - Calculates the requested booking's end time by adding a fixed booking duration (default 2 hours).
-    - Queries the Booking table to find any bookings overlapping with the requested time.
+    - Calculates the requested booking's end time from the matching time slot's booking duration
+      (settings.BOOKING_DURATION, 2 hours by default, when the slot does not set one).
+    - Loads the candidate tables (matching seating type, minimum capacity, active), smallest first.
+    - If the requested time lies within the in-memory availability index horizon, checks each
+      candidate against the index with a binary search instead of querying bookings.
+    - Otherwise, falls back to querying overlapping bookings from the database on the stored
+      booking_end_datetime column, which the (table, booking_datetime, booking_end_datetime) index covers.
       Overlap logic: existing booking start < requested end AND existing booking end > requested start.
-    - Excludes the booking being updated (if any) from conflict checks.
-    - Identifies tables that are currently booked in the requested time frame.
-    - Filters tables by seating type, minimum capacity, and active status.
-    - Excludes booked tables from available options.
-    - Returns the first table sorted by smallest capacity and table number to optimize usage.
+    - Excludes the booking being updated (if any), and cancelled or expired bookings, from conflict checks.
+    - Returns the first free table sorted by smallest capacity and table number to optimize usage.
     - Returns None if no suitable table is found.
 
     Notes:
-    - Booking duration is set by DEFAULT_BOOKING_DURATION, ideally configurable or retrieved from the TimeSlot model.
-    - The function uses database annotations and efficient queries to avoid loading unnecessary data into memory.
     - Logging debug info helps track the search process and outcomes.
     """
 
+    available_table = next(
+        iter(find_available_tables(booking_datetime, number_of_guests, seating_type_id, booking_to_exclude)),
+        None
+    )
+
+    if available_table:
+        logger.debug(f"Found available table: ID={available_table.id}, Capacity={available_table.capacity}")
+    else:
+        logger.debug("No available table found.")
+
+    return available_table
+
+
+def find_available_tables(booking_datetime, number_of_guests, seating_type_id, booking_to_exclude=None):
+    """
+    Return every free table matching the criteria, best fit (smallest capacity, then table number) first.
+
+    Takes the same arguments as find_available_table, which returns the first entry of this list.
+    The result is lazy: with the in-memory index, candidates are only checked as the caller consumes them.
+    """
     requested_start_time = booking_datetime
-    requested_end_time = requested_start_time + DEFAULT_BOOKING_DURATION
+    requested_end_time = requested_start_time + TimeSlot.get_booking_duration(requested_start_time)
+    exclude_id = booking_to_exclude.pk if booking_to_exclude else None
 
     logger.debug(
         f"Searching for table: guests={number_of_guests}, seating_type={seating_type_id}, time={booking_datetime}"
     )
 
-    conflicting_bookings = Booking.objects.annotate(
-        booking_end_time=ExpressionWrapper(
-            F('booking_datetime') + DEFAULT_BOOKING_DURATION,
-            output_field=DateTimeField()
+    candidate_tables = Table.objects.filter(
+        seating_type_id=seating_type_id,
+        capacity__gte=number_of_guests,
+        is_active=True
+    ).select_related('seating_type').order_by('capacity', 'table_number')
+
+    if availability_index.covers(requested_start_time, requested_end_time):
+        return (
+            table for table in candidate_tables
+            if availability_index.is_table_free(table.id, requested_start_time, requested_end_time, exclude_id)
         )
-    ).filter(
-        booking_datetime__lt=requested_end_time,  
-        booking_end_time__gt=requested_start_time
+    return candidate_tables.exclude(
+        id__in=_conflicting_table_ids(requested_start_time, requested_end_time, exclude_id)
     )
 
-    if booking_to_exclude:
-        conflicting_bookings = conflicting_bookings.exclude(pk=booking_to_exclude.pk)
 
-    booked_table_ids = conflicting_bookings.values_list('table_id', flat=True)
-    
-    available_table = Table.objects.filter(
+async def afind_available_table(booking_datetime, number_of_guests, seating_type_id):
+    """
+    Async counterpart of find_available_table for ASGI views.
+
+    The time slot table comes from time_slot_cache.aget_table(). If the availability index is
+    already loaded and covers the request, only the candidate tables are queried; otherwise the
+    candidate tables and the conflicting table IDs are fetched concurrently with the async ORM.
+    The index is never loaded from here, since loading it is a synchronous bulk read.
+    Only single tables are considered; the async check_availability view falls back to
+    find_table_combination, as the sync view does.
+    """
+    slot_table = await time_slot_cache.aget_table()
+    requested_start_time = booking_datetime
+    requested_end_time = requested_start_time + TimeSlot.get_booking_duration(requested_start_time, slot_table)
+
+    candidate_tables = Table.objects.filter(
         seating_type_id=seating_type_id,
         capacity__gte=number_of_guests,
-        is_active=True 
-    ).exclude(
-        id__in=booked_table_ids
-    ).order_by('capacity', 'table_number').first()
+        is_active=True
+    ).order_by('capacity', 'table_number')
 
-    if available_table:
-        logger.debug(f"Found available table: ID={available_table.id}, Capacity={available_table.capacity}")
+    if availability_index.is_current_for(requested_start_time, requested_end_time):
+        async for table in candidate_tables:
+            if availability_index.is_table_free(table.id, requested_start_time, requested_end_time):
+                return table
+        return None
+
+    async def fetch_candidates():
+        return [table async for table in candidate_tables]
+
+    async def fetch_conflicts():
+        return {table_id async for table_id in _conflicting_table_ids(requested_start_time, requested_end_time)}
+
+    candidates, conflicting_ids = await asyncio.gather(fetch_candidates(), fetch_conflicts())
+    return next((table for table in candidates if table.id not in conflicting_ids), None)
+
+
+def allocate_booking(booking_datetime, number_of_guests, seating_type_id, **booking_fields):
+    """
+    Create a Booking on the best free table without racing concurrent requests.
+
+    Args:
+        booking_datetime (datetime): The requested start time for the booking.
+        number_of_guests (int): The number of guests that need seating.
+        seating_type_id (int): The primary key (ID) of the desired SeatingType.
+        **booking_fields: Any other Booking fields (user, occasion, prices, ...).
+
+    Returns:
+        Booking or None: The created booking, or None if every candidate table was taken.
+
+    Behavior:
+    - Walks the free candidate tables from find_available_tables, best fit first.
+    - For each candidate, opens a transaction and locks the table row with select_for_update, so
+      concurrent allocations of the same table are serialized until the first one commits.
+    - Re-checks the database for overlapping bookings on that table while holding the lock; the
+      in-memory index may not yet know about bookings made by other workers.
+    - Creates the booking if the table is still free. Otherwise, or when the lock cannot be
+      acquired (lock timeout, deadlock, SQLite "database is locked"), moves on to the next
+      candidate table.
+    - When no single table is left, walks the free combinations of adjacent tables from
+      find_table_combinations the same way, locking all of their rows. The booking gets the
+      largest table and holds the others through BookingTable rows.
+
+    Notes:
+    - On PostgreSQL and MySQL the row lock closes the race between validation and insert.
+      SQLite ignores select_for_update but serializes writers itself; the losing writer gets
+      an OperationalError and is retried on the next candidate.
+    """
+    requested_end_time = booking_datetime + TimeSlot.get_booking_duration(booking_datetime)
+
+    for table in find_available_tables(booking_datetime, number_of_guests, seating_type_id):
+        try:
+            with transaction.atomic():
+                Table.objects.select_for_update().only('id').get(pk=table.pk)
+                if held_table_intervals(booking_datetime, requested_end_time, table_ids=[table.pk])[:1]:
+                    logger.debug(f"Table {table.id} was taken concurrently, trying the next candidate.")
+                    continue
+                return Booking.objects.create(
+                    table=table,
+                    booking_datetime=booking_datetime,
+                    number_of_guests=number_of_guests,
+                    **booking_fields
+                )
+        except OperationalError as e:
+            logger.debug(f"Could not lock table {table.id} ({e}), trying the next candidate.")
+
+    # No single table is free: push adjacent tables together
+    for tables in find_table_combinations(booking_datetime, number_of_guests, seating_type_id):
+        table_ids = [table.pk for table in tables]
+        try:
+            with transaction.atomic():
+                list(Table.objects.select_for_update().filter(pk__in=table_ids).order_by('pk').values_list('pk'))
+                if held_table_intervals(booking_datetime, requested_end_time, table_ids=table_ids)[:1]:
+                    logger.debug(f"Tables {table_ids} were taken concurrently, trying the next combination.")
+                    continue
+                booking = Booking.objects.create(
+                    table=tables[0],
+                    booking_datetime=booking_datetime,
+                    number_of_guests=number_of_guests,
+                    **booking_fields
+                )
+                for table in tables[1:]:
+                    # create() rather than bulk_create() so signals add the hold to the availability index
+                    BookingTable.objects.create(booking=booking, table=table)
+                return booking
+        except OperationalError as e:
+            logger.debug(f"Could not lock tables {table_ids} ({e}), trying the next combination.")
+
+    return None
+
+
+def find_table_combinations(booking_datetime, number_of_guests, seating_type_id, booking_to_exclude=None):
+    """
+    Yield free combinations of adjacent tables that can seat the party together, best first.
+
+    Takes the same arguments as find_available_table. Each combination is a list of Tables,
+    largest first.
+
+    Behavior:
+    - Candidates come from the precomputed combinations of the floor plan (see
+      bookings/combinations.py): fewest tables first, then smallest total capacity, starting at
+      the first combination large enough for the party.
+    - A combination is free when every one of its tables is. With the in-memory index each
+      table is a binary search; otherwise the tables booked at that time are read once with a
+      single query.
+    """
+    requested_end_time = booking_datetime + TimeSlot.get_booking_duration(booking_datetime)
+    exclude_id = booking_to_exclude.pk if booking_to_exclude else None
+    combinations = table_combination_cache.get()
+
+    if availability_index.covers(booking_datetime, requested_end_time):
+        def is_free(table_id):
+            return availability_index.is_table_free(table_id, booking_datetime, requested_end_time, exclude_id)
     else:
-        logger.debug("No available table found.")
-    
-    return available_table
\ No newline at end of file
+        conflicting_ids = None
+
+        def is_free(table_id):
+            nonlocal conflicting_ids
+            if conflicting_ids is None:
+                conflicting_ids = set(_conflicting_table_ids(booking_datetime, requested_end_time, exclude_id))
+            return table_id not in conflicting_ids
+
+    for table_ids in combinations.candidates(seating_type_id, number_of_guests):
+        if all(is_free(table_id) for table_id in table_ids):
+            yield [combinations.tables[table_id] for table_id in table_ids]
+
+
+def find_table_combination(booking_datetime, number_of_guests, seating_type_id, booking_to_exclude=None):
+    """
+    Return the smallest free combination of adjacent tables for the party, or None.
+
+    See find_table_combinations.
+    """
+    return next(iter(find_table_combinations(booking_datetime, number_of_guests, seating_type_id, booking_to_exclude)), None)
+
+
+def held_table_intervals(start, end, table_ids=None, exclude_booking_id=None):
+    """
+    Return (booking_id, table_id, start, end) rows for every table held during [start, end).
+
+    Covers each booking's own table and the additional tables of combined bookings
+    (BookingTable) in a single UNION query. Cancelled and expired bookings are skipped.
+    """
+    bookings, held = _holding_querysets(start, end, table_ids, exclude_booking_id)
+    return bookings.values_list('id', 'table_id', 'booking_datetime', 'booking_end_datetime').union(
+        held.values_list('booking_id', 'table_id', 'booking__booking_datetime', 'booking__booking_end_datetime'),
+        all=True
+    )
+
+
+def _conflicting_table_ids(requested_start_time, requested_end_time, exclude_booking_id=None):
+    """
+    Return a queryset of table IDs booked in the requested time frame, straight from the database.
+    """
+    bookings, held = _holding_querysets(requested_start_time, requested_end_time, exclude_booking_id=exclude_booking_id)
+    return bookings.values_list('table_id', flat=True).union(held.values_list('table_id', flat=True), all=True)
+
+
+def _holding_querysets(start, end, table_ids=None, exclude_booking_id=None):
+    bookings = Booking.objects.filter(
+        booking_datetime__lt=end,
+        booking_end_datetime__gt=start
+    ).exclude(status__in=RELEASED_BOOKING_STATUSES)
+    held = BookingTable.objects.filter(
+        booking__booking_datetime__lt=end,
+        booking__booking_end_datetime__gt=start
+    ).exclude(booking__status__in=RELEASED_BOOKING_STATUSES)
+
+    if table_ids is not None:
+        bookings = bookings.filter(table_id__in=table_ids)
+        held = held.filter(table_id__in=table_ids)
+    if exclude_booking_id:
+        bookings = bookings.exclude(pk=exclude_booking_id)
+        held = held.exclude(booking_id=exclude_booking_id)
+
+    return bookings.order_by(), held.order_by()
+
+
+def build_availability_grid(start_date, end_date):
+    """
+    Build the availability matrix (days x time slots x seating types) for a date range.
+
+    Args:
+        start_date (date): First day of the range.
+        end_date (date): Last day of the range (inclusive).
+
+    Returns:
+        list[dict]: One entry per day, each holding one entry per time slot with, per seating type,
+                    the number of free tables, the free seat capacity and the largest party that can
+                    still be seated, on one table or on a free combination of adjacent tables.
+
+    Behavior:
+    - Runs exactly two queries whatever the size of the range: active tables and the bookings
+      overlapping the range. Time slots and table combinations come from their process caches.
+    - Every (day, time slot) pair is a cell starting at the slot's start time and lasting the slot's
+      booking duration.
+    - Cells and bookings are both swept in start-time order. Bookings enter an active heap once they
+      start before the latest possible cell end and leave it once they end before the current cell
+      starts, so each cell only inspects the bookings that are live around it.
+    - Work grows with the number of days, slots and bookings in the range; party size is answered
+      by the max_party_size figure, not by one probe per size.
+    """
+    time_slots = get_time_slots()
+    combinations = table_combination_cache.get()
+    tables = list(
+        Table.objects.filter(is_active=True, seating_type__is_active=True)
+        .values('id', 'capacity', 'seating_type_id', 'seating_type__name')
+        .order_by('seating_type__name', 'capacity')
+    )
+    if not time_slots:
+        return []
+
+    seating_types = {}
+    for table in tables:
+        seating_types.setdefault(
+            table['seating_type_id'],
+            {'name': table['seating_type__name'], 'tables': []}
+        )['tables'].append(table)
+
+    cells = []
+    day = start_date
+    while day <= end_date:
+        for slot in time_slots:
+            cell_start = datetime.combine(day, slot.start_time)
+            cells.append((cell_start, cell_start + (slot.booking_duration or DEFAULT_BOOKING_DURATION), day, slot))
+        day += timedelta(days=1)
+    longest_cell = max(cell_end - cell_start for cell_start, cell_end, _, _ in cells)
+
+    bookings = sorted(
+        (start, end, table_id)
+        for _, table_id, start, end in held_table_intervals(cells[0][0], max(cell_end for _, cell_end, _, _ in cells))
+    )
+
+    grid = {}
+    active = []  # heap of (end, start, table_id)
+    next_booking = 0
+    for cell_start, cell_end, day, slot in cells:
+        while next_booking < len(bookings) and bookings[next_booking][0] < cell_start + longest_cell:
+            start, end, table_id = bookings[next_booking]
+            heapq.heappush(active, (end, start, table_id))
+            next_booking += 1
+        while active and active[0][0] <= cell_start:
+            heapq.heappop(active)
+
+        busy_table_ids = {table_id for end, start, table_id in active if start < cell_end}
+
+        seating = []
+        for seating_type_id, seating_type in seating_types.items():
+            free = [table['capacity'] for table in seating_type['tables'] if table['id'] not in busy_table_ids]
+            max_party_size = max(free, default=0)
+            for capacity, table_ids in combinations.largest_first(seating_type_id):
+                if capacity <= max_party_size:
+                    break
+                if busy_table_ids.isdisjoint(table_ids):
+                    max_party_size = capacity
+                    break
+            seating.append({
+                'seating_type_id': seating_type_id,
+                'seating_type': seating_type['name'],
+                'available_tables': len(free),
+                'available_seats': sum(free),
+                'max_party_size': max_party_size,
+            })
+
+        grid.setdefault(day, []).append({
+            'time_slot_id': slot.id,
+            'label': slot.label,
+            'start_time': slot.start_time,
+            'end_time': slot.end_time,
+            'seating_types': seating,
+        })
+
+    return [{'date': day, 'time_slots': slots} for day, slots in grid.items()]
@@ -0,0 +1,316 @@
+# bookings/benchmark.py
+import json
+import queue
+import subprocess
+import threading
+import time as timer
+from collections import Counter, namedtuple
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.throttling import SimpleRateThrottle
+from .availability import availability_index
+from .caching import catalog_cache
+from .models import CustomUser, SeatingType, Table, Booking, BookingTable, Payment, TimeSlot, WaitlistEntry
+from .serializers import MyTokenObtainPairSerializer
+from .slots import time_slot_cache
+import logging
+logger = logging.getLogger(__name__)
+
+# Every seeded row is tagged with this prefix so a run can find and delete its own data
+# without touching real bookings.
+BENCHMARK_PREFIX = 'bench'
+BENCHMARK_EMAIL_DOMAIN = 'benchmark.invalid'
+
+# Party sizes and their relative frequency; most tables are booked by couples and fours.
+PARTY_SIZE_WEIGHTS = {1: 4, 2: 40, 3: 10, 4: 25, 5: 6, 6: 9, 7: 2, 8: 4}
+
+# Table capacities in the seeded floor plan, repeated to the requested table count.
+TABLE_CAPACITIES = (2, 2, 4, 4, 4, 6, 8)
+
+# Seating types created for the run: (name suffix, price multiplier, share of tables).
+SEATING_TYPES = (('Standard', Decimal('1.00'), 6), ('Terrace', Decimal('1.20'), 3), ('VIP', Decimal('1.50'), 1))
+
+# Time slots created when the database has none: (label, start, end, price per guest, share of bookings).
+DEFAULT_TIME_SLOTS = (
+    ('Lunch', time(12, 0), time(15, 0), Decimal('15.00'), 1),
+    ('Dinner', time(18, 0), time(22, 0), Decimal('25.00'), 2),
+)
+
+# Start times are drawn on this grid inside a slot.
+START_TIME_STEP = timedelta(minutes=30)
+
+BenchmarkData = namedtuple('BenchmarkData', ['users', 'tokens', 'seating_types', 'time_slots', 'days'])
+RequestSpec = namedtuple('RequestSpec', ['method', 'path', 'payload', 'user_index'])
+Sample = namedtuple('Sample', ['latency', 'status', 'queries'])
+
+
+def delete_benchmark_data():
+    """
+    Delete every row a previous run seeded.
+
+    The bookings, their payments and additional tables are deleted with plain SQL DELETEs
+    before the users, so the Booking delete signals do not queue a summary refresh and a
+    waitlist match for every seeded booking. Those DELETEs bypass the signals that keep the
+    process caches in sync, so the caches are reset afterwards. The rollups of the seeded
+    days go with the seeded seating types.
+    """
+    quote = connection.ops.quote_name
+    users = f"SELECT {quote('id')} FROM {quote(CustomUser._meta.db_table)} WHERE {quote('email')} LIKE %s"
+    bookings = f"SELECT {quote('id')} FROM {quote(Booking._meta.db_table)} WHERE {quote('user_id')} IN ({users})"
+    params = [f'%@{BENCHMARK_EMAIL_DOMAIN}']
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {quote(WaitlistEntry._meta.db_table)} SET {quote('booking_id')} = NULL WHERE {quote('booking_id')} IN ({bookings})",
+                params
+            )
+            for model in (BookingTable, Payment):
+                cursor.execute(f"DELETE FROM {quote(model._meta.db_table)} WHERE {quote('booking_id')} IN ({bookings})", params)
+            cursor.execute(f"DELETE FROM {quote(Booking._meta.db_table)} WHERE {quote('user_id')} IN ({users})", params)
+        CustomUser.objects.filter(email__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}').delete()
+    Table.objects.filter(table_number__startswith=BENCHMARK_PREFIX.upper()).delete()
+    SeatingType.objects.filter(name__startswith=f'{BENCHMARK_PREFIX} ').delete()
+    TimeSlot.objects.filter(label__startswith=f'{BENCHMARK_PREFIX} ').delete()
+    _reset_caches()
+
+
+def seed_benchmark_data(users, tables, bookings, days, rng):
+    """
+    Create `users` users, `tables` tables and up to `bookings` non-overlapping bookings spread
+    over the next `days` days, with weekend evenings and common party sizes weighted up.
+
+    Rows are written with bulk_create, so no per-row signals fire; the process caches are
+    reset afterwards instead.
+
+    Returns:
+        BenchmarkData: The seeded users with an access token each, seating types, time slots
+                       and the list of seeded dates.
+    """
+    password = make_password(None)
+    CustomUser.objects.bulk_create([
+        CustomUser(
+            email=f'{BENCHMARK_PREFIX}{i}@{BENCHMARK_EMAIL_DOMAIN}',
+            first_name='Bench',
+            last_name=str(i),
+            password=password,
+            is_email_verified=True
+        )
+        for i in range(users)
+    ])
+    seeded_users = list(CustomUser.objects.filter(email__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}').order_by('id'))
+
+    seating_types = [
+        SeatingType.objects.create(name=f'{BENCHMARK_PREFIX} {name}', price_multiplier=multiplier)
+        for name, multiplier, _ in SEATING_TYPES
+    ]
+    seating_weights = [share for _, _, share in SEATING_TYPES]
+    Table.objects.bulk_create([
+        Table(
+            table_number=f'{BENCHMARK_PREFIX.upper()}{i:05d}',
+            seating_type=rng.choices(seating_types, seating_weights)[0],
+            capacity=TABLE_CAPACITIES[i % len(TABLE_CAPACITIES)]
+        )
+        for i in range(tables)
+    ])
+    seeded_tables = list(Table.objects.filter(table_number__startswith=BENCHMARK_PREFIX.upper()))
+
+    time_slots = list(TimeSlot.objects.order_by('start_time'))
+    slot_weights = [1] * len(time_slots)
+    if not time_slots:
+        time_slots = [
+            TimeSlot.objects.create(
+                label=f'{BENCHMARK_PREFIX} {label}', start_time=start, end_time=end, base_price_per_guest=price
+            )
+            for label, start, end, price, _ in DEFAULT_TIME_SLOTS
+        ]
+        slot_weights = [share for *_, share in DEFAULT_TIME_SLOTS]
+    _reset_caches()
+
+    today = timezone.now().date()
+    seeded_days = [today + timedelta(days=offset) for offset in range(1, days + 1)]
+    day_weights = [3 if day.weekday() >= 4 else 2 for day in seeded_days]
+    tables_by_size = sorted(seeded_tables, key=lambda table: table.capacity)
+    occupied = {}
+
+    rows = []
+    for _ in range(bookings):
+        guests = _party_size(rng)
+        start = _booking_start(rng, rng.choices(seeded_days, day_weights)[0], time_slots, slot_weights)
+        end = start + TimeSlot.get_booking_duration(start)
+        fitting = [table for table in tables_by_size if table.capacity >= guests]
+        table = next(
+            (
+                table for table in fitting
+                if all(end <= other_start or other_end <= start for other_start, other_end in occupied.get(table.id, ()))
+            ),
+            None
+        )
+        if table is None:
+            continue
+        occupied.setdefault(table.id, []).append((start, end))
+        rows.append(Booking(
+            user=rng.choice(seeded_users),
+            table=table,
+            number_of_guests=guests,
+            booking_datetime=start,
+            booking_end_datetime=end,
+            total_price=Decimal('0.00')
+        ))
+    Booking.objects.bulk_create(rows, batch_size=500)
+    availability_index.clear()
+
+    logger.debug(f"Seeded {len(seeded_users)} users, {len(seeded_tables)} tables and {len(rows)} bookings")
+    tokens = [str(MyTokenObtainPairSerializer.get_token(user).access_token) for user in seeded_users]
+    return BenchmarkData(seeded_users, tokens, seating_types, time_slots, seeded_days)
+
+
+def _reset_caches():
+    availability_index.clear()
+    time_slot_cache.invalidate()
+    for model in (SeatingType, Table, TimeSlot):
+        catalog_cache.invalidate(model)
+
+
+def _party_size(rng):
+    return rng.choices(list(PARTY_SIZE_WEIGHTS), list(PARTY_SIZE_WEIGHTS.values()))[0]
+
+
+def _booking_start(rng, day, time_slots, slot_weights):
+    slot = rng.choices(time_slots, slot_weights)[0]
+    slot_start = datetime.combine(day, slot.start_time)
+    steps = int((datetime.combine(day, slot.end_time) - slot_start) / START_TIME_STEP)
+    return slot_start + START_TIME_STEP * rng.randrange(max(steps, 1))
+
+
+def _booking_request(rng, data):
+    return {
+        'number_of_guests': _party_size(rng),
+        'booking_datetime': _booking_start(rng, rng.choice(data.days), data.time_slots, [1] * len(data.time_slots)).isoformat(),
+        'seating_type_id': rng.choice(data.seating_types).id,
+    }
+
+
+# Scenario name -> function(rng, data) returning (method, path, JSON payload or None).
+SCENARIOS = {
+    'check_availability': lambda rng, data: ('POST', '/api/check-availability/', _booking_request(rng, data)),
+    'calculate_price': lambda rng, data: ('POST', '/api/bookings/calculate_price/', _booking_request(rng, data)),
+    'create_booking': lambda rng, data: ('POST', '/api/bookings/', _booking_request(rng, data)),
+    'booking_list': lambda rng, data: ('GET', '/api/bookings/', None),
+}
+
+
+def run_scenario(name, data, requests, concurrency, rng):
+    """
+    Send `requests` requests of scenario `name` through the real URL routes and middleware,
+    from `concurrency` client threads, each authenticated with a seeded user's JWT.
+
+    With a concurrency of 1 the requests run on the calling thread, so they share its
+    database connection (and, in tests, its transaction).
+
+    Returns:
+        dict: The summary from summarize().
+    """
+    specs = queue.Queue()
+    for i in range(requests):
+        method, path, payload = SCENARIOS[name](rng, data)
+        specs.put(RequestSpec(method, path, payload, i % len(data.users)))
+
+    samples = []
+    lock = threading.Lock()
+
+    def worker(close_connection):
+        client = Client(SERVER_NAME=_server_name())
+        local_samples = []
+        try:
+            while True:
+                try:
+                    spec = specs.get_nowait()
+                except queue.Empty:
+                    break
+                body = json.dumps(spec.payload) if spec.payload is not None else ''
+                with CaptureQueriesContext(connection) as queries:
+                    started = timer.perf_counter()
+                    response = client.generic(
+                        spec.method, spec.path, body, content_type='application/json',
+                        headers={'Authorization': f'Bearer {data.tokens[spec.user_index]}'}
+                    )
+                    latency = timer.perf_counter() - started
+                local_samples.append(Sample(latency, response.status_code, len(queries)))
+        finally:
+            with lock:
+                samples.extend(local_samples)
+            if close_connection:
+                connection.close()
+
+    # Throttles would cap a run at a few hundred requests; the benchmark measures the views.
+    with mock.patch.object(SimpleRateThrottle, 'allow_request', lambda self, request, view: True):
+        started = timer.perf_counter()
+        if concurrency <= 1:
+            worker(close_connection=False)
+        else:
+            threads = [threading.Thread(target=worker, args=(True,)) for _ in range(concurrency)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        elapsed = timer.perf_counter() - started
+
+    return summarize(samples, elapsed)
+
+
+def _server_name():
+    """Pick a host name the request will pass ALLOWED_HOSTS validation with."""
+    host = next((host for host in settings.ALLOWED_HOSTS if host and '*' not in host), 'localhost')
+    return host.lstrip('.')
+
+
+def summarize(samples, elapsed):
+    """
+    Reduce samples to latency percentiles (milliseconds), queries per request and throughput.
+    """
+    latencies = sorted(sample.latency * 1000 for sample in samples)
+    queries = [sample.queries for sample in samples]
+    count = len(samples)
+    return {
+        'requests': count,
+        'status_codes': {str(status): total for status, total in sorted(Counter(sample.status for sample in samples).items())},
+        'errors': sum(1 for sample in samples if sample.status >= 500),
+        'elapsed_seconds': round(elapsed, 4),
+        'throughput_rps': round(count / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'p50': _percentile(latencies, 50),
+            'p95': _percentile(latencies, 95),
+            'p99': _percentile(latencies, 99),
+            'mean': round(sum(latencies) / count, 3) if count else None,
+            'max': round(latencies[-1], 3) if count else None,
+        },
+        'queries_per_request': {
+            'mean': round(sum(queries) / count, 2) if count else None,
+            'max': max(queries) if count else None,
+        },
+    }
+
+
+def _percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return round(sorted_values[int(rank) - 1], 3)
+
+
+def git_commit():
+    """Return the current git commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
@@ -0,0 +1,199 @@
+# bookings/bulk.py
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from .availability import TableIntervals, availability_index, held_table_intervals
+from .combinations import table_combination_cache
+from .models import Booking, BookingTable, CustomUser, Occasion, SeatingType, Table, TimeSlot
+from .pricing import calculate_booking_price
+from .reporting import queue_summary_refresh
+from .slots import get_time_slot
+import logging
+logger = logging.getLogger(__name__)
+
+# Largest number of bookings accepted by one bulk request.
+MAX_BULK_BOOKINGS = 100
+
+NO_TABLE_ERROR = "Sorry, no tables are available for the selected time, number of guests, and seating preference."
+
+
+def create_bookings_in_bulk(items, default_user=None, dry_run=False):
+    """
+    Validate, allocate, price and insert a batch of bookings in one transaction.
+
+    Args:
+        items (list[dict]): Validated BulkBookingItemSerializer data, each with number_of_guests,
+                            booking_datetime, seating_type_id and optionally occasion_id,
+                            special_request and user_id.
+        default_user (CustomUser, optional): Owner of items without a user_id.
+        dry_run (bool): Allocate and price everything, then roll the transaction back.
+
+    Returns:
+        list[dict]: One result per item, in request order. Successful items carry the Booking
+                    under 'booking' (unsaved on a dry run); failed items carry an 'errors' dict
+                    instead. Every item carries its request index.
+
+    Behavior:
+    - Seating types, occasions and users are fetched with one in_bulk query each; time slots
+      and prices come from the cached slot table.
+    - Inside the transaction the candidate tables of every requested seating type are locked
+      with one select_for_update query, and the bookings overlapping the batch's overall window
+      are loaded with one more. That snapshot is the availability every item is checked against.
+    - Items are allocated in request order, best fit (smallest capacity, then table number)
+      first. A party no single table can seat gets the smallest free combination of adjacent
+      tables, as in allocate_booking. Each allocation is added to the snapshot, so items in the
+      same batch never share a table.
+    - The allocated rows are written with a single bulk_create. Because bulk_create skips
+      Booking.save() and post_save, booking_end_datetime is set here, the reporting rollup
+      refresh is queued here and the availability index is updated once the transaction commits.
+      Combined bookings are rare and need their primary key for the BookingTable rows, so they
+      are saved one by one through the model signals instead.
+
+    Notes:
+    - Holding the table locks keeps allocate_booking() in other requests from taking a table
+      between the snapshot and the insert.
+    """
+    results = [None] * len(items)
+    now = timezone.now()
+
+    seating_types = SeatingType.objects.filter(is_active=True).in_bulk(
+        {item['seating_type_id'] for item in items}
+    )
+    occasion_ids = {item['occasion_id'] for item in items if item.get('occasion_id')}
+    occasions = Occasion.objects.filter(is_active=True).in_bulk(occasion_ids) if occasion_ids else {}
+    user_ids = {item['user_id'] for item in items if item.get('user_id')}
+    users = CustomUser.objects.filter(is_active=True).in_bulk(user_ids) if user_ids else {}
+
+    pending = []
+    for index, item in enumerate(items):
+        errors = {}
+        seating_type = seating_types.get(item['seating_type_id'])
+        if seating_type is None:
+            errors['seating_type_id'] = "Invalid seating type."
+        occasion = None
+        if item.get('occasion_id'):
+            occasion = occasions.get(item['occasion_id'])
+            if occasion is None:
+                errors['occasion_id'] = "Invalid occasion."
+        user = default_user
+        if item.get('user_id'):
+            user = users.get(item['user_id'])
+            if user is None:
+                errors['user_id'] = "Invalid user."
+        elif user is None:
+            errors['user_id'] = "This field is required."
+
+        booking_datetime = item['booking_datetime']
+        if booking_datetime < now:
+            errors['booking_datetime'] = "Booking date and time cannot be in the past."
+
+        if not errors:
+            try:
+                total_price = calculate_booking_price(item['number_of_guests'], booking_datetime, seating_type)
+            except ValidationError as e:
+                errors = e.detail
+
+        if errors:
+            results[index] = {'index': index, 'errors': errors}
+            continue
+
+        pending.append((index, Booking(
+            user=user,
+            occasion=occasion,
+            number_of_guests=item['number_of_guests'],
+            booking_datetime=booking_datetime,
+            booking_end_datetime=booking_datetime + TimeSlot.get_booking_duration(booking_datetime),
+            special_request=item.get('special_request'),
+            base_price_per_guest=get_time_slot(booking_datetime).base_price_per_guest,
+            total_price=total_price,
+        ), seating_type))
+
+    if not pending:
+        return results
+
+    with transaction.atomic():
+        tables_by_seating_type = {}
+        tables_by_id = {}
+        tables = Table.objects.select_for_update().filter(
+            is_active=True,
+            seating_type_id__in={seating_type.id for _, _, seating_type in pending}
+        ).order_by('capacity', 'table_number')
+        for table in tables:
+            table.seating_type = seating_types[table.seating_type_id]
+            tables_by_seating_type.setdefault(table.seating_type_id, []).append(table)
+            tables_by_id[table.id] = table
+        combinations = table_combination_cache.get()
+
+        intervals = {}
+        window_start = min(booking.booking_datetime for _, booking, _ in pending)
+        window_end = max(booking.booking_end_datetime for _, booking, _ in pending)
+        for booking_id, table_id, start, end in held_table_intervals(
+            window_start,
+            window_end,
+            table_ids=[table.id for group in tables_by_seating_type.values() for table in group]
+        ):
+            intervals.setdefault(table_id, TableIntervals()).add(booking_id, start, end)
+
+        def is_free(table_id, start, end):
+            return table_id not in intervals or intervals[table_id].is_free(start, end)
+
+        allocated = []
+        combined = {}
+        for index, booking, seating_type in pending:
+            start, end = booking.booking_datetime, booking.booking_end_datetime
+            table = next(
+                (
+                    table for table in tables_by_seating_type.get(seating_type.id, ())
+                    if table.capacity >= booking.number_of_guests and is_free(table.id, start, end)
+                ),
+                None
+            )
+            held_tables = [table]
+            if table is None:
+                table_ids = next(
+                    (
+                        table_ids for table_ids in combinations.candidates(seating_type.id, booking.number_of_guests)
+                        if all(table_id in tables_by_id and is_free(table_id, start, end) for table_id in table_ids)
+                    ),
+                    None
+                )
+                if table_ids is None:
+                    results[index] = {'index': index, 'errors': {'non_field_errors': [NO_TABLE_ERROR]}}
+                    continue
+                held_tables = [tables_by_id[table_id] for table_id in table_ids]
+                table = held_tables[0]
+                combined[index] = held_tables[1:]
+            booking.table = table
+            for held in held_tables:
+                # Batch rows have no primary key yet; a negative placeholder keeps them distinct.
+                intervals.setdefault(held.id, TableIntervals()).add(-1 - index, start, end)
+            allocated.append((index, booking))
+
+        bookings = [booking for index, booking in allocated if index not in combined]
+        if dry_run:
+            transaction.set_rollback(True)
+        else:
+            if bookings:
+                Booking.objects.bulk_create(bookings)
+                queue_summary_refresh(booking.booking_datetime.date() for booking in bookings)
+                transaction.on_commit(lambda: _index_bookings(bookings))
+            for index, booking in allocated:
+                if index in combined:
+                    booking.save()
+                    for held in combined[index]:
+                        BookingTable.objects.create(booking=booking, table=held)
+
+    for index, booking in allocated:
+        results[index] = {'index': index, 'booking': booking}
+
+    logger.debug(f"Bulk booking: {len(allocated)} of {len(items)} items allocated (dry_run={dry_run})")
+    return results
+
+
+def _index_bookings(bookings):
+    # Backends that do not return primary keys from bulk_create leave pk unset; reload instead.
+    if any(booking.pk is None for booking in bookings):
+        availability_index.clear()
+        return
+    for booking in bookings:
+        availability_index.update_booking(booking)
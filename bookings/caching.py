@@ -0,0 +1,193 @@
+# bookings/caching.py
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+import logging
+logger = logging.getLogger(__name__)
+
+# Cache alias holding rendered catalog responses and the per-model version keys. Defaults to
+# local memory; point CACHES['catalog'] at a shared backend so that all workers see the same
+# versions and share the rendered pages.
+CATALOG_CACHE_ALIAS = 'catalog' if 'catalog' in settings.CACHES else 'default'
+
+# Seconds a rendered response is kept. Entries are invalidated through the version keys, so
+# this only bounds how long unused pages occupy the cache.
+CATALOG_CACHE_TIMEOUT = getattr(settings, 'CATALOG_CACHE_TIMEOUT', 60 * 60)
+
+CATALOG_VERSION_KEY = 'bookings:catalog_version:{}'
+CATALOG_RESPONSE_KEY = 'bookings:catalog_response:{}'
+
+
+class CatalogCache:
+    """
+    Versioned cache of rendered responses for the public catalog endpoints.
+
+    Every model behind a catalog endpoint has a version key holding the time, in nanoseconds,
+    of its last change. Response keys include the versions of all models the response was
+    built from, so bumping a version (post_save/post_delete, see bookings/signals.py) makes
+    every page built from that model unreachable without scanning the cache.
+    """
+
+    def __init__(self, alias=CATALOG_CACHE_ALIAS, timeout=CATALOG_CACHE_TIMEOUT):
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def clear(self):
+        """Drop every cached response and version."""
+        self.cache.clear()
+
+    def invalidate(self, model):
+        """
+        Publish a new version for `model` once the transaction commits; cached responses built
+        from it are no longer served.
+
+        A version bumped before the commit would let a concurrent reader cache the old rows
+        under the new version, for up to `timeout` seconds.
+        """
+        key = CATALOG_VERSION_KEY.format(model._meta.label_lower)
+        transaction.on_commit(lambda: self.cache.set(key, time.time_ns(), timeout=None))
+
+    def get_versions(self, models):
+        """
+        Return the current version of each model, in the given order, creating missing ones.
+        """
+        keys = [CATALOG_VERSION_KEY.format(model._meta.label_lower) for model in models]
+        versions = self.cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                self.cache.add(key, time.time_ns(), timeout=None)
+                versions[key] = self.cache.get(key)
+        return [versions[key] for key in keys]
+
+    def response_key(self, parts, versions):
+        digest = hashlib.md5('|'.join(str(part) for part in (*parts, *versions)).encode()).hexdigest()
+        return CATALOG_RESPONSE_KEY.format(digest)
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, entry):
+        self.cache.set(key, entry, timeout=self.timeout)
+
+
+catalog_cache = CatalogCache()
+
+
+class CachedCatalogMixin:
+    """
+    ReadOnlyModelViewSet mixin that serves list and retrieve from the catalog cache.
+
+    JSON responses are cached per path, query string and API version, together with an
+    ETag and a Last-Modified time taken from the newest version of `cache_models`.
+    Requests whose If-None-Match or If-Modified-Since match get an empty 304. Permissions
+    and throttles still run for every request; other renderers (e.g. the browsable API)
+    bypass the cache.
+
+    Attributes:
+        cache_models (tuple): Models the responses are built from, including nested ones.
+                              Defaults to the queryset model.
+    """
+    cache_models = None
+
+    def get_cache_models(self):
+        return self.cache_models or (self.get_queryset().model,)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not isinstance(request.accepted_renderer, JSONRenderer):
+            return handler(request, *args, **kwargs)
+
+        versions = catalog_cache.get_versions(self.get_cache_models())
+        key = catalog_cache.response_key(
+            (request.path, request.GET.urlencode(), request.version, request.accepted_media_type),
+            versions
+        )
+        last_modified = max(versions) // 1_000_000_000
+
+        entry = catalog_cache.get(key)
+        if entry is not None:
+            response = HttpResponse(entry['content'], content_type=entry['content_type'])
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            response.render()
+            entry = {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'etag': '"%s"' % hashlib.md5(response.content).hexdigest(),
+            }
+            catalog_cache.set(key, entry)
+            logger.debug(f"Catalog response cached for {request.get_full_path()}")
+
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(last_modified)
+        return get_conditional_response(request, etag=entry['etag'], last_modified=last_modified, response=response)
+
+
+class ConditionalGetMixin:
+    """
+    ModelViewSet mixin answering unchanged list and retrieve requests with 304 Not Modified.
+
+    Validators come from the database rather than the rendered body, so a 304 costs a single
+    aggregate query and nothing is serialized:
+        - list: Max(updated_at) and Count(pk) of the filtered queryset. The count catches deletes.
+        - retrieve: the object's pk and updated_at.
+
+    The weak ETag also covers the path, query string, accepted media type and user, so pages,
+    filters and renderers never share a validator. Changes to nested rows (e.g. a table
+    renamed) do not touch updated_at and are not detected.
+    """
+    last_modified_field = 'updated_at'
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        stats = queryset.aggregate(last_modified=Max(self.last_modified_field), count=Count('pk'))
+
+        def respond():
+            return super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+
+        return self.conditional_response(request, stats['last_modified'], stats['count'], respond)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+
+        def respond():
+            return Response(self.get_serializer(instance).data)
+
+        return self.conditional_response(request, getattr(instance, self.last_modified_field), instance.pk, respond)
+
+    def conditional_response(self, request, last_modified, state, respond):
+        etag = 'W/"%s"' % hashlib.md5('|'.join(str(part) for part in (
+            request.path, request.GET.urlencode(), request.accepted_media_type,
+            request.user.pk, state, last_modified.isoformat() if last_modified else ''
+        )).encode()).hexdigest()
+        last_modified = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = respond()
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
@@ -0,0 +1,148 @@
+# bookings/combinations.py
+import bisect
+import threading
+from django.conf import settings
+from .caching import catalog_cache
+from .models import SeatingType, Table
+import logging
+logger = logging.getLogger(__name__)
+
+# Most tables pushed together for one party.
+MAX_COMBINATION_TABLES = getattr(settings, 'MAX_COMBINATION_TABLES', 4)
+
+# Upper bound on the precomputed combinations, so a densely connected floor plan cannot make
+# the enumeration or the search explode. Smaller combinations are enumerated first.
+MAX_TABLE_COMBINATIONS = getattr(settings, 'MAX_TABLE_COMBINATIONS', 10000)
+
+
+class TableCombinations:
+    """
+    Immutable set of the table combinations of one floor plan, grouped by seating type and size.
+
+    A combination is a connected group of 2 to MAX_COMBINATION_TABLES active tables of the same
+    seating type, following Table.adjacent_tables. Within a seating type and size, combinations
+    are sorted by total capacity, so the smallest combinations that fit a party are found with a
+    binary search.
+    """
+
+    def __init__(self, tables, adjacency, max_tables=MAX_COMBINATION_TABLES, limit=MAX_TABLE_COMBINATIONS):
+        self.tables = {table.id: table for table in tables}
+        groups = {}
+        count = 0
+        for table_ids in _connected_subsets(adjacency, max_tables, limit):
+            members = sorted((self.tables[table_id] for table_id in table_ids), key=lambda table: (-table.capacity, table.table_number))
+            capacity = sum(table.capacity for table in members)
+            groups.setdefault((members[0].seating_type_id, len(members)), []).append(
+                (capacity, tuple(table.table_number for table in members), tuple(table.id for table in members))
+            )
+            count += 1
+
+        self.sizes = {}
+        self.capacities = {}
+        self.combinations = {}
+        self.by_capacity = {}
+        for (seating_type_id, size), combinations in groups.items():
+            combinations.sort()
+            self.sizes.setdefault(seating_type_id, []).append(size)
+            self.capacities[seating_type_id, size] = [capacity for capacity, _, _ in combinations]
+            self.combinations[seating_type_id, size] = [table_ids for _, _, table_ids in combinations]
+            self.by_capacity.setdefault(seating_type_id, []).extend(
+                (capacity, table_ids) for capacity, _, table_ids in combinations
+            )
+        for sizes in self.sizes.values():
+            sizes.sort()
+        for combinations in self.by_capacity.values():
+            combinations.sort(key=lambda combination: -combination[0])
+        self.count = count
+
+    def candidates(self, seating_type_id, number_of_guests):
+        """
+        Yield the table ID tuples of combinations that can seat the party, fewest tables first,
+        then smallest total capacity. Each tuple starts with its largest table.
+        """
+        for size in self.sizes.get(seating_type_id, ()):
+            capacities = self.capacities[seating_type_id, size]
+            combinations = self.combinations[seating_type_id, size]
+            for i in range(bisect.bisect_left(capacities, number_of_guests), len(combinations)):
+                yield combinations[i]
+
+    def largest_first(self, seating_type_id):
+        """
+        Yield (total capacity, table ID tuple) for every combination of the seating type,
+        largest total capacity first.
+        """
+        return iter(self.by_capacity.get(seating_type_id, ()))
+
+
+def _connected_subsets(adjacency, max_size, limit):
+    """
+    Yield up to `limit` connected vertex subsets of 2 to max_size vertices, smallest first.
+
+    Subsets of one size are grown from those of the size below by adding a neighbour, so
+    enumeration stops as soon as the limit is reached and a capped floor plan keeps its
+    smallest combinations.
+    """
+    level = {frozenset([vertex]) for vertex in adjacency}
+    produced = 0
+    for _ in range(2, max_size + 1):
+        next_level = set()
+        for subset in level:
+            if len(next_level) >= limit - produced:
+                break
+            for vertex in subset:
+                for neighbour in adjacency[vertex]:
+                    if neighbour not in subset:
+                        next_level.add(subset | {neighbour})
+        for subset in sorted(next_level, key=sorted):
+            if produced == limit:
+                logger.warning(f"Table combinations capped at {limit}; larger combinations are not considered")
+                return
+            yield tuple(sorted(subset))
+            produced += 1
+        level = next_level
+
+
+class TableCombinationCache:
+    """
+    Process-local cache of the TableCombinations of the current floor plan.
+
+    Rebuilt when the catalog version of Table or SeatingType changes. Table and SeatingType
+    saves and Table.adjacent_tables changes bump those versions (see bookings/signals.py), so
+    lookups normally cost one read of the version keys.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Drop the local combinations; the next lookup rebuilds them."""
+        self._combinations = None
+        self._versions = None
+
+    def get(self):
+        versions = catalog_cache.get_versions([Table, SeatingType])
+        if self._combinations is not None and versions == self._versions:
+            return self._combinations
+
+        with self._lock:
+            if self._combinations is None or versions != self._versions:
+                tables = list(
+                    Table.objects.filter(is_active=True, seating_type__is_active=True).select_related('seating_type')
+                )
+                seating_type_of = {table.id: table.seating_type_id for table in tables}
+                adjacency = {table_id: set() for table_id in seating_type_of}
+                for from_id, to_id in Table.adjacent_tables.through.objects.filter(
+                    from_table_id__in=list(seating_type_of), to_table_id__in=list(seating_type_of)
+                ).values_list('from_table_id', 'to_table_id'):
+                    if seating_type_of[from_id] == seating_type_of[to_id]:
+                        adjacency[from_id].add(to_id)
+                        adjacency[to_id].add(from_id)
+
+                self._combinations = TableCombinations(tables, adjacency)
+                self._versions = versions
+                logger.debug(f"Table combinations loaded: {self._combinations.count} combinations")
+            return self._combinations
+
+
+table_combination_cache = TableCombinationCache()
@@ -0,0 +1,117 @@
+# bookings/exports.py
+import csv
+import json
+from datetime import datetime, time, timedelta
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import Booking, Payment
+
+# Rows fetched per database round trip; memory use is bounded by this, not by the table size.
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# dataset -> (model, date field used for the range filter, exported columns)
+EXPORT_DATASETS = {
+    'bookings': (
+        Booking,
+        'booking_datetime',
+        (
+            'id', 'user_id', 'user__email', 'booking_datetime', 'booking_end_datetime',
+            'number_of_guests', 'status', 'payment_status', 'table_id', 'table__table_number',
+            'table__seating_type__name', 'occasion__name', 'base_price_per_guest', 'total_price',
+            'created_at', 'updated_at',
+        ),
+    ),
+    'payments': (
+        Payment,
+        'created_at',
+        (
+            'id', 'booking_id', 'user_id', 'user__email', 'amount', 'currency', 'method', 'status',
+            'transaction_id', 'verified', 'paid_at', 'created_at', 'updated_at',
+        ),
+    ),
+}
+
+
+class _Echo:
+    """
+    File-like object whose write() returns the value, so csv.writer can feed a generator.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_rows(dataset, start_date=None, end_date=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Stream the rows of an export dataset as dicts.
+
+    Args:
+        dataset (str): A key of EXPORT_DATASETS ('bookings' or 'payments').
+        start_date (date, optional): First day to include.
+        end_date (date, optional): Last day to include (inclusive).
+        chunk_size (int): Rows fetched per round trip.
+
+    Returns:
+        tuple: (list of column names, iterator of row dicts)
+
+    Notes:
+        - Uses values() so no model instances are built, and iterator() so the result set is
+          read from a server-side cursor (or in chunks on SQLite) instead of cached in memory.
+        - Rows are ordered by primary key, which keeps the scan on the primary key index.
+    """
+    model, date_field, fields = EXPORT_DATASETS[dataset]
+
+    queryset = model.objects.order_by('pk')
+    if start_date is not None:
+        queryset = queryset.filter(**{f'{date_field}__gte': datetime.combine(start_date, time.min)})
+    if end_date is not None:
+        queryset = queryset.filter(**{f'{date_field}__lt': datetime.combine(end_date + timedelta(days=1), time.min)})
+
+    return list(fields), queryset.values(*fields).iterator(chunk_size=chunk_size)
+
+
+def iter_csv(fields, rows):
+    """
+    Yield an export as CSV lines, header first.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([row[field] for field in fields])
+
+
+def iter_ndjson(fields, rows):
+    """
+    Yield an export as newline-delimited JSON, one object per row.
+    """
+    for row in rows:
+        yield json.dumps({field: row[field] for field in fields}, cls=DjangoJSONEncoder) + '\n'
+
+
+def iter_export(dataset, file_format='csv', start_date=None, end_date=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the text chunks of an export in the requested format.
+
+    Args:
+        dataset (str): 'bookings' or 'payments'.
+        file_format (str): 'csv' or 'ndjson'.
+        start_date (date, optional): First day to include.
+        end_date (date, optional): Last day to include (inclusive).
+        chunk_size (int): Rows fetched per round trip.
+
+    Raises:
+        ValueError: If the dataset or format is unknown.
+    """
+    if dataset not in EXPORT_DATASETS:
+        raise ValueError(f"Unknown dataset '{dataset}'. Choose from: {', '.join(EXPORT_DATASETS)}.")
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{file_format}'. Choose from: {', '.join(EXPORT_FORMATS)}.")
+
+    fields, rows = export_rows(dataset, start_date, end_date, chunk_size)
+    if file_format == 'csv':
+        return iter_csv(fields, rows)
+    return iter_ndjson(fields, rows)
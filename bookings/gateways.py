@@ -0,0 +1,87 @@
+# bookings/gateways.py
+from django.conf import settings
+from django.utils.module_loading import import_string
+import logging
+logger = logging.getLogger(__name__)
+
+# Outcomes a gateway reports for a payment.
+PAYMENT_SUCCEEDED = 'succeeded'
+PAYMENT_PENDING = 'pending'
+PAYMENT_FAILED = 'failed'
+
+
+class PaymentGateway:
+    """
+    Interface the verify_payment task uses to ask the payment provider about a payment.
+    """
+
+    def verify(self, payment):
+        """
+        Args:
+            payment (Payment): The payment to check, usually by its transaction_id.
+
+        Returns:
+            str: PAYMENT_SUCCEEDED, PAYMENT_PENDING or PAYMENT_FAILED.
+        """
+        raise NotImplementedError
+
+
+class FakePaymentGateway(PaymentGateway):
+    """
+    Gateway for local development and tests. Reports `result` (FAKE_PAYMENT_GATEWAY_RESULT,
+    'succeeded' by default) for every payment and remembers which payments it was asked about.
+    Never configure it in production: it confirms any payment that names a transaction.
+    """
+
+    def __init__(self, result=None):
+        self.result = result or getattr(settings, 'FAKE_PAYMENT_GATEWAY_RESULT', PAYMENT_SUCCEEDED)
+        self.verified = []
+
+    def verify(self, payment):
+        self.verified.append(payment.pk)
+        return self.result
+
+
+class StripePaymentGateway(PaymentGateway):
+    """
+    Checks the Stripe PaymentIntent whose ID is stored in Payment.transaction_id.
+
+    Requires the `stripe` package and STRIPE_API_KEY. Network and API errors propagate, so the
+    task queue retries them with backoff.
+    """
+
+    def __init__(self):
+        import stripe
+
+        self.stripe = stripe
+        self.stripe.api_key = settings.STRIPE_API_KEY
+
+    def verify(self, payment):
+        if not payment.transaction_id:
+            return PAYMENT_FAILED
+        intent = self.stripe.PaymentIntent.retrieve(payment.transaction_id)
+        if intent.status == 'succeeded':
+            if intent.amount_received != int(payment.amount * 100) or intent.currency.lower() != payment.currency.lower():
+                logger.warning(f"Stripe amount mismatch for payment {payment.pk}: {intent.amount_received} {intent.currency}")
+                return PAYMENT_FAILED
+            return PAYMENT_SUCCEEDED
+        if intent.status in ('canceled', 'requires_payment_method'):
+            return PAYMENT_FAILED
+        return PAYMENT_PENDING
+
+
+_gateway = None
+
+
+def get_payment_gateway():
+    """Return the process-wide instance of the PAYMENT_GATEWAY class, or None if none is configured."""
+    global _gateway
+    if _gateway is None and getattr(settings, 'PAYMENT_GATEWAY', None):
+        _gateway = import_string(settings.PAYMENT_GATEWAY)()
+    return _gateway
+
+
+def reset_payment_gateway():
+    """Forget the cached gateway, e.g. after changing PAYMENT_GATEWAY in tests."""
+    global _gateway
+    _gateway = None
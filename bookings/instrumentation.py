@@ -0,0 +1,273 @@
+# bookings/instrumentation.py
+import bisect
+import contextvars
+import random
+import threading
+import time
+from collections import Counter
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+import logging
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the request duration histogram buckets (Prometheus convention:
+# cumulative, plus an implicit +Inf bucket).
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Route label for requests that did not resolve to a URL pattern.
+UNRESOLVED_ROUTE = '<unresolved>'
+
+# Most SQL statements written to the log for a single slow request.
+SLOW_REQUEST_MAX_QUERIES = 50
+
+# Recorder of the request being handled on this thread/task, read by the DRF serializer hook.
+_current_recorder = contextvars.ContextVar('bookings_performance_recorder', default=None)
+
+
+class RequestRecorder:
+    """
+    Per-request measurements: wall time, time and count of database queries, repeated SQL
+    and time spent producing serializer data.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook: time every statement sent to the database.
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.db_time += duration
+            self.queries.append((sql, duration))
+
+    @property
+    def duplicate_queries(self):
+        """Statements whose SQL text was already run in this request (the N+1 signature)."""
+        return len(self.queries) - len(Counter(sql for sql, _ in self.queries))
+
+
+class RouteStats:
+    """Running totals and a duration histogram for one route."""
+
+    def __init__(self):
+        self.count = 0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.wall_time = 0.0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.queries = 0
+        self.duplicate_queries = 0
+        self.max_wall_time = 0.0
+
+    def add(self, wall_time, recorder):
+        self.count += 1
+        index = bisect.bisect_left(DURATION_BUCKETS, wall_time)
+        if index < len(self.buckets):
+            self.buckets[index] += 1
+        self.wall_time += wall_time
+        self.db_time += recorder.db_time
+        self.serializer_time += recorder.serializer_time
+        self.queries += len(recorder.queries)
+        self.duplicate_queries += recorder.duplicate_queries
+        self.max_wall_time = max(self.max_wall_time, wall_time)
+
+    def cumulative_buckets(self):
+        total = 0
+        for count in self.buckets:
+            total += count
+            yield total
+
+
+class PerformanceRegistry:
+    """
+    Process-local per-route statistics. Each worker process keeps its own numbers, so scrape
+    every worker (or run a single one) to get the full picture.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._routes = {}
+
+    def record(self, route, method, wall_time, recorder):
+        with self._lock:
+            self._routes.setdefault((route, method), RouteStats()).add(wall_time, recorder)
+
+    def snapshot(self):
+        """Return {(route, method): RouteStats copy}, safe to read without the lock."""
+        with self._lock:
+            snapshot = {}
+            for key, stats in self._routes.items():
+                copy = RouteStats()
+                copy.__dict__.update(stats.__dict__, buckets=list(stats.buckets))
+                snapshot[key] = copy
+            return snapshot
+
+    def as_json(self):
+        routes = []
+        for (route, method), stats in sorted(self.snapshot().items()):
+            routes.append({
+                'route': route,
+                'method': method,
+                'count': stats.count,
+                'wall_time_seconds': {'sum': stats.wall_time, 'max': stats.max_wall_time},
+                'db_time_seconds': stats.db_time,
+                'serializer_time_seconds': stats.serializer_time,
+                'queries': stats.queries,
+                'duplicate_queries': stats.duplicate_queries,
+                'duration_buckets': {
+                    str(bound): count for bound, count in zip(DURATION_BUCKETS, stats.cumulative_buckets())
+                },
+            })
+        return {'routes': routes}
+
+    def as_prometheus(self):
+        lines = [
+            '# HELP bookings_request_duration_seconds Wall time of requests per route.',
+            '# TYPE bookings_request_duration_seconds histogram',
+        ]
+        snapshot = sorted(self.snapshot().items())
+        for (route, method), stats in snapshot:
+            labels = f'route="{_escape(route)}",method="{method}"'
+            for bound, count in zip(DURATION_BUCKETS, stats.cumulative_buckets()):
+                lines.append(f'bookings_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'bookings_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+            lines.append(f'bookings_request_duration_seconds_sum{{{labels}}} {stats.wall_time}')
+            lines.append(f'bookings_request_duration_seconds_count{{{labels}}} {stats.count}')
+
+        counters = (
+            ('bookings_request_db_seconds_total', 'Time spent in database queries per route.', 'db_time'),
+            ('bookings_request_serializer_seconds_total', 'Time spent producing serializer data per route.', 'serializer_time'),
+            ('bookings_request_queries_total', 'Database queries per route.', 'queries'),
+            ('bookings_request_duplicate_queries_total', 'Repeated SQL statements within a request, per route.', 'duplicate_queries'),
+        )
+        for name, help_text, attribute in counters:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for (route, method), stats in snapshot:
+                lines.append(f'{name}{{route="{_escape(route)}",method="{method}"}} {getattr(stats, attribute)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+performance_registry = PerformanceRegistry()
+
+
+def _timed_serializer_data(original):
+    """
+    Wrap BaseSerializer.data so the time spent building it is added to the current request.
+
+    Only the outermost .data access is counted; nested serializers render through
+    to_representation and are part of their parent's time.
+    """
+
+    def data(self):
+        recorder = _current_recorder.get()
+        if recorder is None:
+            return original.fget(self)
+        recorder.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return original.fget(self)
+        finally:
+            recorder.serializer_depth -= 1
+            if recorder.serializer_depth == 0:
+                recorder.serializer_time += time.perf_counter() - started
+
+    data._performance_hook = True
+    return property(data)
+
+
+def install_serializer_hook():
+    """Time serializer data for instrumented requests. Safe to call more than once."""
+    if not getattr(BaseSerializer.data.fget, '_performance_hook', False):
+        BaseSerializer.data = _timed_serializer_data(BaseSerializer.data)
+
+
+class PerformanceMiddleware:
+    """
+    Record wall time, database time, query count, duplicate queries and serializer time for
+    every request, keyed by URL route name (e.g. 'booking-list', 'find_available_table').
+
+    Settings:
+        PERFORMANCE_INSTRUMENTATION (bool): Turn the middleware on. When off, Django drops it
+                                            from the chain at startup, so it costs nothing.
+        SLOW_REQUEST_THRESHOLD_MS (int): Requests slower than this are logged with their SQL.
+        SLOW_REQUEST_SAMPLE_RATE (float): Share of slow requests that are logged (0.0 - 1.0).
+
+    Statistics are served by the performance_stats view. The middleware is sync and async
+    capable, so async views are not pushed through a sync adapter. Queries are captured on the
+    request thread only, so async views that run the ORM in worker threads report no database
+    time.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERFORMANCE_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.slow_threshold = getattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', 500) / 1000
+        self.slow_sample_rate = getattr(settings, 'SLOW_REQUEST_SAMPLE_RATE', 1.0)
+        install_serializer_hook()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = RequestRecorder()
+        token = _current_recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            with connections['default'].execute_wrapper(recorder):
+                response = self.get_response(request)
+        finally:
+            wall_time = time.perf_counter() - started
+            _current_recorder.reset(token)
+        self.record(request, response, wall_time, recorder)
+        return response
+
+    async def __acall__(self, request):
+        recorder = RequestRecorder()
+        token = _current_recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            wall_time = time.perf_counter() - started
+            _current_recorder.reset(token)
+        self.record(request, response, wall_time, recorder)
+        return response
+
+    def record(self, request, response, wall_time, recorder):
+        match = getattr(request, 'resolver_match', None)
+        route = (match.view_name if match else None) or UNRESOLVED_ROUTE
+        performance_registry.record(route, request.method, wall_time, recorder)
+
+        if wall_time >= self.slow_threshold and random.random() < self.slow_sample_rate:
+            self.log_slow_request(request, route, response, wall_time, recorder)
+
+    def log_slow_request(self, request, route, response, wall_time, recorder):
+        slowest = sorted(recorder.queries, key=lambda query: query[1], reverse=True)[:SLOW_REQUEST_MAX_QUERIES]
+        sql = '\n'.join(f"  {duration * 1000:.1f}ms {statement}" for statement, duration in slowest)
+        logger.warning(
+            f"Slow request {request.method} {request.get_full_path()} ({route}) -> {response.status_code}: "
+            f"{wall_time * 1000:.1f}ms total, {recorder.db_time * 1000:.1f}ms in {len(recorder.queries)} queries "
+            f"({recorder.duplicate_queries} duplicates), {recorder.serializer_time * 1000:.1f}ms serializing\n{sql}"
+        )
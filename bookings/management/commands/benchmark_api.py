@@ -0,0 +1,75 @@
+import json
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from bookings.benchmark import SCENARIOS, delete_benchmark_data, git_commit, run_scenario, seed_benchmark_data
+from bookings.models import Booking
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed users, tables and bookings, drive the booking API with concurrent clients and report "
+        "p50/p95/p99 latency, queries per request and throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help="Users to seed.")
+        parser.add_argument('--tables', type=int, default=40, help="Tables to seed.")
+        parser.add_argument('--bookings', type=int, default=5000, help="Bookings to seed (overlapping draws are skipped).")
+        parser.add_argument('--days', type=int, default=30, help="Seed bookings over this many days, starting tomorrow.")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per scenario.")
+        parser.add_argument('--concurrency', type=int, default=4, help="Concurrent client threads.")
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            choices=list(SCENARIOS),
+            help="Scenario to run; repeat for several. Defaults to all."
+        )
+        parser.add_argument('--seed', type=int, default=42, help="Random seed, so runs are reproducible.")
+        parser.add_argument('--output', help="Write the results as JSON to this file.")
+        parser.add_argument('--keep-data', action='store_true', help="Leave the seeded rows in the database.")
+
+    def handle(self, *args, **options):
+        for option in ('users', 'tables', 'days', 'requests', 'concurrency'):
+            if options[option] < 1:
+                raise CommandError(f"--{option} must be at least 1.")
+
+        rng = random.Random(options['seed'])
+        scenarios = options['scenario'] or list(SCENARIOS)
+
+        delete_benchmark_data()
+        data = seed_benchmark_data(options['users'], options['tables'], options['bookings'], options['days'], rng)
+        try:
+            results = {
+                'meta': {
+                    'timestamp': timezone.now().isoformat(),
+                    'git_commit': git_commit(),
+                    'database': connection.vendor,
+                    'seeded_bookings': Booking.objects.filter(user__in=data.users).count(),
+                    'parameters': {
+                        key: options[key]
+                        for key in ('users', 'tables', 'bookings', 'days', 'requests', 'concurrency', 'seed')
+                    },
+                },
+                'scenarios': {},
+            }
+            for name in scenarios:
+                summary = run_scenario(name, data, options['requests'], options['concurrency'], rng)
+                results['scenarios'][name] = summary
+                latency = summary['latency_ms']
+                self.stdout.write(
+                    f"{name:<20} p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms "
+                    f"queries={summary['queries_per_request']['mean']} rps={summary['throughput_rps']} "
+                    f"status={summary['status_codes']}"
+                )
+        finally:
+            if not options['keep_data']:
+                delete_benchmark_data()
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(results, output, indent=2)
+            self.stderr.write(self.style.SUCCESS(f"Wrote results to {options['output']}."))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from bookings.exports import iter_export, EXPORT_CHUNK_SIZE, EXPORT_DATASETS, EXPORT_FORMATS
+
+
+class Command(BaseCommand):
+    help = "Stream bookings or payments to a CSV or NDJSON file without loading them into memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', choices=list(EXPORT_DATASETS), default='bookings')
+        parser.add_argument('--file-format', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--start-date', help="First day to include (YYYY-MM-DD).")
+        parser.add_argument('--end-date', help="Last day to include (YYYY-MM-DD).")
+        parser.add_argument('--output', help="File to write to. Defaults to stdout.")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help="Rows fetched per query.")
+
+    def handle(self, *args, **options):
+        dates = {}
+        for option in ('start_date', 'end_date'):
+            if options[option]:
+                dates[option] = parse_date(options[option])
+                if dates[option] is None:
+                    raise CommandError(f"--{option.replace('_', '-')} must be in YYYY-MM-DD format.")
+
+        chunks = iter_export(
+            options['dataset'],
+            options['file_format'],
+            chunk_size=options['chunk_size'],
+            **dates
+        )
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                output.writelines(chunks)
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['dataset']} to {options['output']}."))
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,97 @@
+import csv
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models.functions import Lower
+
+from bookings.bulk import create_bookings_in_bulk
+from bookings.models import CustomUser
+from bookings.serializers import BulkBookingItemSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Create bookings from a CSV or JSON file. Each batch is allocated against one availability "
+        "snapshot and saved with a single bulk insert; failed rows are reported and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help=(
+                "CSV file with a header row, or a JSON list of objects. Columns: email (or user_id), "
+                "number_of_guests, booking_datetime, seating_type_id, and optionally occasion_id "
+                "and special_request."
+            )
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help="Rows allocated and inserted per transaction.")
+        parser.add_argument('--dry-run', action='store_true', help="Validate and allocate without saving anything.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        rows = self.read_rows(options['path'])
+        emails = {row['email'].strip().lower() for row in rows if row.get('email')}
+        # Emails are matched case-insensitively, on both sides
+        user_ids = {
+            email: pk
+            for email, pk in CustomUser.objects.annotate(email_lower=Lower('email')).filter(
+                email_lower__in=emails
+            ).values_list('email_lower', 'id')
+        } if emails else {}
+
+        items = []
+        failed = 0
+        for line, row in enumerate(rows, start=1):
+            row = {key: value for key, value in row.items() if value not in ('', None)}
+            email = row.pop('email', None)
+            if email:
+                row['user_id'] = user_ids.get(email.strip().lower())
+                if row['user_id'] is None:
+                    self.stderr.write(f"Row {line}: unknown user {email}.")
+                    failed += 1
+                    continue
+            serializer = BulkBookingItemSerializer(data=row)
+            if not serializer.is_valid():
+                self.stderr.write(f"Row {line}: {dict(serializer.errors)}")
+                failed += 1
+                continue
+            items.append((line, serializer.validated_data))
+
+        created = 0
+        batch_size = options['batch_size']
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            results = create_bookings_in_bulk([item for _, item in batch], dry_run=options['dry_run'])
+            for (line, _), result in zip(batch, results):
+                if 'errors' in result:
+                    self.stderr.write(f"Row {line}: {result['errors']}")
+                    failed += 1
+                else:
+                    booking = result['booking']
+                    self.stdout.write(
+                        f"Row {line}: table {booking.table.table_number} at {booking.booking_datetime:%Y-%m-%d %H:%M}, "
+                        f"total {booking.total_price}"
+                    )
+                    created += 1
+
+        verb = "Would create" if options['dry_run'] else "Created"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {created} bookings; {failed} rows failed."))
+
+    def read_rows(self, path):
+        try:
+            with open(path, newline='', encoding='utf-8') as source:
+                if os.path.splitext(path)[1].lower() == '.json':
+                    rows = json.load(source)
+                    if isinstance(rows, dict):
+                        rows = rows.get('bookings')
+                else:
+                    rows = list(csv.DictReader(source))
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read {path}: {e}")
+
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise CommandError("A JSON file must hold a list of booking objects.")
+        return rows
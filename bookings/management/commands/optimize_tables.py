@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from bookings.assignment import plan_table_assignments, apply_table_assignment_plan
+
+
+class Command(BaseCommand):
+    help = "Reassign a day's pending and confirmed bookings to tables to maximize seated covers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('date', help="Day to optimize (YYYY-MM-DD).")
+        parser.add_argument(
+            '--apply',
+            action='store_true',
+            help="Save the new assignment. Without this flag the plan is only reported."
+        )
+
+    def handle(self, *args, **options):
+        day = parse_date(options['date'])
+        if day is None:
+            raise CommandError("date must be in YYYY-MM-DD format.")
+
+        plan = plan_table_assignments(day)
+
+        self.stdout.write(f"Seated covers: {plan.current_seated_covers} now, {plan.seated_covers} with the plan")
+        for booking_id, old_table_id, new_table_id in plan.moves:
+            self.stdout.write(f"  Booking {booking_id}: table {old_table_id} -> {new_table_id}")
+        if plan.unseated:
+            self.stdout.write(self.style.WARNING(
+                f"Could not seat bookings: {', '.join(str(booking_id) for booking_id in plan.unseated)}"
+            ))
+
+        if options['apply']:
+            moved = apply_table_assignment_plan(plan)
+            self.stdout.write(self.style.SUCCESS(f"Moved {moved} bookings."))
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils.dateparse import parse_date
+
+from bookings.models import Booking
+from bookings.reporting import rebuild_daily_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily occupancy and revenue rollup from the bookings table, e.g. after "
+        "changing time slots or restoring data. Defaults to the whole booking history."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', help="First day to rebuild (YYYY-MM-DD).")
+        parser.add_argument('--end-date', help="Last day to rebuild (YYYY-MM-DD).")
+        parser.add_argument('--window-days', type=int, default=31, help="Days rebuilt per transaction.")
+
+    def handle(self, *args, **options):
+        if options['window_days'] < 1:
+            raise CommandError("--window-days must be at least 1.")
+
+        dates = {}
+        for option in ('start_date', 'end_date'):
+            if options[option]:
+                dates[option] = parse_date(options[option])
+                if dates[option] is None:
+                    raise CommandError(f"--{option.replace('_', '-')} must be in YYYY-MM-DD format.")
+
+        if len(dates) < 2:
+            bounds = Booking.objects.aggregate(first=Min('booking_datetime'), last=Max('booking_datetime'))
+            if bounds['first'] is None:
+                self.stderr.write("No bookings to summarize.")
+                return
+            dates.setdefault('start_date', bounds['first'].date())
+            dates.setdefault('end_date', bounds['last'].date())
+
+        start_date, end_date = dates['start_date'], dates['end_date']
+        if end_date < start_date:
+            raise CommandError("--end-date cannot be before --start-date.")
+
+        rows = 0
+        window = timedelta(days=options['window_days'])
+        while start_date <= end_date:
+            window_end = min(start_date + window - timedelta(days=1), end_date)
+            rows += rebuild_daily_summaries(start_date, window_end)
+            start_date = window_end + timedelta(days=1)
+
+        self.stderr.write(self.style.SUCCESS(f"Wrote {rows} summary rows up to {end_date}."))
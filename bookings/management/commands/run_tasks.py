@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from bookings.taskqueue import default_worker_id, run_due_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background tasks (payment verification, booking emails, ...), retrying "
+        "failures with exponential backoff. Start as many workers as needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run the tasks that are due now, then exit.")
+        parser.add_argument('--batch-size', type=int, default=10, help="Tasks claimed per round.")
+        parser.add_argument('--sleep', type=float, default=2.0, help="Seconds to wait when no task is due.")
+        parser.add_argument('--worker-id', default=None, help="Name recorded on claimed tasks. Defaults to host-pid.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        worker_id = options['worker_id'] or default_worker_id()
+        total = 0
+        try:
+            while True:
+                close_old_connections()
+                results = run_due_tasks(options['batch_size'], worker_id)
+                for task, status in results:
+                    self.stdout.write(f"{task.name} #{task.pk} attempt {task.attempts}: {status}")
+                total += len(results)
+                if not results:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stderr.write(self.style.SUCCESS(f"Worker {worker_id} ran {total} tasks."))
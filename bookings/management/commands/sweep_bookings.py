@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from bookings.sweeper import sweep_bookings
+
+
+class Command(BaseCommand):
+    help = (
+        "Expire unpaid pending bookings past their payment hold and mark past confirmed bookings "
+        "as no-shows. Run it from cron, or keep it running with --interval."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            help="Sweep every this many seconds until interrupted, instead of once."
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        if interval is not None and interval <= 0:
+            raise CommandError("--interval must be positive.")
+
+        try:
+            while True:
+                close_old_connections()
+                counts = sweep_bookings()
+                self.stdout.write(f"Expired {counts['expired']} bookings, marked {counts['no_show']} as no-show.")
+                if interval is None:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
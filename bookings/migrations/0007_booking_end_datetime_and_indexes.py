@@ -0,0 +1,36 @@
+# Generated by Django 5.2.3 on 2026-10-17 16:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_alter_booking_booking_datetime'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='booking_end_datetime',
+            field=models.DateTimeField(editable=False, help_text="Derived from booking_datetime and the matching time slot's booking duration.", null=True),
+        ),
+        migrations.AddField(
+            model_name='timeslot',
+            name='booking_duration',
+            field=models.DurationField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='currency',
+            field=models.CharField(default='USD', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['table', 'booking_datetime', 'booking_end_datetime'], name='booking_table_window_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'booking_datetime'], name='booking_status_datetime_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, transaction
+from django.db.models import F
+
+BATCH_SIZE = 1000
+
+
+def backfill_booking_end_datetime(apps, schema_editor):
+    """
+    Set booking_end_datetime on existing bookings in primary-key batches.
+
+    Each batch is a single UPDATE in its own short transaction, so the table is
+    never locked for the whole backfill. No time slot has a booking_duration yet
+    when this runs, so every row gets the default duration.
+    """
+    Booking = apps.get_model('bookings', 'Booking')
+    duration = getattr(settings, 'BOOKING_DURATION', timedelta(hours=2))
+
+    pending = Booking.objects.filter(booking_end_datetime__isnull=True)
+    last_id = 0
+    while True:
+        batch_ids = list(
+            pending.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:BATCH_SIZE]
+        )
+        if not batch_ids:
+            break
+        with transaction.atomic():
+            Booking.objects.filter(id__in=batch_ids).update(
+                booking_end_datetime=F('booking_datetime') + duration
+            )
+        last_id = batch_ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('bookings', '0007_booking_end_datetime_and_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_booking_end_datetime, migrations.RunPython.noop),
+    ]
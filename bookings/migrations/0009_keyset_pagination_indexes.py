@@ -0,0 +1,26 @@
+# Generated by Django 5.2.3 on 2026-10-17 16:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('bookings', '0008_backfill_booking_end_datetime'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['booking_datetime', 'id'], name='booking_datetime_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['created_at', 'id'], name='user_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['created_at', 'id'], name='payment_created_id_idx'),
+        ),
+    ]
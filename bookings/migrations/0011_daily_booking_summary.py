@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0010_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBookingSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('bookings', models.PositiveIntegerField(default=0)),
+                ('guests', models.PositiveIntegerField(default=0)),
+                ('paid_bookings', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('tables_used', models.PositiveIntegerField(default=0)),
+                ('tables_available', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('seating_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='bookings.seatingtype')),
+                ('time_slot', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='bookings.timeslot')),
+            ],
+            options={
+                'verbose_name_plural': 'Daily booking summaries',
+                'ordering': ['date', 'time_slot_id', 'seating_type_id'],
+                'indexes': [models.Index(fields=['date'], name='summary_date_idx')],
+            },
+        ),
+    ]
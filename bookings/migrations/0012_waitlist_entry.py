@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0011_daily_booking_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number_of_guests', models.PositiveIntegerField()),
+                ('booking_datetime', models.DateTimeField()),
+                ('special_request', models.TextField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('waiting', 'Waiting'), ('booked', 'Booked'), ('cancelled', 'Cancelled')], default='waiting', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('booking', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='waitlist_entry', to='bookings.booking')),
+                ('occasion', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='bookings.occasion')),
+                ('seating_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='bookings.seatingtype')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Waitlist entries',
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'seating_type', 'booking_datetime'], name='waitlist_match_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0012_waitlist_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='table',
+            name='adjacent_tables',
+            field=models.ManyToManyField(blank=True, to='bookings.table'),
+        ),
+        migrations.CreateModel(
+            name='BookingTable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='additional_tables', to='bookings.booking')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='combined_bookings', to='bookings.table')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('booking', 'table'), name='unique_booking_table')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0013_table_combinations'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'created_at'], name='booking_status_created_idx'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.core.exceptions import ValidationError
 from django.conf import settings
+from datetime import timedelta
 
 # Create your models here.
 
@@ -117,6 +118,11 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name']
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='user_created_id_idx'),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -206,6 +212,8 @@ class Table(models.Model):
         seating_type (ForeignKey): The type of seating this table belongs to, linked to SeatingType.
         capacity (PositiveIntegerField): The maximum number of guests the table can hold.
         is_active (BooleanField): Indicates if the table is currently available for use.
+        adjacent_tables (ManyToManyField): Tables next to this one that it can be pushed together
+                                           with to seat a larger party (symmetrical).
     """
 
     table_number = models.CharField(
@@ -216,6 +224,7 @@ class Table(models.Model):
     seating_type = models.ForeignKey('SeatingType', on_delete=models.PROTECT)
     capacity = models.PositiveIntegerField()
     is_active = models.BooleanField(default=True)
+    adjacent_tables = models.ManyToManyField('self', symmetrical=True, blank=True)
 
     def __str__(self):
         """
@@ -237,6 +246,7 @@ class Booking(models.Model):
         user (ForeignKey): The user who made the booking.
         number_of_guests (PositiveIntegerField): Number of guests for the reservation.
         booking_datetime (DateTimeField): Date and time of the booking.
+        booking_end_datetime (DateTimeField): Date and time the table is released, derived on save.
         occasion (ForeignKey): Optional special occasion (e.g., Birthday, Anniversary).
         table (ForeignKey): Table assigned for the booking.
         special_request (TextField): Any user-entered special requests (e.g., "Gluten-free meal").
@@ -256,6 +266,11 @@ class Booking(models.Model):
     )
     number_of_guests = models.PositiveIntegerField()
     booking_datetime = models.DateTimeField()
+    booking_end_datetime = models.DateTimeField(
+        null=True,
+        editable=False,
+        help_text="Derived from booking_datetime and the matching time slot's booking duration."
+    )
     occasion = models.ForeignKey('Occasion', on_delete=models.SET_NULL, null=True)
     table = models.ForeignKey('Table', on_delete=models.PROTECT)
     special_request = models.TextField(blank=True, null=True)
@@ -278,6 +293,28 @@ class Booking(models.Model):
     base_price_per_guest = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     total_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
 
+    def save(self, *args, **kwargs):
+        """
+        Override save to keep booking_end_datetime in step with booking_datetime,
+        so overlap checks can filter on a stored, indexed column.
+        """
+        if self.booking_datetime:
+            self.booking_end_datetime = self.booking_datetime + TimeSlot.get_booking_duration(self.booking_datetime)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'booking_datetime' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'booking_end_datetime'}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored start time and status, so signal handlers can tell when a booking
+        # moves to another day or releases its table
+        loaded = dict(zip(field_names, values))
+        instance._loaded_booking_datetime = loaded.get('booking_datetime')
+        instance._loaded_status = loaded.get('status')
+        return instance
+
     def __str__(self):
         """
         String representation of the booking instance.
@@ -291,6 +328,42 @@ class Booking(models.Model):
     class Meta:
         ordering = ['-booking_datetime']
         verbose_name_plural = "Bookings"
+        indexes = [
+            models.Index(fields=['table', 'booking_datetime', 'booking_end_datetime'], name='booking_table_window_idx'),
+            models.Index(fields=['status', 'booking_datetime'], name='booking_status_datetime_idx'),
+            models.Index(fields=['status', 'created_at'], name='booking_status_created_idx'),
+            models.Index(fields=['booking_datetime', 'id'], name='booking_datetime_id_idx'),
+        ]
+
+class BookingTable(models.Model):
+    """
+    An additional table held by a booking seated across a combination of adjacent tables.
+
+    The booking's own `table` is the largest table of the combination; the others are stored
+    here. Availability checks read these rows together with Booking.table (see
+    held_table_intervals in bookings/availability.py).
+
+    Fields:
+        booking (ForeignKey): The combined booking.
+        table (ForeignKey): One of its additional tables.
+    """
+
+    booking = models.ForeignKey('Booking', on_delete=models.CASCADE, related_name='additional_tables')
+    table = models.ForeignKey('Table', on_delete=models.PROTECT, related_name='combined_bookings')
+
+    def __str__(self):
+        """
+        String representation of the held table.
+
+        Returns:
+            str: The booking and table IDs.
+        """
+        return f"Booking {self.booking_id} also holds table {self.table_id}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['booking', 'table'], name='unique_booking_table'),
+        ]
 
 class Payment(models.Model):
     """
@@ -329,7 +402,12 @@ class Payment(models.Model):
         Returns:
             str: A brief summary of the payment with amount, currency, and booking ID.
         """
-        return f"Payment of {self.amount} {self.currency} for Booking {self.booking.id}"
+        return f"Payment of {self.amount} {self.currency} for Booking {self.booking_id}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='payment_created_id_idx'),
+        ]
 
 class TimeSlot(models.Model):
     """
@@ -341,12 +419,33 @@ class TimeSlot(models.Model):
         end_time (TimeField): End time of the slot; must be after start_time.
         label (CharField): Optional descriptive label for the slot (e.g., "Lunch", "Dinner").
         base_price_per_guest (DecimalField): Base price applied per guest during this slot.
+        booking_duration (DurationField): Optional table holding time for bookings starting in this slot.
+                                          Falls back to settings.BOOKING_DURATION when not set.
     """
 
     start_time = models.TimeField()
     end_time = models.TimeField()
     label = models.CharField(max_length=50, blank=True)
     base_price_per_guest = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    booking_duration = models.DurationField(null=True, blank=True)
+
+    @classmethod
+    def get_booking_duration(cls, booking_datetime, slot_table=None):
+        """
+        Return how long a booking starting at booking_datetime holds its table.
+
+        Uses the booking_duration of the time slot containing the start time if one is set,
+        otherwise settings.BOOKING_DURATION (2 hours by default). Slots are read from the
+        cached slot table, so this runs no queries on the hot path. Async callers pass the
+        table they got from time_slot_cache.aget_table() as `slot_table`.
+        """
+        from .slots import time_slot_cache
+
+        if slot_table is None:
+            slot_table = time_slot_cache.get_table()
+        matches = slot_table.lookup(booking_datetime.time())
+        slot_duration = next((slot.booking_duration for slot in matches if slot.booking_duration), None)
+        return slot_duration or getattr(settings, 'BOOKING_DURATION', timedelta(hours=2))
 
     def clean(self):
         """
@@ -378,4 +477,168 @@ class TimeSlot(models.Model):
             return f"{self.label} ({self.start_time.strftime(time_format)} - {self.end_time.strftime(time_format)})"
         return f"{self.start_time.strftime(time_format)} - {self.end_time.strftime(time_format)}"
 
-    
\ No newline at end of file
+    
+class TaskStatus(models.TextChoices):
+    QUEUED = 'queued', 'Queued'
+    RUNNING = 'running', 'Running'
+    SUCCEEDED = 'succeeded', 'Succeeded'
+    FAILED = 'failed', 'Failed'
+
+class Task(models.Model):
+    """
+    A unit of background work stored in the database and run by the run_tasks worker.
+
+    Tasks are written in the same transaction as the change that caused them, so a rolled back
+    request never leaves a task behind and a committed one never loses it (see bookings/taskqueue.py).
+
+    Fields:
+        name (CharField): Registered name of the handler to run (e.g. 'verify_payment').
+        payload (JSONField): Keyword arguments passed to the handler.
+        status (CharField): Queued, running, succeeded or failed.
+        attempts (PositiveIntegerField): Number of times the task has been started.
+        max_attempts (PositiveIntegerField): Attempts after which a failing task is given up.
+        run_after (DateTimeField): Earliest time the task may run; pushed back on every retry.
+        locked_by (CharField): Claim token of the worker running the task.
+        locked_at (DateTimeField): When the task was claimed; stale claims are picked up again.
+        last_error (TextField): Error from the latest failed attempt.
+        created_at (DateTimeField): Timestamp when the task was queued.
+        updated_at (DateTimeField): Timestamp of the latest update.
+    """
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=TaskStatus.choices, default=TaskStatus.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField()
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        """
+        String representation of the task.
+
+        Returns:
+            str: The handler name, task ID and status.
+        """
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='task_status_run_after_idx'),
+        ]
+
+class DailyBookingSummary(models.Model):
+    """
+    Reporting rollup of bookings for one day, time slot and seating type.
+
+    Rows are rebuilt per day from the bookings of that day (see bookings/reporting.py), so
+    reports read a handful of rows whatever the size of the booking history. Cancelled and
+    expired bookings are not counted.
+
+    Fields:
+        date (DateField): Day of the bookings.
+        time_slot (ForeignKey): Time slot the bookings start in; null for bookings outside every slot.
+        seating_type (ForeignKey): Seating type of the booked tables.
+        bookings (PositiveIntegerField): Number of bookings.
+        guests (PositiveIntegerField): Covers, the sum of number_of_guests.
+        paid_bookings (PositiveIntegerField): Bookings whose payment_status is paid.
+        revenue (DecimalField): Sum of total_price.
+        paid_revenue (DecimalField): Sum of total_price over paid bookings.
+        tables_used (PositiveIntegerField): Distinct tables booked.
+        tables_available (PositiveIntegerField): Active tables of the seating type when the row was built.
+        updated_at (DateTimeField): When the row was last rebuilt.
+    """
+
+    date = models.DateField()
+    time_slot = models.ForeignKey('TimeSlot', on_delete=models.SET_NULL, null=True, blank=True)
+    seating_type = models.ForeignKey('SeatingType', on_delete=models.CASCADE)
+    bookings = models.PositiveIntegerField(default=0)
+    guests = models.PositiveIntegerField(default=0)
+    paid_bookings = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    tables_used = models.PositiveIntegerField(default=0)
+    tables_available = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        """
+        String representation of the summary row.
+
+        Returns:
+            str: The day, time slot and seating type IDs with the booking count.
+        """
+        return f"{self.date} slot {self.time_slot_id} seating {self.seating_type_id}: {self.bookings} bookings"
+
+    class Meta:
+        ordering = ['date', 'time_slot_id', 'seating_type_id']
+        verbose_name_plural = "Daily booking summaries"
+        indexes = [
+            models.Index(fields=['date'], name='summary_date_idx'),
+        ]
+
+class WaitlistStatus(models.TextChoices):
+    WAITING = 'waiting', 'Waiting'
+    BOOKED = 'booked', 'Booked'
+    CANCELLED = 'cancelled', 'Cancelled'
+
+class WaitlistEntry(models.Model):
+    """
+    A party waiting for a table at a time when none was free.
+
+    When a booking releases its table, the waiting entries it can seat are booked onto it in
+    order of arrival (see bookings/waitlist.py).
+
+    Fields:
+        user (ForeignKey): The user waiting for a table.
+        number_of_guests (PositiveIntegerField): Size of the party.
+        booking_datetime (DateTimeField): Requested start time.
+        seating_type (ForeignKey): Requested seating type.
+        occasion (ForeignKey): Optional special occasion, copied to the booking.
+        special_request (TextField): Optional special request, copied to the booking.
+        status (CharField): Waiting, booked or cancelled.
+        booking (OneToOneField): The booking made for the entry once it was promoted.
+        created_at (DateTimeField): When the party joined the waitlist; earlier entries go first.
+        updated_at (DateTimeField): Timestamp of the latest update.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries'
+    )
+    number_of_guests = models.PositiveIntegerField()
+    booking_datetime = models.DateTimeField()
+    seating_type = models.ForeignKey('SeatingType', on_delete=models.PROTECT)
+    occasion = models.ForeignKey('Occasion', on_delete=models.SET_NULL, null=True, blank=True)
+    special_request = models.TextField(blank=True, null=True)
+    status = models.CharField(max_length=20, choices=WaitlistStatus.choices, default=WaitlistStatus.WAITING)
+    booking = models.OneToOneField(
+        'Booking',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='waitlist_entry'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        """
+        String representation of the waitlist entry.
+
+        Returns:
+            str: The entry ID, party size, requested time and status.
+        """
+        return f"Waitlist {self.pk}: {self.number_of_guests} guests on {self.booking_datetime:%Y-%m-%d @ %H:%M} ({self.status})"
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        verbose_name_plural = "Waitlist entries"
+        indexes = [
+            models.Index(fields=['status', 'seating_type', 'booking_datetime'], name='waitlist_match_idx'),
+        ]
@@ -0,0 +1,51 @@
+# bookings/pagination.py
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+# Query parameter that switches a list endpoint from page numbers to cursors.
+PAGINATION_QUERY_PARAM = 'pagination'
+CURSOR_PAGINATION = 'cursor'
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination with a per-view ordering.
+
+    Unlike PageNumberPagination, no COUNT(*) is run and pages are fetched with
+    `WHERE key < last_seen ORDER BY key LIMIT n` instead of OFFSET, so any page costs
+    the same as the first one as long as an index covers the ordering.
+
+    Responses have the shape {"next": url|null, "previous": url|null, "results": [...]}.
+
+    Args:
+        ordering (tuple): Ordering for the page, most significant field first. The last
+                          field should be unique (usually the primary key) so the order is total.
+    """
+    page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 10)
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = ordering
+
+
+class CursorPaginationMixin:
+    """
+    ViewSet mixin adding an opt-in cursor mode to the default page-number pagination.
+
+    `?pagination=cursor` pages with KeysetCursorPagination ordered by `cursor_ordering`;
+    without it the endpoint keeps the global paginator, so existing clients see no change.
+    Views must apply the same ordering to their queryset for page-number mode to match.
+    """
+    cursor_ordering = ('-id',)
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            request = getattr(self, 'request', None)
+            if request is not None and request.query_params.get(PAGINATION_QUERY_PARAM) == CURSOR_PAGINATION:
+                self._paginator = KeysetCursorPagination(ordering=self.cursor_ordering)
+            else:
+                self._paginator = super().paginator
+        return self._paginator
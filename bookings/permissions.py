@@ -1,4 +1,5 @@
 from rest_framework import permissions
+from .roles import request_is_manager
 
 class IsSuperUser(permissions.BasePermission):
     """
@@ -27,16 +28,16 @@ class IsManager(permissions.BasePermission):
     - has_permission: Checks if the requesting user is authenticated and is in the 'Manager' group.
     - has_object_permission: Further restricts object-level actions to only Managers,
                              allowing only safe and modifying HTTP methods.
+
+    Group membership is resolved once per request and cached per user (see bookings/roles.py),
+    so the two checks share a single lookup.
     """
     
     def has_permission(self, request, view):
         user = request.user
-        return user and user.is_authenticated and (
-            user.groups.filter(name="Manager").exists()
-        )
+        return bool(user and user.is_authenticated and request_is_manager(request))
 
     def has_object_permission(self, request, view, obj):
-        user = request.user
-        if user.groups.filter(name="Manager").exists():
+        if request_is_manager(request):
             return request.method in ['GET', 'PUT', 'PATCH', 'DELETE']
         return False
\ No newline at end of file
@@ -1,8 +1,13 @@
 # your_app/pricing.py
 
-from .models import TimeSlot
+import asyncio
+from .models import SeatingType, TimeSlot
+from .slots import get_time_slot, aget_time_slot
 from rest_framework.exceptions import ValidationError
 
+# Largest number of quotes accepted by quote_booking_prices in one call.
+MAX_QUOTES_PER_REQUEST = 50
+
 def calculate_booking_price(number_of_guests: int, booking_datetime, seating_type):
     """
     Calculate the total price for a booking based on the number of guests,
@@ -23,23 +28,103 @@ def calculate_booking_price(number_of_guests: int, booking_datetime, seating_typ
         ValidationError: If the booking time doesn't fall into any time slot,
                          or if overlapping time slots are configured,
                          or if number_of_guests is not positive.
-    """
-    booking_time = booking_datetime.time()
 
+    Notes:
+        - The time slot is resolved from the process-local cached slot table (bookings/slots.py),
+          so pricing runs no queries on the hot path.
+    """
     try:
         # Find the TimeSlot where the booking time fits between start_time and end_time
-        time_slot = TimeSlot.objects.get(start_time__lte=booking_time, end_time__gte=booking_time)
-    except TimeSlot.DoesNotExist:
+        time_slot = get_time_slot(booking_datetime)
+    except (TimeSlot.DoesNotExist, TimeSlot.MultipleObjectsReturned) as e:
+        raise _time_slot_error(e)
+
+    return _price_for_slot(number_of_guests, time_slot, seating_type)
+
+
+async def acalculate_booking_price(number_of_guests: int, booking_datetime, seating_type_id):
+    """
+    Async counterpart of calculate_booking_price that takes a seating type ID.
+
+    The SeatingType fetch and the time slot resolution run concurrently.
+
+    Returns:
+        tuple: (total_price, time_slot, seating_type).
+
+    Raises:
+        SeatingType.DoesNotExist: If no active seating type has the given ID.
+        ValidationError: As calculate_booking_price.
+    """
+    try:
+        seating_type, time_slot = await asyncio.gather(
+            SeatingType.objects.filter(is_active=True).aget(pk=seating_type_id),
+            aget_time_slot(booking_datetime)
+        )
+    except (TimeSlot.DoesNotExist, TimeSlot.MultipleObjectsReturned) as e:
+        raise _time_slot_error(e)
+
+    return _price_for_slot(number_of_guests, time_slot, seating_type), time_slot, seating_type
+
+
+def _time_slot_error(exc):
+    if isinstance(exc, TimeSlot.DoesNotExist):
         # No matching time slot found; this should ideally be validated earlier
-        raise ValidationError({"booking_datetime": "The selected time is not within any available booking slots."})
-    except TimeSlot.MultipleObjectsReturned:
-        # Overlapping time slots indicate a configuration error
-        raise ValidationError({"error": "A configuration error occurred. Please contact support."})
+        return ValidationError({"booking_datetime": "The selected time is not within any available booking slots."})
+    # Overlapping time slots indicate a configuration error
+    return ValidationError({"error": "A configuration error occurred. Please contact support."})
+
 
+def _price_for_slot(number_of_guests, time_slot, seating_type):
     if number_of_guests <= 0:
         raise ValidationError({"number_of_guests": "Number of guests must be positive."})
 
     base_price = time_slot.base_price_per_guest * number_of_guests
     total_price = base_price * seating_type.price_multiplier
 
-    return round(total_price, 2)
\ No newline at end of file
+    return round(total_price, 2)
+
+
+def quote_booking_prices(quotes):
+    """
+    Price many (guests, datetime, seating type) combinations at once.
+
+    Args:
+        quotes (list[dict]): Validated quote requests, each with number_of_guests,
+                             booking_datetime and seating_type_id.
+
+    Returns:
+        list[dict]: One result per quote, in request order. Successful items carry
+                    total_price, base_price_per_guest and price_multiplier; failed items
+                    carry an errors dict instead. Every item carries its request index.
+
+    Notes:
+        - All seating types are fetched with a single query and time slots come from the
+          cached slot table, so the whole batch runs one query.
+        - Prices go through calculate_booking_price, keeping Decimal arithmetic and rounding
+          identical to single quotes.
+    """
+    seating_types = SeatingType.objects.filter(is_active=True).in_bulk(
+        {quote['seating_type_id'] for quote in quotes}
+    )
+
+    results = []
+    for index, quote in enumerate(quotes):
+        seating_type = seating_types.get(quote['seating_type_id'])
+        if seating_type is None:
+            results.append({'index': index, 'errors': {'seating_type_id': 'Invalid seating type.'}})
+            continue
+        try:
+            total_price = calculate_booking_price(quote['number_of_guests'], quote['booking_datetime'], seating_type)
+        except ValidationError as e:
+            results.append({'index': index, 'errors': e.detail})
+            continue
+        results.append({
+            'index': index,
+            'number_of_guests': quote['number_of_guests'],
+            'booking_datetime': quote['booking_datetime'],
+            'seating_type_id': seating_type.id,
+            'base_price_per_guest': get_time_slot(quote['booking_datetime']).base_price_per_guest,
+            'price_multiplier': seating_type.price_multiplier,
+            'total_price': total_price,
+        })
+    return results
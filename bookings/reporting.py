@@ -0,0 +1,183 @@
+# bookings/reporting.py
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from .availability import RELEASED_BOOKING_STATUSES
+from .models import Booking, BookingTable, DailyBookingSummary, PaymentStatus, Table, Task, TaskStatus
+from .slots import time_slot_cache
+from .taskqueue import enqueue_many
+import logging
+logger = logging.getLogger(__name__)
+
+# Longest date range, in days, that the reporting endpoint accepts.
+MAX_REPORT_DAYS = 366
+
+# Bookings read per query when rebuilding summaries.
+SUMMARY_CHUNK_SIZE = 2000
+
+# Summary refreshes are queued this far in the future, so a burst of changes to the same day
+# is folded into a single refresh.
+SUMMARY_REFRESH_DELAY = timedelta(seconds=10)
+
+
+def rebuild_daily_summaries(start_date, end_date):
+    """
+    Recompute the DailyBookingSummary rows of every day from start_date to end_date (inclusive).
+
+    Args:
+        start_date (date): First day to rebuild.
+        end_date (date): Last day to rebuild.
+
+    Returns:
+        int: Number of summary rows written.
+
+    Behavior:
+    - Streams the range's bookings once, in chunks of SUMMARY_CHUNK_SIZE; only the summary
+      buckets are kept in memory. A second streamed query reads the additional tables of
+      combined bookings (BookingTable), so tables_used counts every table a party sits at.
+    - Each booking is attributed to the time slot its start time falls in (latest starting slot
+      when slots overlap), using the cached slot table.
+    - The range's old rows are deleted and the new ones inserted with bulk_create in one
+      transaction, so readers never see a half-built day.
+    """
+    range_start = datetime.combine(start_date, time.min)
+    range_end = datetime.combine(end_date + timedelta(days=1), time.min)
+
+    slot_table = time_slot_cache.get_table()
+    tables_available = dict(
+        Table.objects.filter(is_active=True).values_list('seating_type_id').annotate(Count('id')).order_by()
+    )
+    rows = Booking.objects.filter(
+        booking_datetime__gte=range_start,
+        booking_datetime__lt=range_end,
+    ).exclude(status__in=RELEASED_BOOKING_STATUSES).order_by().values_list(
+        'booking_datetime', 'number_of_guests', 'total_price', 'payment_status', 'table_id', 'table__seating_type_id'
+    )
+
+    buckets = {}
+    def bucket_key(start, seating_type_id):
+        matches = slot_table.lookup(start.time(), limit=1)
+        return start.date(), matches[0].id if matches else None, seating_type_id
+
+    for start, guests, total_price, payment_status, table_id, seating_type_id in rows.iterator(chunk_size=SUMMARY_CHUNK_SIZE):
+        key = bucket_key(start, seating_type_id)
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = DailyBookingSummary(
+                date=key[0],
+                time_slot_id=key[1],
+                seating_type_id=seating_type_id,
+                revenue=Decimal('0.00'),
+                paid_revenue=Decimal('0.00'),
+                tables_available=tables_available.get(seating_type_id, 0),
+            )
+            bucket.table_ids = set()
+        price = total_price or Decimal('0.00')
+        bucket.bookings += 1
+        bucket.guests += guests
+        bucket.revenue += price
+        if payment_status == PaymentStatus.PAID:
+            bucket.paid_bookings += 1
+            bucket.paid_revenue += price
+        bucket.table_ids.add(table_id)
+
+    held = BookingTable.objects.filter(
+        booking__booking_datetime__gte=range_start,
+        booking__booking_datetime__lt=range_end,
+    ).exclude(booking__status__in=RELEASED_BOOKING_STATUSES).order_by().values_list(
+        'booking__booking_datetime', 'booking__table__seating_type_id', 'table_id'
+    )
+    for start, seating_type_id, table_id in held.iterator(chunk_size=SUMMARY_CHUNK_SIZE):
+        bucket = buckets.get(bucket_key(start, seating_type_id))
+        if bucket is not None:
+            bucket.table_ids.add(table_id)
+
+    for bucket in buckets.values():
+        bucket.tables_used = len(bucket.table_ids)
+
+    with transaction.atomic():
+        DailyBookingSummary.objects.filter(date__gte=start_date, date__lte=end_date).delete()
+        DailyBookingSummary.objects.bulk_create(buckets.values(), batch_size=500)
+
+    logger.debug(f"Rebuilt {len(buckets)} daily summary rows for {start_date} - {end_date}")
+    return len(buckets)
+
+
+def refresh_daily_summary(day):
+    """Recompute the summary rows of a single day."""
+    return rebuild_daily_summaries(day, day)
+
+
+def queue_summary_refresh(days):
+    """
+    Queue a background refresh of the summary rows of each day in `days`.
+
+    Called from the Booking and Payment signals and from bulk writes that bypass them. A day
+    that already has a refresh waiting to start is not queued again; the waiting refresh will
+    read this change too.
+    """
+    days = {day.isoformat() for day in days if day is not None}
+    if not days:
+        return
+    now = timezone.now()
+    waiting = set(Task.objects.filter(
+        name='refresh_daily_summary',
+        status=TaskStatus.QUEUED,
+        run_after__gt=now,
+        payload__day__in=days,
+    ).values_list('payload__day', flat=True))
+    enqueue_many(
+        'refresh_daily_summary',
+        [{'day': day} for day in sorted(days - waiting)],
+        run_after=now + SUMMARY_REFRESH_DELAY
+    )
+
+
+def build_daily_report(start_date, end_date):
+    """
+    Read the summary rows of a date range and add per-day totals.
+
+    Returns:
+        list[dict]: One entry per day that has bookings, with day totals and one row per
+                    (time slot, seating type). Only summary rows are read, so the cost depends
+                    on the range, not on the size of the booking history.
+    """
+    summaries = DailyBookingSummary.objects.filter(
+        date__gte=start_date, date__lte=end_date
+    ).select_related('time_slot', 'seating_type').order_by('date', 'time_slot__start_time', 'seating_type__name')
+
+    days = {}
+    for summary in summaries:
+        day = days.setdefault(summary.date, {
+            'date': summary.date,
+            'bookings': 0,
+            'guests': 0,
+            'revenue': Decimal('0.00'),
+            'paid_revenue': Decimal('0.00'),
+            'unpaid_revenue': Decimal('0.00'),
+            'rows': [],
+        })
+        day['bookings'] += summary.bookings
+        day['guests'] += summary.guests
+        day['revenue'] += summary.revenue
+        day['paid_revenue'] += summary.paid_revenue
+        day['unpaid_revenue'] += summary.revenue - summary.paid_revenue
+        day['rows'].append({
+            'time_slot_id': summary.time_slot_id,
+            'time_slot': summary.time_slot.label if summary.time_slot else None,
+            'seating_type_id': summary.seating_type_id,
+            'seating_type': summary.seating_type.name,
+            'bookings': summary.bookings,
+            'guests': summary.guests,
+            'paid_bookings': summary.paid_bookings,
+            'unpaid_bookings': summary.bookings - summary.paid_bookings,
+            'revenue': summary.revenue,
+            'paid_revenue': summary.paid_revenue,
+            'unpaid_revenue': summary.revenue - summary.paid_revenue,
+            'tables_used': summary.tables_used,
+            'tables_available': summary.tables_available,
+            'utilisation': round(summary.tables_used / summary.tables_available, 4) if summary.tables_available else None,
+        })
+    return list(days.values())
@@ -0,0 +1,50 @@
+# bookings/roles.py
+from django.core.cache import cache
+from .authentication import TokenClaimsUser
+
+# Name of the auth group whose members get manager access (see permissions.IsManager).
+MANAGER_GROUP = 'Manager'
+
+# Seconds a user's manager role is cached. Membership changes made through the ORM clear the
+# entry at once (see bookings/signals.py); the timeout bounds staleness for anything else.
+MANAGER_ROLE_CACHE_TIMEOUT = 60
+
+MANAGER_ROLE_KEY = 'bookings:is_manager:{}'
+
+
+def is_manager(user):
+    """
+    Return True if `user` belongs to the Manager group.
+
+    The answer is cached per user for MANAGER_ROLE_CACHE_TIMEOUT seconds, so repeated checks
+    across requests run no group query. Users authenticated by StatelessJWTAuthentication
+    answer from their token's is_manager claim.
+    """
+    if not user or not user.is_authenticated:
+        return False
+    if isinstance(user, TokenClaimsUser):
+        return user.is_manager
+
+    key = MANAGER_ROLE_KEY.format(user.pk)
+    role = cache.get(key)
+    if role is None:
+        role = user.groups.filter(name=MANAGER_GROUP).exists()
+        cache.set(key, role, timeout=MANAGER_ROLE_CACHE_TIMEOUT)
+    return role
+
+
+def request_is_manager(request):
+    """
+    Return is_manager(request.user), resolved at most once per request.
+
+    Combined permissions such as `IsAdminUser | IsManager` check the role in has_permission
+    and again in has_object_permission; the result is kept on the request for both.
+    """
+    if not hasattr(request, '_is_manager'):
+        request._is_manager = is_manager(request.user)
+    return request._is_manager
+
+
+def invalidate_manager_role(user_ids):
+    """Forget the cached manager role of the given users."""
+    cache.delete_many([MANAGER_ROLE_KEY.format(user_id) for user_id in user_ids])
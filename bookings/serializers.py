@@ -1,9 +1,14 @@
 from djoser.serializers import UserCreateSerializer, UserSerializer
-from .models import CustomUser, Occasion, SeatingType, Booking, Payment, TimeSlot, Table, PaymentStatus, BookingStatus
+from .models import CustomUser, Occasion, SeatingType, Booking, Payment, TimeSlot, Table, PaymentStatus, BookingStatus, WaitlistEntry
 from rest_framework import serializers
+from django.db import transaction
 from django.utils import timezone
-from .pricing import calculate_booking_price
-from .availability import find_available_table
+from .pricing import calculate_booking_price, MAX_QUOTES_PER_REQUEST
+from .slots import get_time_slot
+from .availability import find_available_table, find_table_combination, allocate_booking
+from .bulk import MAX_BULK_BOOKINGS
+from .taskqueue import enqueue
+from .roles import is_manager
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework.exceptions import ValidationError
 
@@ -185,6 +190,81 @@ class PriceCalculationSerializer(serializers.Serializer):
     class Meta:
         fields = ['number_of_guests', 'booking_datetime', 'seating_type_id']
 
+class PriceQuoteItemSerializer(serializers.Serializer):
+    """
+    Serializer for a single item of a batch price quote request.
+
+    Unlike PriceCalculationSerializer, seating_type_id is a plain integer so that validating
+    a batch runs no queries; the seating types are resolved in bulk afterwards.
+
+    Fields:
+        - number_of_guests (IntegerField): The number of guests. Must be at least 1.
+        - booking_datetime (DateTimeField): The date and time of the booking.
+        - seating_type_id (IntegerField): ID of the desired SeatingType.
+    """
+
+    number_of_guests = serializers.IntegerField(min_value=1)
+    booking_datetime = serializers.DateTimeField()
+    seating_type_id = serializers.IntegerField(min_value=1)
+
+class PriceQuoteSerializer(serializers.Serializer):
+    """
+    Serializer for the batch price quote endpoint.
+
+    Fields:
+        - quotes (ListField): Between 1 and MAX_QUOTES_PER_REQUEST quote items. Items are
+                              validated one by one by the view so that a bad item does not
+                              reject the whole batch.
+    """
+
+    quotes = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=MAX_QUOTES_PER_REQUEST
+    )
+
+class BulkBookingItemSerializer(serializers.Serializer):
+    """
+    Serializer for a single item of a bulk booking request.
+
+    Related objects are plain integers so that validating a batch runs no queries; they are
+    resolved in bulk by create_bookings_in_bulk.
+
+    Fields:
+        - number_of_guests (IntegerField): The number of guests. Must be at least 1.
+        - booking_datetime (DateTimeField): The date and time of the booking.
+        - seating_type_id (IntegerField): ID of the desired SeatingType.
+        - occasion_id (IntegerField): Optional ID of an Occasion.
+        - special_request (CharField): Optional special request.
+        - user_id (IntegerField): Owner of the booking. Only accepted from admins and managers;
+                                  defaults to the requesting user.
+    """
+
+    number_of_guests = serializers.IntegerField(min_value=1)
+    booking_datetime = serializers.DateTimeField()
+    seating_type_id = serializers.IntegerField(min_value=1)
+    occasion_id = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+    special_request = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    user_id = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+
+class BulkBookingSerializer(serializers.Serializer):
+    """
+    Serializer for the bulk booking endpoint.
+
+    Fields:
+        - bookings (ListField): Between 1 and MAX_BULK_BOOKINGS booking items. Items are
+                                validated one by one by the view so that a bad item does not
+                                reject the whole batch.
+        - dry_run (BooleanField): Allocate and price the batch without saving it.
+    """
+
+    bookings = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=MAX_BULK_BOOKINGS
+    )
+    dry_run = serializers.BooleanField(default=False)
+
 class PaymentSerializer(serializers.ModelSerializer):
     """
     Serializer for the Payment model.
@@ -193,7 +273,8 @@ class PaymentSerializer(serializers.ModelSerializer):
 
     Meta:
         - Uses all fields from Payment model.
-        - Read-only fields: 'user', 'verified', 'created_at', 'updated_at' to prevent client-side modification.
+        - Read-only fields: 'user', 'status', 'verified', 'paid_at', 'created_at', 'updated_at' to prevent
+          client-side modification. Only the verify_payment task (or staff in the admin) marks a payment paid.
 
     Validations:
         - Ensures only one payment exists per booking.
@@ -202,13 +283,17 @@ class PaymentSerializer(serializers.ModelSerializer):
 
     Creation:
         - Assigns the current logged-in user as the payment user.
-        - If the payment status is 'paid', updates the related booking's status to 'confirmed' and payment status to 'paid'.
+        - Payments that claim to be paid, by naming the gateway's transaction_id, queue a
+          verify_payment task in the same transaction. The worker checks the payment with the
+          gateway and, once it has gone through, marks the booking 'confirmed' and 'paid' and
+          emails the user, so none of that runs on the request thread. Other payments (e.g. a
+          local bank transfer) stay unpaid until staff verify them.
     """
 
     class Meta:
         model = Payment
         fields = '__all__'
-        read_only_fields = ['user', 'verified', 'created_at', 'updated_at']
+        read_only_fields = ['user', 'status', 'verified', 'paid_at', 'created_at', 'updated_at']
 
     def validate(self, data):
         if Payment.objects.filter(booking=data['booking']).exists():
@@ -233,15 +318,12 @@ class PaymentSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         validated_data['user'] = user
 
-        # Create the payment record
-        payment = super().create(validated_data)
-
-        # Update booking status if payment is successful
-        if payment.status == PaymentStatus.PAID:
-            booking = payment.booking
-            booking.status = BookingStatus.CONFIRMED
-            booking.payment_status = PaymentStatus.PAID
-            booking.save()
+        with transaction.atomic():
+            # Create the payment record
+            payment = super().create(validated_data)
+            # Gateway verification and the booking status change run in the background
+            if payment.transaction_id:
+                enqueue('verify_payment', payment_id=payment.pk)
 
         return payment
 
@@ -282,6 +364,7 @@ class BookingSerializer(serializers.ModelSerializer):
     - Validates booking datetime is not in the past.
     - Validates availability of tables based on seating type, guest count, and datetime.
     - Calculates and sets the total price during creation and updates.
+    - Allocates the table under a row lock on create, so concurrent requests cannot double book it.
     
     Fields:
         - id: Booking primary key.
@@ -302,12 +385,14 @@ class BookingSerializer(serializers.ModelSerializer):
     Validation:
         - Booking datetime must be in the future.
         - Number of guests, booking datetime, and seating type must be provided.
-        - A suitable available table must exist for the booking parameters.
+        - A suitable available table, or combination of adjacent tables, must exist for the
+          booking parameters.
     
     Methods:
         - validate_booking_datetime: Ensures booking datetime is not in the past.
         - validate: Object-level validation to check table availability.
-        - create: Creates a booking after confirming table availability and calculates total price.
+        - create: Calculates the total price and creates the booking through allocate_booking,
+                  which locks and re-checks the table (or the next best one) before inserting.
         - update: Recalculates price if relevant fields change.
     """
 
@@ -357,6 +442,10 @@ class BookingSerializer(serializers.ModelSerializer):
             number_of_guests=number_of_guests,
             seating_type_id=seating_type_id
         )
+        if not available_table:
+            # A large party may still fit on adjacent tables pushed together
+            combination = find_table_combination(booking_datetime, number_of_guests, seating_type_id.id)
+            available_table = combination[0] if combination else None
 
         if not available_table:
             raise serializers.ValidationError(
@@ -367,10 +456,8 @@ class BookingSerializer(serializers.ModelSerializer):
         return data
     
     def get_base_price(self, booking_datetime):
-        from bookings.models import TimeSlot
-        booking_time = booking_datetime.time()
         try:
-            timeslot = TimeSlot.objects.get(start_time__lte=booking_time, end_time__gte=booking_time)
+            timeslot = get_time_slot(booking_datetime)
         except TimeSlot.DoesNotExist:
             raise ValidationError({"booking_datetime": "No valid time slot found for the selected time."})
         except TimeSlot.MultipleObjectsReturned:
@@ -378,32 +465,31 @@ class BookingSerializer(serializers.ModelSerializer):
         return timeslot.base_price_per_guest
 
     def create(self, validated_data):
-        validated_data.pop('seating_type_id')  # No longer needed after validation
-
-        table = validated_data['table']
-        seating_type = table.seating_type
-        number_of_guests = validated_data['number_of_guests']
-        booking_datetime = validated_data['booking_datetime']
-
-        base_price_per_guest = self.get_base_price(booking_datetime)
-        if table.capacity < number_of_guests:
-            raise serializers.ValidationError({
-                "non_field_errors": [
-                    f"A system error occurred: The selected table (capacity: {table.capacity}) "
-                    f"cannot accommodate the number of guests ({number_of_guests}). Please try again."
-                ]
-            })
+        seating_type = validated_data.pop('seating_type_id')
+        validated_data.pop('table')  # Re-allocated under a row lock below
+        number_of_guests = validated_data.pop('number_of_guests')
+        booking_datetime = validated_data.pop('booking_datetime')
 
-        total_price = calculate_booking_price(
+        validated_data['base_price_per_guest'] = self.get_base_price(booking_datetime)
+        validated_data['total_price'] = calculate_booking_price(
             number_of_guests=number_of_guests,
-            booking_datetime=validated_data['booking_datetime'],
-            seating_type=table.seating_type
+            booking_datetime=booking_datetime,
+            seating_type=seating_type
         )
 
-        validated_data['base_price_per_guest'] = base_price_per_guest
-        validated_data['total_price'] = total_price
-
-        booking = Booking.objects.create(**validated_data)
+        # validate() only picked a table; another request may have taken it since.
+        # allocate_booking locks the table and re-checks before inserting, falling back
+        # to the next best table on contention.
+        booking = allocate_booking(
+            booking_datetime=booking_datetime,
+            number_of_guests=number_of_guests,
+            seating_type_id=seating_type.id,
+            **validated_data
+        )
+        if booking is None:
+            raise serializers.ValidationError(
+                "Sorry, no tables are available for the selected time, number of guests, and seating preference."
+            )
         return booking
 
     def update(self, instance, validated_data):
@@ -427,6 +513,63 @@ class BookingSerializer(serializers.ModelSerializer):
 
         return super().update(instance, validated_data)
 
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    """
+    Serializer for a user's waitlist entries.
+
+    Fields:
+        - id: Entry primary key.
+        - number_of_guests, booking_datetime, special_request: The requested booking.
+        - seating_type_id: SeatingType primary key (required on write).
+        - occasion_id: Occasion primary key (optional on write).
+        - status: Waiting, booked or cancelled (read-only).
+        - booking: ID of the booking made once the entry was promoted (read-only).
+        - created_at, updated_at: Timestamps (read-only); earlier entries are served first.
+
+    Validation:
+        - Booking datetime must be in the future and inside a time slot.
+        - Joining the waitlist is refused while a table is free for the request; it should be
+          booked directly instead.
+    """
+
+    seating_type_id = serializers.PrimaryKeyRelatedField(
+        queryset=SeatingType.objects.filter(is_active=True),
+        source='seating_type'
+    )
+    occasion_id = serializers.PrimaryKeyRelatedField(
+        queryset=Occasion.objects.filter(is_active=True),
+        source='occasion',
+        required=False,
+        allow_null=True
+    )
+
+    class Meta:
+        model = WaitlistEntry
+        fields = [
+            'id', 'number_of_guests', 'booking_datetime', 'seating_type_id', 'occasion_id', 'special_request',
+            'status', 'booking', 'created_at', 'updated_at',
+        ]
+        read_only_fields = ['status', 'booking', 'created_at', 'updated_at']
+
+    def validate_number_of_guests(self, value):
+        if value < 1:
+            raise serializers.ValidationError("Number of guests must be at least 1.")
+        return value
+
+    def validate_booking_datetime(self, value):
+        if value < timezone.now():
+            raise serializers.ValidationError("Booking date and time cannot be in the past.")
+        try:
+            get_time_slot(value)
+        except (TimeSlot.DoesNotExist, TimeSlot.MultipleObjectsReturned):
+            raise serializers.ValidationError("The selected time is not within any available booking slots.")
+        return value
+
+    def validate(self, data):
+        if find_available_table(data['booking_datetime'], data['number_of_guests'], data['seating_type'].id):
+            raise serializers.ValidationError("A table is available for this request; book it directly.")
+        return data
+
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
     Custom serializer extending Simple JWT's TokenObtainPairSerializer.
@@ -438,7 +581,9 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
     Methods:
     - get_token(cls, user):
         Overrides the default method to add custom claims to the token payload.
-        Adds 'email' and 'username' from the user model to the JWT.
+        Adds 'email', 'username' (the login field), 'is_staff', 'is_superuser' and
+        'is_manager' to the JWT. The role claims reflect the user when the token was issued;
+        StatelessJWTAuthentication trusts them, JWTAuthentication re-reads the user.
 
     - validate(self, attrs):
         Called during login to validate credentials.
@@ -451,7 +596,10 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         token = super().get_token(user)
         # Add custom claims
         token['email'] = user.email
-        token['username'] = user.username
+        token['username'] = user.get_username()
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        token['is_manager'] = is_manager(user)
         return token
 
     def validate(self, attrs):
@@ -0,0 +1,178 @@
+# bookings/signals.py
+from copy import copy
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from .models import CustomUser, Booking, BookingTable, Occasion, Payment, SeatingType, Table, TimeSlot
+from .availability import RELEASED_BOOKING_STATUSES, availability_index
+from .slots import time_slot_cache
+from .caching import catalog_cache
+from .roles import invalidate_manager_role
+from .reporting import queue_summary_refresh
+from .waitlist import queue_waitlist_match
+
+
+@receiver(post_save, sender=Booking)
+def update_availability_index(sender, instance, **kwargs):
+    """
+    Keep the in-memory availability index in sync when a booking is created or changed.
+
+    Applied once the transaction commits, so a rolled-back write never reaches the index. The
+    booking is copied, so the index sees it as saved even if the instance changes before then.
+    """
+    booking = copy(instance)
+    transaction.on_commit(lambda: availability_index.update_booking(booking))
+
+
+@receiver(post_delete, sender=Booking)
+def remove_from_availability_index(sender, instance, **kwargs):
+    """
+    Remove a deleted booking from the in-memory availability index once the delete commits.
+    """
+    booking_id = instance.pk
+    transaction.on_commit(lambda: availability_index.remove_booking(booking_id))
+
+
+@receiver(post_save, sender=BookingTable)
+def add_table_hold_to_availability_index(sender, instance, **kwargs):
+    """
+    Block an additional table of a combined booking in the in-memory availability index once
+    the transaction commits.
+    """
+    booking_id, table_id = instance.booking_id, instance.table_id
+    transaction.on_commit(lambda: availability_index.add_table_hold(booking_id, table_id))
+
+
+@receiver(post_delete, sender=BookingTable)
+def remove_table_hold_from_availability_index(sender, instance, **kwargs):
+    """
+    Free an additional table of a combined booking in the in-memory availability index once
+    the transaction commits.
+    """
+    booking_id, table_id = instance.booking_id, instance.table_id
+    transaction.on_commit(lambda: availability_index.remove_table_hold(booking_id, table_id))
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def refresh_booking_summary(sender, instance, **kwargs):
+    """
+    Queue a rebuild of the reporting rollup for the booking's day, and for the day it moved from.
+    """
+    previous = getattr(instance, '_loaded_booking_datetime', None)
+    queue_summary_refresh([
+        instance.booking_datetime.date() if instance.booking_datetime else None,
+        previous.date() if previous else None,
+    ])
+    instance._loaded_booking_datetime = instance.booking_datetime
+
+
+@receiver(pre_delete, sender=Booking)
+def record_held_tables(sender, instance, **kwargs):
+    """
+    Remember every table a booking holds before it is deleted, since the BookingTable rows of
+    a combined booking are cascade-deleted before post_delete runs.
+    """
+    if getattr(instance, '_loaded_status', None) not in RELEASED_BOOKING_STATUSES:
+        instance._held_table_ids = _held_table_ids(instance)
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def offer_released_table(sender, instance, signal, created=False, **kwargs):
+    """
+    Queue a waitlist match for every table of a booking that is cancelled, expired or deleted.
+
+    The match tasks are queued in the transaction that released the tables, so they run once
+    it commits and are dropped if it rolls back.
+    """
+    was_holding = not created and getattr(instance, '_loaded_status', None) not in RELEASED_BOOKING_STATUSES
+    if was_holding and (signal is post_delete or instance.status in RELEASED_BOOKING_STATUSES):
+        if signal is post_delete:
+            table_ids = getattr(instance, '_held_table_ids', None) or [instance.table_id]
+        else:
+            table_ids = _held_table_ids(instance)
+        queue_waitlist_match([(table_id, instance.booking_datetime, instance.booking_end_datetime) for table_id in table_ids])
+    instance._loaded_status = instance.status
+
+
+def _held_table_ids(booking):
+    # A combined booking also holds its additional tables
+    return [booking.table_id, *BookingTable.objects.filter(booking_id=booking.pk).values_list('table_id', flat=True)]
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def refresh_payment_summary(sender, instance, **kwargs):
+    """
+    Queue a rebuild of the reporting rollup for the day of the paid booking.
+    """
+    if Payment.booking.is_cached(instance):
+        booking_datetime = instance.booking.booking_datetime
+    else:
+        booking_datetime = Booking.objects.filter(pk=instance.booking_id).values_list('booking_datetime', flat=True).first()
+    if booking_datetime:
+        queue_summary_refresh([booking_datetime.date()])
+
+
+@receiver(post_save, sender=TimeSlot)
+@receiver(post_delete, sender=TimeSlot)
+def invalidate_time_slot_cache(sender, **kwargs):
+    """
+    Publish a new time slot configuration version so every worker reloads its slot table.
+    """
+    time_slot_cache.invalidate()
+
+
+@receiver(post_save, sender=Occasion)
+@receiver(post_delete, sender=Occasion)
+@receiver(post_save, sender=SeatingType)
+@receiver(post_delete, sender=SeatingType)
+@receiver(post_save, sender=Table)
+@receiver(post_delete, sender=Table)
+@receiver(post_save, sender=TimeSlot)
+@receiver(post_delete, sender=TimeSlot)
+def invalidate_catalog_cache(sender, **kwargs):
+    """
+    Bump the catalog version of the changed model so cached public responses built from it are rebuilt.
+    """
+    catalog_cache.invalidate(sender)
+
+
+@receiver(m2m_changed, sender=Table.adjacent_tables.through)
+def invalidate_table_combinations(sender, action, **kwargs):
+    """
+    Bump the Table catalog version when table adjacency changes, so every worker rebuilds its
+    table combinations (see bookings/combinations.py).
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        catalog_cache.invalidate(Table)
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+def invalidate_manager_role_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Forget cached manager roles when users are added to or removed from groups.
+
+    From the user side (user.groups.add(...)) `instance` is the user; from the group side
+    (group.user_set.add(...)) `pk_set` holds the users. A group-side clear() is handled
+    before it runs, while the members can still be listed.
+    """
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_manager_role([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        invalidate_manager_role(pk_set)
+    elif action == 'pre_clear':
+        invalidate_manager_role(instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidate_manager_role_on_group_change(sender, instance, **kwargs):
+    """
+    Forget cached manager roles of a group's members when the group is renamed or deleted.
+    """
+    invalidate_manager_role(instance.user_set.values_list('pk', flat=True))
@@ -0,0 +1,174 @@
+# bookings/slots.py
+import bisect
+import threading
+import time
+from django.core.cache import cache
+from django.db import transaction
+from .models import TimeSlot
+import logging
+logger = logging.getLogger(__name__)
+
+# Cache key holding the current version of the time slot configuration. Use a shared cache
+# backend (e.g. Redis or Memcached) in CACHES so that all workers see the same version.
+TIME_SLOT_VERSION_KEY = 'bookings:time_slot_version'
+
+# Seconds between checks of the shared version key. A worker serves a stale slot table for at
+# most this long after another worker changed a TimeSlot.
+TIME_SLOT_VERSION_CHECK_INTERVAL = 30
+
+
+class TimeSlotTable:
+    """
+    Immutable lookup table over all TimeSlots, sorted by start time.
+
+    A running maximum of end times lets lookups stop scanning as soon as no earlier slot can
+    still contain the requested time.
+    """
+
+    def __init__(self, time_slots):
+        self.slots = sorted(time_slots, key=lambda slot: (slot.start_time, slot.end_time))
+        self.starts = [slot.start_time for slot in self.slots]
+        self.max_ends = []
+        for slot in self.slots:
+            self.max_ends.append(max(slot.end_time, self.max_ends[-1]) if self.max_ends else slot.end_time)
+
+    def lookup(self, booking_time, limit=2):
+        """
+        Return up to `limit` slots with start_time <= booking_time <= end_time, latest start first.
+        """
+        matches = []
+        i = bisect.bisect_right(self.starts, booking_time)
+        while i > 0 and len(matches) < limit:
+            i -= 1
+            if self.max_ends[i] < booking_time:
+                break
+            if self.slots[i].end_time >= booking_time:
+                matches.append(self.slots[i])
+        return matches
+
+
+class TimeSlotCache:
+    """
+    Process-local, versioned cache of the TimeSlot lookup table.
+
+    The table is rebuilt when the shared version key changes. TimeSlot post_save/post_delete
+    signals bump the version once their transaction commits (see bookings/signals.py), and
+    each worker re-reads the key at most every TIME_SLOT_VERSION_CHECK_INTERVAL seconds, so
+    lookups normally run no queries at all.
+    """
+
+    def __init__(self, check_interval=TIME_SLOT_VERSION_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Drop the local table; the next lookup reloads it."""
+        with self._lock:
+            self._table = None
+            self._version = None
+            self._checked_at = None
+
+    def invalidate(self):
+        """
+        Publish a new configuration version and drop the local table once the transaction commits.
+
+        Bumping the version before the commit would let a concurrent reload cache the old slots
+        under the new version, where they would stay until the next change.
+        """
+        transaction.on_commit(self._publish)
+
+    def _publish(self):
+        cache.set(TIME_SLOT_VERSION_KEY, time.time_ns(), timeout=None)
+        self.clear()
+
+    def _fresh_table(self, now):
+        # clear() may run concurrently, so both fields are read once and checked together
+        table, checked_at = self._table, self._checked_at
+        if table is not None and checked_at is not None and now - checked_at < self.check_interval:
+            return table
+        return None
+
+    def get_table(self):
+        now = time.monotonic()
+        table = self._fresh_table(now)
+        if table is not None:
+            return table
+
+        with self._lock:
+            version = cache.get(TIME_SLOT_VERSION_KEY)
+            if version is None:
+                cache.add(TIME_SLOT_VERSION_KEY, time.time_ns(), timeout=None)
+                version = cache.get(TIME_SLOT_VERSION_KEY)
+
+            if self._table is None or version != self._version:
+                self._table = TimeSlotTable(TimeSlot.objects.all())
+                self._version = version
+                logger.debug(f"Time slot table loaded: {len(self._table.slots)} slots, version {version}")
+            self._checked_at = now
+            return self._table
+
+    async def aget_table(self):
+        """
+        Async counterpart of get_table for ASGI views, using the async cache and ORM APIs.
+        """
+        now = time.monotonic()
+        table = self._fresh_table(now)
+        if table is not None:
+            return table
+
+        version = await cache.aget(TIME_SLOT_VERSION_KEY)
+        if version is None:
+            await cache.aadd(TIME_SLOT_VERSION_KEY, time.time_ns(), timeout=None)
+            version = await cache.aget(TIME_SLOT_VERSION_KEY)
+
+        with self._lock:
+            table, loaded_version = self._table, self._version
+        if table is None or version != loaded_version:
+            table = TimeSlotTable([slot async for slot in TimeSlot.objects.all()])
+            logger.debug(f"Time slot table loaded: {len(table.slots)} slots, version {version}")
+        with self._lock:
+            self._table = table
+            self._version = version
+            self._checked_at = now
+        return table
+
+
+time_slot_cache = TimeSlotCache()
+
+
+def get_time_slots():
+    """
+    Return all TimeSlots ordered by start time, from the cached table.
+    """
+    return list(time_slot_cache.get_table().slots)
+
+
+def get_time_slot(booking_datetime):
+    """
+    Return the TimeSlot containing the time of booking_datetime, from the cached table.
+
+    Mirrors TimeSlot.objects.get(start_time__lte=..., end_time__gte=...) so callers can keep
+    handling the same exceptions.
+
+    Raises:
+        TimeSlot.DoesNotExist: If no slot contains the time.
+        TimeSlot.MultipleObjectsReturned: If overlapping slots contain the time.
+    """
+    return _single_slot(time_slot_cache.get_table().lookup(booking_datetime.time()))
+
+
+async def aget_time_slot(booking_datetime):
+    """
+    Async counterpart of get_time_slot; raises the same exceptions.
+    """
+    table = await time_slot_cache.aget_table()
+    return _single_slot(table.lookup(booking_datetime.time()))
+
+
+def _single_slot(matches):
+    if not matches:
+        raise TimeSlot.DoesNotExist("No time slot contains the selected time.")
+    if len(matches) > 1:
+        raise TimeSlot.MultipleObjectsReturned("Overlapping time slots contain the selected time.")
+    return matches[0]
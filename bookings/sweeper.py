@@ -0,0 +1,107 @@
+# bookings/sweeper.py
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .availability import availability_index
+from .models import Booking, BookingStatus, BookingTable, PaymentStatus
+from .reporting import queue_summary_refresh
+from .waitlist import queue_waitlist_match
+import logging
+logger = logging.getLogger(__name__)
+
+# Unpaid pending bookings older than this are expired, releasing their table.
+BOOKING_PAYMENT_HOLD = getattr(settings, 'BOOKING_PAYMENT_HOLD', timedelta(hours=1))
+
+# Confirmed bookings whose start time is further in the past than this are marked as no-shows.
+NO_SHOW_GRACE = getattr(settings, 'NO_SHOW_GRACE', timedelta(minutes=30))
+
+
+def sweep_bookings(now=None, payment_hold=BOOKING_PAYMENT_HOLD, no_show_grace=NO_SHOW_GRACE):
+    """
+    Move stale bookings to EXPIRED or NO_SHOW with set-based UPDATE statements.
+
+    Args:
+        now (datetime, optional): Reference time. Defaults to timezone.now().
+        payment_hold (timedelta): How long an unpaid pending booking holds its table.
+        no_show_grace (timedelta): How long after its start a confirmed booking becomes a no-show.
+
+    Returns:
+        dict: {'expired': count, 'no_show': count}
+
+    Behavior:
+    - Expires PENDING/UNPAID bookings made more than `payment_hold` ago, or whose start time has
+      passed, unless a payment claiming to be paid is still waiting for verification.
+    - Marks CONFIRMED bookings that started more than `no_show_grace` ago as NO_SHOW.
+    - Runs three UPDATE statements, each filtering on status and one range: made before the
+      hold, served by the (status, created_at) index; started, served by the
+      (status, booking_datetime) index; and the no-shows, served by the same index. An OR of
+      the two expiry ranges could use neither index. Only the distinct days of the expiring
+      bookings are read, to queue their reporting rollup refresh, and the tables of those that
+      have not started yet, additional tables of combined bookings included, to offer them to
+      the waitlist.
+    - UPDATE sends no post_save signals, so the process-local availability index is cleared when
+      anything was expired. Other workers pick the change up on their next index rebuild; until
+      then they treat the expired bookings as taken, which is safe.
+    """
+    now = now or timezone.now()
+
+    overdue, started = stale_pending_bookings(now, payment_hold)
+    past_confirmed = Booking.objects.filter(
+        status=BookingStatus.CONFIRMED,
+        booking_datetime__lt=now - no_show_grace,
+    )
+
+    with transaction.atomic():
+        # The reporting rollup drops expired bookings; its refresh is queued here since UPDATE
+        # bypasses the Booking signals.
+        expired_days = list(
+            overdue.order_by().values_list(TruncDate('booking_datetime'), flat=True).union(
+                started.order_by().values_list(TruncDate('booking_datetime'), flat=True)
+            )
+        )
+        # Tables of expiring bookings that have not started yet go to the waitlist; started
+        # bookings are all in the past.
+        upcoming = overdue.filter(booking_datetime__gte=now)
+        released = list(upcoming.order_by().values_list('table_id', 'booking_datetime', 'booking_end_datetime').union(
+            BookingTable.objects.filter(booking__in=upcoming.values('pk')).order_by().values_list(
+                'table_id', 'booking__booking_datetime', 'booking__booking_end_datetime'
+            ),
+            all=True
+        ))
+        expired = overdue.update(status=BookingStatus.EXPIRED, updated_at=now)
+        expired += started.update(status=BookingStatus.EXPIRED, updated_at=now)
+        no_show = past_confirmed.update(status=BookingStatus.NO_SHOW, updated_at=now)
+        if expired:
+            queue_summary_refresh(expired_days)
+            queue_waitlist_match(released)
+
+    if expired:
+        availability_index.clear()
+
+    logger.info(f"Booking sweep: {expired} expired, {no_show} marked as no-show")
+    return {'expired': expired, 'no_show': no_show}
+
+
+def stale_pending_bookings(now, payment_hold=BOOKING_PAYMENT_HOLD):
+    """
+    Return the (overdue, started) querysets of unpaid pending bookings that should expire:
+    those made more than `payment_hold` before `now`, and those that have started.
+
+    Bookings with a submitted payment still awaiting verification (a transaction ID, not yet
+    verified) are held until the gateway or staff have checked it.
+    """
+    pending_unpaid = Booking.objects.filter(
+        status=BookingStatus.PENDING,
+        payment_status=PaymentStatus.UNPAID,
+    ).exclude(
+        payment__status=PaymentStatus.PAID,
+    ).exclude(
+        payment__transaction_id__gt='',
+        payment__verified=False,
+    )
+    return (
+        pending_unpaid.filter(created_at__lt=now - payment_hold),
+        pending_unpaid.filter(booking_datetime__lt=now),
+    )
@@ -0,0 +1,191 @@
+# bookings/taskqueue.py
+import os
+import socket
+import traceback
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Task, TaskStatus
+import logging
+logger = logging.getLogger(__name__)
+
+# Delay before the first retry of a failed task; doubled on every further attempt.
+TASK_RETRY_BASE_DELAY = getattr(settings, 'TASK_RETRY_BASE_DELAY', timedelta(seconds=30))
+
+# Longest delay between two attempts, however many times a task has failed.
+TASK_RETRY_MAX_DELAY = getattr(settings, 'TASK_RETRY_MAX_DELAY', timedelta(hours=1))
+
+# A task still marked running this long after it was claimed is assumed to belong to a worker
+# that died, and is claimed again.
+TASK_LOCK_TIMEOUT = getattr(settings, 'TASK_LOCK_TIMEOUT', timedelta(minutes=10))
+
+# Handler name -> (function, max_attempts), filled by the @task decorator.
+_registry = {}
+
+
+class RetryTask(Exception):
+    """
+    Raise from a handler to run it again later without treating the attempt as an error,
+    e.g. while a payment is still pending at the gateway.
+
+    Args:
+        message (str): Recorded as the task's last_error.
+        delay (timedelta, optional): Wait this long instead of the exponential backoff.
+    """
+
+    def __init__(self, message='', delay=None):
+        super().__init__(message)
+        self.delay = delay
+
+
+def task(name, max_attempts=5):
+    """
+    Register a function as a background task handler under `name`.
+
+    The function is called with the task payload as keyword arguments. It must be safe to
+    run more than once: a worker that dies mid-task leaves it to be retried.
+    """
+
+    def register(function):
+        _registry[name] = (function, max_attempts)
+        return function
+
+    return register
+
+
+def enqueue(name, run_after=None, **payload):
+    """
+    Queue the handler registered as `name` to run with `payload` (JSON-serializable kwargs).
+
+    The row is written in the caller's transaction, so the task only becomes visible to workers
+    once the surrounding change commits.
+
+    Returns:
+        Task: The queued task.
+    """
+    if name not in _registry:
+        raise ValueError(f"No task handler registered as {name!r}.")
+    _, max_attempts = _registry[name]
+    return Task.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=max_attempts,
+        run_after=run_after or timezone.now()
+    )
+
+
+def enqueue_many(name, payloads, run_after=None):
+    """
+    Queue the handler registered as `name` once per payload dict, with a single INSERT.
+
+    Returns:
+        list[Task]: The queued tasks.
+    """
+    if name not in _registry:
+        raise ValueError(f"No task handler registered as {name!r}.")
+    _, max_attempts = _registry[name]
+    run_after = run_after or timezone.now()
+    return Task.objects.bulk_create([
+        Task(name=name, payload=payload, max_attempts=max_attempts, run_after=run_after)
+        for payload in payloads
+    ])
+
+
+def retry_delay(attempts):
+    """Exponential backoff: the base delay doubled for every attempt after the first, capped."""
+    delay = TASK_RETRY_BASE_DELAY
+    for _ in range(attempts - 1):
+        if delay >= TASK_RETRY_MAX_DELAY:
+            break
+        delay *= 2
+    return min(delay, TASK_RETRY_MAX_DELAY)
+
+
+def claim_tasks(limit, worker_id=None):
+    """
+    Mark up to `limit` due tasks as running for this worker and return them.
+
+    Due tasks are queued ones whose run_after has passed, and running ones whose claim is
+    older than TASK_LOCK_TIMEOUT. The claim is a single UPDATE tagged with a unique token,
+    so concurrent workers never claim the same task; on backends with SKIP LOCKED the
+    candidate rows are also selected without waiting on each other.
+    """
+    now = timezone.now()
+    token = f"{uuid.uuid4().hex[:12]}:{worker_id or default_worker_id()}"[:100]
+    due = (
+        Q(status=TaskStatus.QUEUED, run_after__lte=now)
+        | Q(status=TaskStatus.RUNNING, locked_at__lt=now - TASK_LOCK_TIMEOUT)
+    )
+    with transaction.atomic():
+        ids = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by('run_after', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        Task.objects.filter(due, id__in=ids).update(
+            status=TaskStatus.RUNNING,
+            locked_by=token,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+            updated_at=now
+        )
+    return list(Task.objects.filter(locked_by=token, status=TaskStatus.RUNNING).order_by('run_after', 'id'))
+
+
+def run_task(task_row):
+    """
+    Run one claimed task and record the outcome.
+
+    Returns:
+        str: The task's new status.
+    """
+    handler = _registry.get(task_row.name)
+    try:
+        if handler is None:
+            raise LookupError(f"No task handler registered as {task_row.name!r}.")
+        handler[0](**task_row.payload)
+    except RetryTask as e:
+        return _reschedule(task_row, str(e), e.delay)
+    except Exception:
+        logger.exception(f"Task {task_row} failed on attempt {task_row.attempts}")
+        return _reschedule(task_row, traceback.format_exc())
+
+    Task.objects.filter(pk=task_row.pk, locked_by=task_row.locked_by).update(
+        status=TaskStatus.SUCCEEDED, last_error='', updated_at=timezone.now()
+    )
+    return TaskStatus.SUCCEEDED
+
+
+def _reschedule(task_row, error, delay=None):
+    now = timezone.now()
+    if task_row.attempts >= task_row.max_attempts:
+        new_status = TaskStatus.FAILED
+        run_after = task_row.run_after
+        logger.error(f"Task {task_row} gave up after {task_row.attempts} attempts")
+    else:
+        new_status = TaskStatus.QUEUED
+        run_after = now + (delay if delay is not None else retry_delay(task_row.attempts))
+    Task.objects.filter(pk=task_row.pk, locked_by=task_row.locked_by).update(
+        status=new_status, run_after=run_after, last_error=error, updated_at=now
+    )
+    return new_status
+
+
+def run_due_tasks(limit=10, worker_id=None):
+    """
+    Claim and run up to `limit` due tasks.
+
+    Returns:
+        list[tuple]: (task, status) for every task run, in order.
+    """
+    return [(task_row, run_task(task_row)) for task_row in claim_tasks(limit, worker_id)]
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
@@ -0,0 +1,110 @@
+# bookings/tasks.py
+"""
+Background task handlers, run by `python manage.py run_tasks` (see bookings/taskqueue.py).
+
+Handlers are registered when the app loads (BookingsConfig.ready) and must be idempotent:
+a task may run again after a worker dies or a later step fails.
+"""
+from django.core.mail import send_mail
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .gateways import PAYMENT_PENDING, PAYMENT_SUCCEEDED, get_payment_gateway
+from .models import Booking, BookingStatus, Payment, PaymentStatus
+from .reporting import refresh_daily_summary
+from .taskqueue import RetryTask, enqueue, task
+from .waitlist import match_waitlist
+import logging
+logger = logging.getLogger(__name__)
+
+
+@task('verify_payment', max_attempts=8)
+def verify_payment(payment_id):
+    """
+    Ask the payment gateway about a payment and confirm its booking once it has gone through.
+
+    Pending payments are retried with backoff. A failed payment is marked verified and unpaid
+    and its booking stays pending, so the booking sweeper no longer holds it for the payment. Only a booking that is still pending is confirmed; a payment that
+    goes through after its booking expired or was cancelled is recorded as paid and flagged
+    for a refund in the booking's staff note. Without a configured gateway the payment is left for staff to
+    verify in the admin.
+    """
+    payment = Payment.objects.select_related('booking').filter(pk=payment_id).first()
+    if payment is None or payment.verified:
+        return
+
+    gateway = get_payment_gateway()
+    if gateway is None:
+        logger.warning(f"No PAYMENT_GATEWAY configured; payment {payment.pk} is left unverified")
+        return
+
+    result = gateway.verify(payment)
+    if result == PAYMENT_PENDING:
+        raise RetryTask("Payment is still pending at the gateway.")
+
+    with transaction.atomic():
+        if result != PAYMENT_SUCCEEDED:
+            logger.warning(f"Payment {payment.pk} was rejected by the gateway ({result})")
+            payment.status = PaymentStatus.UNPAID
+            payment.verified = True
+            payment.save(update_fields=['status', 'verified', 'updated_at'])
+            return
+
+        payment.status = PaymentStatus.PAID
+        payment.verified = True
+        payment.paid_at = payment.paid_at or timezone.now()
+        payment.save(update_fields=['status', 'verified', 'paid_at', 'updated_at'])
+
+        booking = Booking.objects.select_for_update().get(pk=payment.booking_id)
+        if booking.status != BookingStatus.PENDING:
+            # Expired or cancelled while the payment was in flight; its table may already be
+            # someone else's, so the money goes back instead of the booking coming back.
+            logger.error(f"Payment {payment.pk} went through for {booking.status} booking {booking.pk}; refund needed")
+            note = f"Payment {payment.pk} was verified after the booking was {booking.status}; refund it."
+            booking.staff_note = f"{booking.staff_note}\n{note}" if booking.staff_note else note
+            booking.save(update_fields=['staff_note', 'updated_at'])
+            return
+
+        booking.status = BookingStatus.CONFIRMED
+        booking.payment_status = PaymentStatus.PAID
+        booking.save(update_fields=['status', 'payment_status', 'updated_at'])
+        enqueue('send_booking_status_email', booking_id=booking.pk)
+
+
+@task('send_booking_status_email', max_attempts=5)
+def send_booking_status_email(booking_id):
+    """
+    Email the booking's owner its current status (confirmation, cancellation, expiry, ...).
+    """
+    booking = Booking.objects.select_related('user', 'table').filter(pk=booking_id).first()
+    if booking is None:
+        return
+
+    when = booking.booking_datetime.strftime('%A %d %B %Y at %H:%M')
+    status = booking.get_status_display()
+    send_mail(
+        subject=f"Little Lemon booking {booking.pk}: {status}",
+        message=(
+            f"Hello {booking.user.first_name},\n\n"
+            f"Your booking for {booking.number_of_guests} on {when} (table {booking.table.table_number}) "
+            f"is now {status.lower()}.\n\nLittle Lemon"
+        ),
+        from_email=None,
+        recipient_list=[booking.user.email],
+    )
+
+
+@task('refresh_daily_summary', max_attempts=5)
+def refresh_daily_summary_task(day):
+    """
+    Rebuild the reporting rollup of one day (ISO date string) after its bookings changed.
+    """
+    refresh_daily_summary(parse_date(day))
+
+
+@task('match_waitlist', max_attempts=5)
+def match_waitlist_task(table_id, start, end):
+    """
+    Offer a table released for [start, end) (ISO datetime strings) to the parties on the waitlist.
+    """
+    match_waitlist(table_id, parse_datetime(start), parse_datetime(end))
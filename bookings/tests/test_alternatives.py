@@ -0,0 +1,79 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from ..alternatives import suggest_alternatives
+from ..availability import build_availability_grid
+from ..models import CustomUser, SeatingType, Table, Booking, TimeSlot
+from .utils import clear_process_caches
+
+
+class AlternativesTests(TestCase):
+    """
+    Test suite for suggest_alternatives and the alternatives returned by check-availability.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='flexible@example.com', password='password123', first_name='Flex', last_name='Ible'
+        )
+        cls.standard = SeatingType.objects.create(name="Standard", price_multiplier=Decimal('1.00'))
+        cls.patio = SeatingType.objects.create(name="Patio", price_multiplier=Decimal('1.00'), is_accessible=False)
+        cls.table = Table.objects.create(table_number='S1', seating_type=cls.standard, capacity=4)
+        cls.patio_table = Table.objects.create(table_number='P1', seating_type=cls.patio, capacity=4)
+        TimeSlot.objects.create(start_time=time(17, 0), end_time=time(22, 0), label="Dinner")
+
+        cls.day = date(2030, 6, 5)
+        cls.requested = datetime.combine(cls.day, time(19, 0))
+        # Holds the standard table from 18:00 to 20:00
+        Booking.objects.create(
+            user=cls.user, number_of_guests=2, booking_datetime=datetime.combine(cls.day, time(18, 0)), table=cls.table
+        )
+
+    def setUp(self):
+        clear_process_caches()
+
+    def test_nearest_times_first(self):
+        options = suggest_alternatives(self.requested, 2, self.standard.id, max_results=3)
+        self.assertEqual(
+            [option['booking_datetime'] for option in options],
+            [datetime.combine(self.day, time(20, 0)), datetime.combine(self.day, time(20, 30)), datetime.combine(self.day, time(21, 0))]
+        )
+        self.assertEqual(options[0]['table_id'], self.table.id)
+        self.assertEqual(options[0]['distance_minutes'], 60)
+
+    def test_other_seating_types_and_days(self):
+        Booking.objects.create(
+            user=self.user, number_of_guests=2, booking_datetime=datetime.combine(self.day, time(20, 0)), table=self.table
+        )
+        options = suggest_alternatives(self.requested, 2, self.standard.id, max_results=10, slot_steps=2)
+        seating_type_ids = {option['seating_type_id'] for option in options}
+        self.assertEqual(seating_type_ids, {self.standard.id})  # the patio is not accessible
+
+        # 20:00 the day before and 18:00 the day after are both 23 hours away; earlier first
+        self.assertEqual(options[0]['booking_datetime'], self.requested - timedelta(hours=23))
+        self.assertEqual(options[1]['booking_datetime'], self.requested + timedelta(hours=23))
+
+        options = suggest_alternatives(self.requested, 2, self.patio.id, max_results=1, slot_steps=2)
+        self.assertEqual((options[0]['seating_type_id'], options[0]['distance_minutes']), (self.patio.id, 0))
+
+    def test_past_times_are_skipped(self):
+        options = suggest_alternatives(self.requested, 2, self.standard.id, now=self.requested + timedelta(hours=1))
+        self.assertTrue(all(option['booking_datetime'] >= self.requested + timedelta(hours=1) for option in options))
+
+    def test_query_count_is_constant(self):
+        build_availability_grid(self.day, self.day)  # Loads the time slot table
+        with self.assertNumQueries(3):
+            suggest_alternatives(self.requested, 2, self.standard.id, max_results=20, slot_steps=12, day_range=7)
+
+    def test_check_availability_returns_alternatives(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post('/api/check-availability/', {
+            'booking_datetime': self.requested.isoformat(), 'number_of_guests': 2, 'seating_type_id': self.standard.id
+        }, format='json')
+        self.assertFalse(response.data['available'])
+        self.assertEqual(response.data['alternatives'][0]['booking_datetime'], datetime.combine(self.day, time(20, 0)))
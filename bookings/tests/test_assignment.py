@@ -0,0 +1,122 @@
+import random
+from io import StringIO
+import time as timer
+from datetime import date, datetime, time, timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import CustomUser, SeatingType, Table, Booking
+from ..assignment import solve_table_assignment, plan_table_assignments, apply_table_assignment_plan
+from .utils import clear_process_caches
+
+
+class SolveTableAssignmentTests(TestCase):
+    """
+    Test suite for the in-memory table assignment solver.
+    """
+
+    def booking(self, booking_id, hour, guests, table_id, seating_type_id=1, hours=2):
+        start = datetime(2030, 1, 1, hour, 0)
+        return {
+            'id': booking_id,
+            'start': start,
+            'end': start + timedelta(hours=hours),
+            'guests': guests,
+            'seating_type_id': seating_type_id,
+            'table_id': table_id,
+        }
+
+    def test_large_party_is_seated_by_moving_small_one(self):
+        tables = [
+            {'id': 1, 'capacity': 2, 'seating_type_id': 1, 'table_number': 'A'},
+            {'id': 2, 'capacity': 4, 'seating_type_id': 1, 'table_number': 'B'},
+        ]
+        # Both were put on the 4-top; the couple should move to the 2-top.
+        bookings = [self.booking(1, 18, 2, table_id=2), self.booking(2, 19, 4, table_id=2)]
+
+        assignments, unseated = solve_table_assignment(bookings, tables)
+        self.assertEqual(assignments, {1: 1, 2: 2})
+        self.assertEqual(unseated, [])
+
+    def test_fixed_blockers_and_seating_types_are_respected(self):
+        tables = [
+            {'id': 1, 'capacity': 4, 'seating_type_id': 1, 'table_number': 'A'},
+            {'id': 2, 'capacity': 4, 'seating_type_id': 2, 'table_number': 'B'},
+        ]
+        blockers = [(1, datetime(2030, 1, 1, 18, 0), datetime(2030, 1, 1, 20, 0))]
+        bookings = [self.booking(1, 19, 2, table_id=1)]
+
+        assignments, unseated = solve_table_assignment(bookings, tables, blockers)
+        self.assertEqual(assignments, {})
+        self.assertEqual(unseated, [1])
+
+    def test_hundreds_of_bookings_finish_quickly(self):
+        rng = random.Random(7)
+        tables = [
+            {'id': i, 'capacity': rng.choice([2, 4, 6, 8]), 'seating_type_id': i % 3, 'table_number': f'T{i}'}
+            for i in range(1, 151)
+        ]
+        bookings = [
+            self.booking(i, rng.randint(11, 21), rng.randint(1, 8), table_id=rng.randint(1, 150), seating_type_id=i % 3)
+            for i in range(1, 401)
+        ]
+
+        started = timer.perf_counter()
+        assignments, unseated = solve_table_assignment(bookings, tables)
+        self.assertLess(timer.perf_counter() - started, 1.0)
+        self.assertEqual(len(assignments) + len(unseated), len(bookings))
+
+
+class PlanTableAssignmentsTests(TestCase):
+    """
+    Test suite for planning and applying assignments against the database.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='planuser@example.com',
+            password='password123',
+            first_name='Plan',
+            last_name='User'
+        )
+        cls.seating = SeatingType.objects.create(name="Standard", price_multiplier=1.0)
+        cls.table_2 = Table.objects.create(table_number='P1', seating_type=cls.seating, capacity=2)
+        cls.table_4 = Table.objects.create(table_number='P2', seating_type=cls.seating, capacity=4)
+        cls.day = date(2030, 3, 1)
+
+    def setUp(self):
+        clear_process_caches()
+        # A double booking left over on the 4-top.
+        self.couple = Booking.objects.create(
+            user=self.user, number_of_guests=2, booking_datetime=datetime.combine(self.day, time(18, 0)), table=self.table_4
+        )
+        self.family = Booking.objects.create(
+            user=self.user, number_of_guests=4, booking_datetime=datetime.combine(self.day, time(19, 0)), table=self.table_4
+        )
+
+    def test_plan_resolves_double_booking(self):
+        plan = plan_table_assignments(self.day)
+        self.assertEqual(plan.current_seated_covers, 0)
+        self.assertEqual(plan.seated_covers, 6)
+        self.assertEqual(plan.moves, [(self.couple.id, self.table_4.id, self.table_2.id)])
+
+        self.assertEqual(apply_table_assignment_plan(plan), 1)
+        self.couple.refresh_from_db()
+        self.assertEqual(self.couple.table, self.table_2)
+
+    def test_plan_is_not_applied_over_a_new_booking(self):
+        plan = plan_table_assignments(self.day)
+        # Another request takes the 2-top after the plan was made
+        Booking.objects.create(
+            user=self.user, number_of_guests=2, booking_datetime=datetime.combine(self.day, time(18, 30)), table=self.table_2
+        )
+        self.assertEqual(apply_table_assignment_plan(plan), 0)
+        self.couple.refresh_from_db()
+        self.assertEqual(self.couple.table, self.table_4)
+
+    def test_management_command(self):
+        call_command('optimize_tables', self.day.isoformat(), '--apply', stdout=StringIO())
+        self.couple.refresh_from_db()
+        self.assertEqual(self.couple.table, self.table_2)
@@ -0,0 +1,117 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ..availability import availability_index
+from ..models import CustomUser, SeatingType, Table, Booking, TimeSlot
+from ..serializers import MyTokenObtainPairSerializer
+from .utils import clear_process_caches
+
+
+class AsyncEndpointTests(TestCase):
+    """
+    Test suite for the async availability and price endpoints.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='asyncuser@example.com',
+            password='password123',
+            first_name='Async',
+            last_name='User'
+        )
+        cls.seating = SeatingType.objects.create(name="VIP", price_multiplier=Decimal('1.50'))
+        cls.table_2 = Table.objects.create(table_number='Y1', seating_type=cls.seating, capacity=2)
+        cls.table_4 = Table.objects.create(table_number='Y2', seating_type=cls.seating, capacity=4)
+        TimeSlot.objects.create(start_time=time(18, 0), end_time=time(22, 0), base_price_per_guest=Decimal('20.00'))
+        cls.booking_time = datetime(2030, 1, 1, 19, 0)
+        Booking.objects.create(user=cls.user, number_of_guests=2, booking_datetime=cls.booking_time, table=cls.table_2)
+        cls.token = str(MyTokenObtainPairSerializer.get_token(cls.user).access_token)
+
+    def setUp(self):
+        clear_process_caches()
+
+    async def post(self, url, data, token=None):
+        return await self.async_client.post(
+            url, data, content_type='application/json',
+            headers={'Authorization': f'Bearer {token or self.token}'}
+        )
+
+    def availability_request(self, guests=2):
+        return {
+            'seating_type_id': self.seating.id,
+            'number_of_guests': guests,
+            'booking_datetime': self.booking_time.isoformat(),
+        }
+
+    async def test_check_availability_skips_booked_table(self):
+        response = await self.post('/api/async/check-availability/', self.availability_request())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'available': True, 'table_id': self.table_4.id, 'capacity': 4})
+
+        response = await self.post('/api/async/check-availability/', self.availability_request(guests=6))
+        self.assertFalse(response.json()['available'])
+
+    async def test_check_availability_uses_loaded_index(self):
+        soon = (timezone.now() + timedelta(days=3)).replace(hour=19, minute=0, second=0, microsecond=0)
+        await Booking.objects.acreate(user=self.user, number_of_guests=4, booking_datetime=soon, table=self.table_4)
+        await sync_to_async(availability_index.load)()
+        self.assertTrue(availability_index.is_current_for(soon, soon + timedelta(hours=2)))
+
+        request = dict(self.availability_request(), booking_datetime=soon.isoformat())
+        response = await self.post('/api/async/check-availability/', request)
+        self.assertEqual(response.json()['table_id'], self.table_2.id)
+
+    async def test_matches_sync_endpoint(self):
+        sync_response = await self.async_client.post(
+            '/api/check-availability/', self.availability_request(), content_type='application/json',
+            headers={'Authorization': f'Bearer {self.token}'}
+        )
+        async_response = await self.post('/api/async/check-availability/', self.availability_request())
+        self.assertEqual(sync_response.json(), async_response.json())
+
+    async def test_total_price(self):
+        response = await self.post('/api/async/get-price/', {
+            'number_of_guests': 2,
+            'booking_datetime': self.booking_time.isoformat(),
+            'seating_type_id': self.seating.id,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(str(response.json()['total_price'])), Decimal('60.00'))
+
+    async def test_total_price_errors(self):
+        response = await self.post('/api/async/get-price/', {
+            'number_of_guests': 2,
+            'booking_datetime': self.booking_time.isoformat(),
+            'seating_type_id': 999999,
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), ['Invalid seating type.'])
+
+        response = await self.post('/api/async/get-price/', {
+            'number_of_guests': 2,
+            'booking_datetime': datetime(2030, 1, 1, 9, 0).isoformat(),
+            'seating_type_id': self.seating.id,
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('booking_datetime', response.json())
+
+    async def test_requires_valid_token(self):
+        response = await self.async_client.post('/api/async/get-price/', {}, content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+        response = await self.post('/api/async/get-price/', {}, token='not-a-token')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_token_without_claims_is_checked_against_database(self):
+        token = str(AccessToken.for_user(self.user))
+        response = await self.post('/api/async/check-availability/', self.availability_request(), token=token)
+        self.assertEqual(response.status_code, 200)
+
+    async def test_missing_fields(self):
+        response = await self.post('/api/async/check-availability/', {'number_of_guests': 2})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,124 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ..authentication import StatelessJWTAuthentication, TokenClaimsUser
+from ..models import CustomUser, SeatingType, Table, Booking, TimeSlot
+from ..roles import MANAGER_GROUP
+from ..serializers import MyTokenObtainPairSerializer
+from ..views import BookingViewSet, OccasionAdminViewSet
+from .utils import clear_process_caches
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    """
+    Test suite for the claims-only JWT authentication path.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='tokenuser@example.com',
+            password='password123',
+            first_name='Token',
+            last_name='User'
+        )
+        cls.manager = CustomUser.objects.create_user(
+            email='tokenmanager@example.com',
+            password='password123',
+            first_name='Token',
+            last_name='Manager'
+        )
+        cls.manager.groups.add(Group.objects.create(name=MANAGER_GROUP))
+        cls.seating = SeatingType.objects.create(name="Standard", price_multiplier=Decimal('1.00'))
+        cls.table = Table.objects.create(table_number='J1', seating_type=cls.seating, capacity=4)
+        TimeSlot.objects.create(start_time=time(18, 0), end_time=time(22, 0), base_price_per_guest=Decimal('10.00'))
+        Booking.objects.create(
+            user=cls.user,
+            number_of_guests=2,
+            booking_datetime=datetime(2030, 1, 1, 19, 0),
+            table=cls.table,
+            total_price=Decimal('20.00')
+        )
+
+    def setUp(self):
+        clear_process_caches()
+        self.authentication = StatelessJWTAuthentication()
+
+    def access_token(self, user):
+        return MyTokenObtainPairSerializer.get_token(user).access_token
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access_token(user)}')
+        return client
+
+    def test_claims_answer_without_queries(self):
+        token = self.access_token(self.manager)
+        with CaptureQueriesContext(connection) as queries:
+            user = self.authentication.get_user(token)
+            self.assertIsInstance(user, TokenClaimsUser)
+            self.assertEqual(user.pk, self.manager.pk)
+            self.assertEqual(user.email, 'tokenmanager@example.com')
+            self.assertTrue(user.is_authenticated)
+            self.assertFalse(user.is_staff)
+            self.assertTrue(user.is_manager)
+        self.assertEqual(len(queries), 0)
+
+    def test_model_fields_load_user_once(self):
+        user = self.authentication.get_user(self.access_token(self.user))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(user.first_name, 'Token')
+            self.assertEqual(user.last_name, 'User')
+            self.assertIsInstance(user, CustomUser)
+        self.assertEqual(len(queries), 1)
+
+    def test_token_without_claims_falls_back_to_database(self):
+        user = self.authentication.get_user(AccessToken.for_user(self.user))
+        self.assertIs(type(user), CustomUser)
+
+    def test_booking_list_skips_user_query(self):
+        client = self.client_for(self.user)
+        with mock.patch.object(BookingViewSet, 'authentication_classes', [StatelessJWTAuthentication]):
+            with CaptureQueriesContext(connection) as stateless:
+                response = client.get('/api/bookings/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+
+        with CaptureQueriesContext(connection) as stateful:
+            client.get('/api/bookings/')
+        self.assertEqual(len(stateless), len(stateful) - 1)
+
+    def test_manager_role_from_claim(self):
+        client = self.client_for(self.manager)
+        with mock.patch.object(OccasionAdminViewSet, 'authentication_classes', [StatelessJWTAuthentication]):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get('/api/admin/occasions/')
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse([query for query in queries.captured_queries if 'auth_group' in query['sql']])
+            self.assertEqual(self.client_for(self.user).get('/api/admin/occasions/').status_code, 403)
+
+    def test_create_assigns_loaded_user(self):
+        booking_time = (timezone.now() + timedelta(days=3)).replace(hour=19, minute=0, second=0, microsecond=0)
+        with mock.patch.object(BookingViewSet, 'authentication_classes', [StatelessJWTAuthentication]):
+            response = self.client_for(self.user).post('/api/bookings/', {
+                'number_of_guests': 2,
+                'booking_datetime': booking_time.isoformat(),
+                'seating_type_id': self.seating.id,
+            }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(Booking.objects.get(pk=response.data['id']).user, self.user)
+
+    def test_deleted_user_fails_on_load(self):
+        user = self.authentication.get_user(self.access_token(self.user))
+        CustomUser.objects.filter(pk=self.user.pk).delete()
+        with self.assertRaises(Exception):
+            user.first_name
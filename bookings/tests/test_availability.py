@@ -1,9 +1,12 @@
+from django.db import transaction
 from django.test import TestCase
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 import pytz
 
-from ..models import CustomUser, SeatingType, Table, Booking
-from ..availability import find_available_table, DEFAULT_BOOKING_DURATION
+from ..models import CustomUser, SeatingType, Table, Booking, TimeSlot
+from ..availability import find_available_table, TableIntervals, DEFAULT_BOOKING_DURATION
+from django.utils import timezone
+from .utils import clear_process_caches
 
 # Use a timezone-aware datetime object for all tests to avoid warnings
 # and ensure consistency.
@@ -48,6 +51,10 @@ class AvailabilityTests(TestCase):
             table=cls.table_std_4_seater
         )
 
+    def setUp(self):
+        # The availability index is process-wide; start every test from the database state.
+        clear_process_caches()
+
     def test_finds_smallest_available_table(self):
         """
         Test that when multiple tables are free, it picks the one with the
@@ -201,4 +208,144 @@ class AvailabilityTests(TestCase):
         
         self.assertIsNotNone(available_table, "Should find the table when its own booking is excluded.")
         # It should find the very table that the booking belongs to.
-        self.assertEqual(available_table.id, self.table_std_4_seater.id)
\ No newline at end of file
+        self.assertEqual(available_table.id, self.table_std_4_seater.id)
+
+
+class TableIntervalsTests(TestCase):
+    """
+    Test suite for the per-table sorted interval structure.
+    """
+
+    def setUp(self):
+        self.start = datetime(2030, 1, 1, 19, 0, 0)
+        self.intervals = TableIntervals()
+        self.intervals.add(1, self.start, self.start + DEFAULT_BOOKING_DURATION)
+
+    def test_overlap_is_detected(self):
+        self.assertFalse(self.intervals.is_free(self.start + timedelta(hours=1), self.start + timedelta(hours=3)))
+        self.assertFalse(self.intervals.is_free(self.start - timedelta(hours=1), self.start + timedelta(hours=1)))
+
+    def test_touching_intervals_do_not_conflict(self):
+        self.assertTrue(self.intervals.is_free(self.start + DEFAULT_BOOKING_DURATION, self.start + timedelta(hours=4)))
+        self.assertTrue(self.intervals.is_free(self.start - DEFAULT_BOOKING_DURATION, self.start))
+
+    def test_excluded_booking_is_ignored(self):
+        self.assertTrue(self.intervals.is_free(self.start, self.start + DEFAULT_BOOKING_DURATION, exclude_booking_id=1))
+
+    def test_remove(self):
+        self.intervals.remove(1, self.start)
+        self.assertTrue(self.intervals.is_free(self.start, self.start + DEFAULT_BOOKING_DURATION))
+
+
+class AvailabilityIndexTests(TestCase):
+    """
+    Test suite for the in-memory availability index and its signal-driven updates.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='indexuser@example.com',
+            password='password123',
+            first_name='Index',
+            last_name='User'
+        )
+        cls.seating = SeatingType.objects.create(name="Standard", price_multiplier=1.0)
+        cls.table = Table.objects.create(table_number='I1', seating_type=cls.seating, capacity=4)
+        cls.booking_time = (timezone.now() + timedelta(days=3)).replace(hour=19, minute=0, second=0, microsecond=0)
+
+    def setUp(self):
+        clear_process_caches()
+
+    def find(self, booking_datetime=None):
+        return find_available_table(
+            booking_datetime=booking_datetime or self.booking_time,
+            number_of_guests=2,
+            seating_type_id=self.seating.id
+        )
+
+    def test_lookup_does_not_query_bookings_once_loaded(self):
+        self.find()  # Loads the index
+        # Only the candidate table query should run.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.find(), self.table)
+
+    def test_new_booking_is_indexed_through_signal(self):
+        self.assertEqual(self.find(), self.table)
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.create(user=self.user, number_of_guests=2, booking_datetime=self.booking_time, table=self.table)
+        self.assertIsNone(self.find())
+
+    def test_rolled_back_booking_is_not_indexed(self):
+        self.assertEqual(self.find(), self.table)
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Booking.objects.create(user=self.user, number_of_guests=2, booking_datetime=self.booking_time, table=self.table)
+            raise RuntimeError("Roll back the booking")
+        self.assertEqual(self.find(), self.table)
+
+    def test_moved_and_deleted_bookings_free_the_table(self):
+        self.find()  # Loads the index
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = Booking.objects.create(user=self.user, number_of_guests=2, booking_datetime=self.booking_time, table=self.table)
+        self.assertIsNone(self.find())
+
+        booking.booking_datetime = self.booking_time + timedelta(hours=5)
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.assertEqual(self.find(), self.table)
+        self.assertIsNone(self.find(self.booking_time + timedelta(hours=5)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.delete()
+        self.assertEqual(self.find(self.booking_time + timedelta(hours=5)), self.table)
+
+    def test_requests_beyond_horizon_fall_back_to_database(self):
+        far_future = self.booking_time + timedelta(days=365)
+        Booking.objects.create(user=self.user, number_of_guests=2, booking_datetime=far_future, table=self.table)
+        self.assertIsNone(self.find(far_future))
+
+
+class BookingEndTimeTests(TestCase):
+    """
+    Test suite for the materialized booking_end_datetime column.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='enduser@example.com',
+            password='password123',
+            first_name='End',
+            last_name='User'
+        )
+        cls.seating = SeatingType.objects.create(name="Standard", price_multiplier=1.0)
+        cls.table = Table.objects.create(table_number='E1', seating_type=cls.seating, capacity=4)
+        cls.booking_time = (timezone.now() + timedelta(days=3)).replace(hour=19, minute=0, second=0, microsecond=0)
+
+    def setUp(self):
+        clear_process_caches()
+
+    def test_end_time_uses_default_duration(self):
+        booking = Booking.objects.create(user=self.user, number_of_guests=2, booking_datetime=self.booking_time, table=self.table)
+        self.assertEqual(booking.booking_end_datetime, self.booking_time + DEFAULT_BOOKING_DURATION)
+
+    def test_end_time_uses_time_slot_duration(self):
+        TimeSlot.objects.create(start_time=time(18, 0), end_time=time(22, 0), booking_duration=timedelta(hours=3))
+        booking = Booking.objects.create(user=self.user, number_of_guests=2, booking_datetime=self.booking_time, table=self.table)
+        self.assertEqual(booking.booking_end_datetime, self.booking_time + timedelta(hours=3))
+
+    def test_end_time_follows_rescheduling(self):
+        booking = Booking.objects.create(user=self.user, number_of_guests=2, booking_datetime=self.booking_time, table=self.table)
+        booking.booking_datetime = self.booking_time + timedelta(hours=1)
+        booking.save(update_fields=['booking_datetime'])
+        booking.refresh_from_db()
+        self.assertEqual(booking.booking_end_datetime, self.booking_time + timedelta(hours=1) + DEFAULT_BOOKING_DURATION)
+
+    def test_database_fallback_uses_stored_end_time(self):
+        TimeSlot.objects.create(start_time=time(18, 0), end_time=time(22, 0), booking_duration=timedelta(hours=3))
+        far_future = self.booking_time + timedelta(days=365)
+        Booking.objects.create(user=self.user, number_of_guests=2, booking_datetime=far_future, table=self.table)
+
+        # 2.5 hours later still overlaps a 3 hour booking, 3 hours later does not.
+        self.assertIsNone(find_available_table(far_future + timedelta(hours=2, minutes=30), 2, self.seating.id))
+        self.assertEqual(find_available_table(far_future + timedelta(hours=3), 2, self.seating.id), self.table)
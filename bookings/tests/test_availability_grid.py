@@ -0,0 +1,105 @@
+from datetime import date, datetime, time, timedelta
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from ..models import CustomUser, SeatingType, Table, Booking, TimeSlot
+from ..availability import build_availability_grid
+from .utils import clear_process_caches
+
+
+class AvailabilityGridTests(TestCase):
+    """
+    Test suite for build_availability_grid and the availability-grid endpoint.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='griduser@example.com',
+            password='password123',
+            first_name='Grid',
+            last_name='User'
+        )
+        cls.standard = SeatingType.objects.create(name="Standard", price_multiplier=1.0)
+        cls.vip = SeatingType.objects.create(name="VIP", price_multiplier=1.5)
+        cls.table_2 = Table.objects.create(table_number='S1', seating_type=cls.standard, capacity=2)
+        cls.table_4 = Table.objects.create(table_number='S2', seating_type=cls.standard, capacity=4)
+        cls.table_vip = Table.objects.create(table_number='V1', seating_type=cls.vip, capacity=6)
+
+        cls.lunch = TimeSlot.objects.create(start_time=time(12, 0), end_time=time(15, 0), label="Lunch")
+        cls.dinner = TimeSlot.objects.create(start_time=time(18, 0), end_time=time(22, 0), label="Dinner")
+
+        cls.day = date(2030, 5, 1)
+        # Occupies the 4-seater over dinner on the first day only.
+        Booking.objects.create(
+            user=cls.user,
+            number_of_guests=4,
+            booking_datetime=datetime.combine(cls.day, time(17, 0)),
+            table=cls.table_4
+        )
+
+    def setUp(self):
+        clear_process_caches()
+
+    def cell(self, grid, day_index, slot, seating_type):
+        time_slot = next(s for s in grid[day_index]['time_slots'] if s['time_slot_id'] == slot.id)
+        return next(s for s in time_slot['seating_types'] if s['seating_type_id'] == seating_type.id)
+
+    def test_grid_reflects_bookings(self):
+        grid = build_availability_grid(self.day, self.day + timedelta(days=1))
+        self.assertEqual(len(grid), 2)
+
+        dinner_standard = self.cell(grid, 0, self.dinner, self.standard)
+        self.assertEqual(dinner_standard['available_tables'], 1)
+        self.assertEqual(dinner_standard['available_seats'], 2)
+        self.assertEqual(dinner_standard['max_party_size'], 2)
+
+        lunch_standard = self.cell(grid, 0, self.lunch, self.standard)
+        self.assertEqual(lunch_standard['max_party_size'], 4)
+
+        next_day_dinner = self.cell(grid, 1, self.dinner, self.standard)
+        self.assertEqual(next_day_dinner['available_tables'], 2)
+
+        self.assertEqual(self.cell(grid, 0, self.dinner, self.vip)['max_party_size'], 6)
+
+    def test_query_count_does_not_depend_on_range(self):
+        build_availability_grid(self.day, self.day)  # Loads the time slot table
+        with self.assertNumQueries(2):
+            build_availability_grid(self.day, self.day)
+        with self.assertNumQueries(2):
+            build_availability_grid(self.day, self.day + timedelta(days=6))
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get('/api/availability-grid/', {'start_date': '2030-05-01', 'end_date': '2030-05-07'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['days']), 7)
+
+        response = client.get('/api/availability-grid/', {'start_date': '2030-05-07', 'end_date': '2030-05-01'})
+        self.assertEqual(response.status_code, 400)
+
+        response = client.get('/api/availability-grid/', {'start_date': '2030-05-01', 'end_date': '2030-07-01'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_time_slots_with_date_include_remaining_capacity(self):
+        client = APIClient()
+        build_availability_grid(self.day, self.day)  # Loads the time slot table
+        with self.assertNumQueries(2):
+            response = client.get('/api/time-slots/', {'date': '2030-05-01'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([slot['id'] for slot in response.data['time_slots']], [self.lunch.id, self.dinner.id])
+
+        dinner = response.data['time_slots'][1]
+        standard = next(s for s in dinner['seating_types'] if s['seating_type_id'] == self.standard.id)
+        self.assertEqual((standard['available_tables'], standard['available_seats']), (1, 2))
+
+        response = client.get('/api/time-slots/', {'date': '2030-05-02'})
+        dinner = response.data['time_slots'][1]
+        standard = next(s for s in dinner['seating_types'] if s['seating_type_id'] == self.standard.id)
+        self.assertEqual(standard['available_tables'], 2)
+
+        response = client.get('/api/time-slots/', {'date': 'tomorrow'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,93 @@
+import json
+import os
+import random
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..availability import availability_index
+from ..benchmark import delete_benchmark_data, seed_benchmark_data, summarize, Sample
+from ..models import CustomUser, Table, Booking, BookingTable, Payment, Task, TimeSlot
+from .utils import clear_process_caches
+
+
+class BenchmarkTests(TestCase):
+    """
+    Test suite for the benchmark seeding, statistics and the benchmark_api command.
+    """
+
+    def setUp(self):
+        clear_process_caches()
+
+    def test_seeded_bookings_do_not_overlap(self):
+        data = seed_benchmark_data(users=5, tables=4, bookings=200, days=3, rng=random.Random(1))
+        self.assertEqual(len(data.tokens), 5)
+        self.assertEqual(Table.objects.count(), 4)
+        self.assertTrue(TimeSlot.objects.exists())
+
+        bookings = list(Booking.objects.order_by('table_id', 'booking_datetime'))
+        self.assertTrue(bookings)
+        for previous, booking in zip(bookings, bookings[1:]):
+            if previous.table_id == booking.table_id:
+                self.assertLessEqual(previous.booking_end_datetime, booking.booking_datetime)
+            self.assertLessEqual(booking.number_of_guests, booking.table.capacity)
+
+    def test_delete_removes_only_seeded_rows(self):
+        user = CustomUser.objects.create_user(email='real@example.com', password='password123', first_name='Real', last_name='User')
+        seed_benchmark_data(users=2, tables=2, bookings=10, days=1, rng=random.Random(1))
+        delete_benchmark_data()
+        self.assertEqual(list(CustomUser.objects.all()), [user])
+        self.assertFalse(Table.objects.exists())
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(TimeSlot.objects.exists())
+
+    def test_delete_queues_no_tasks(self):
+        seed_benchmark_data(users=2, tables=8, bookings=200, days=3, rng=random.Random(1))
+        booking = Booking.objects.first()
+        Payment.objects.create(booking=booking, user=booking.user, amount=booking.total_price, method='stripe')
+        BookingTable.objects.create(booking=booking, table=Table.objects.exclude(pk=booking.table_id).first())
+        Task.objects.all().delete()
+        seeded = Booking.objects.count()
+        availability_index.load()
+
+        with CaptureQueriesContext(connection) as queries:
+            delete_benchmark_data()
+        self.assertLess(len(queries), seeded)  # Does not grow with the bookings
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(Payment.objects.exists())
+        self.assertFalse(BookingTable.objects.exists())
+        now = timezone.now()
+        self.assertFalse(availability_index.is_current_for(now, now))  # Reset, not left holding deleted bookings
+
+    def test_summarize_percentiles(self):
+        samples = [Sample(latency=i / 1000, status=200 if i < 100 else 500, queries=2) for i in range(1, 101)]
+        summary = summarize(samples, elapsed=2.0)
+        self.assertEqual(summary['latency_ms']['p50'], 50.0)
+        self.assertEqual(summary['latency_ms']['p95'], 95.0)
+        self.assertEqual(summary['latency_ms']['p99'], 99.0)
+        self.assertEqual(summary['throughput_rps'], 50.0)
+        self.assertEqual(summary['errors'], 1)
+        self.assertEqual(summary['queries_per_request'], {'mean': 2.0, 'max': 2})
+
+    def test_command_writes_results(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.json')
+            call_command(
+                'benchmark_api', users=3, tables=4, bookings=30, days=2, requests=5, concurrency=1,
+                output=path, stdout=StringIO(), stderr=StringIO()
+            )
+            with open(path) as output:
+                results = json.load(output)
+
+        self.assertEqual(set(results['scenarios']), {'check_availability', 'calculate_price', 'create_booking', 'booking_list'})
+        for summary in results['scenarios'].values():
+            self.assertEqual(summary['requests'], 5)
+            self.assertEqual(summary['errors'], 0)
+            self.assertGreater(summary['queries_per_request']['mean'], 0)
+        self.assertEqual(results['scenarios']['booking_list']['status_codes'], {'200': 5})
+        self.assertFalse(CustomUser.objects.exists())
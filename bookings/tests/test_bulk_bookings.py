@@ -0,0 +1,152 @@
+import json
+import os
+import tempfile
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..availability import availability_index, find_available_table
+from ..bulk import create_bookings_in_bulk
+from ..models import CustomUser, SeatingType, Table, Booking, TimeSlot
+from .utils import clear_process_caches
+
+
+class BulkBookingTests(TestCase):
+    """
+    Test suite for create_bookings_in_bulk and the bulk booking endpoint.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='organiser@example.com', password='password123', first_name='Event', last_name='Organiser'
+        )
+        cls.customer = CustomUser.objects.create_user(
+            email='customer@example.com', password='password123', first_name='Some', last_name='Customer'
+        )
+        cls.staff = CustomUser.objects.create_user(
+            email='callcentre@example.com', password='password123', first_name='Call', last_name='Centre', is_staff=True
+        )
+        cls.seating = SeatingType.objects.create(name="Standard", price_multiplier=Decimal('1.00'))
+        cls.table_2 = Table.objects.create(table_number='S1', seating_type=cls.seating, capacity=2)
+        cls.table_4 = Table.objects.create(table_number='S2', seating_type=cls.seating, capacity=4)
+        TimeSlot.objects.create(
+            start_time=time(18, 0), end_time=time(22, 0), label="Dinner", base_price_per_guest=Decimal('20.00')
+        )
+        cls.dinner = datetime.combine(timezone.now().date() + timedelta(days=3), time(19, 0))
+
+    def setUp(self):
+        clear_process_caches()
+
+    def item(self, guests=2, **overrides):
+        return {'number_of_guests': guests, 'booking_datetime': self.dinner, 'seating_type_id': self.seating.id, **overrides}
+
+    def test_items_in_one_batch_get_distinct_tables(self):
+        results = create_bookings_in_bulk([self.item(), self.item(), self.item()], default_user=self.user)
+
+        self.assertEqual(results[0]['booking'].table, self.table_2)
+        self.assertEqual(results[1]['booking'].table, self.table_4)
+        self.assertIn('non_field_errors', results[2]['errors'])
+        self.assertEqual(Booking.objects.count(), 2)
+
+        booking = Booking.objects.get(table=self.table_2)
+        self.assertEqual(booking.booking_end_datetime, self.dinner + timedelta(hours=2))
+        self.assertEqual(booking.total_price, Decimal('40.00'))
+        self.assertEqual(booking.base_price_per_guest, Decimal('20.00'))
+
+    def test_existing_bookings_are_respected(self):
+        Booking.objects.create(user=self.customer, number_of_guests=2, booking_datetime=self.dinner, table=self.table_2)
+        results = create_bookings_in_bulk([self.item()], default_user=self.user)
+        self.assertEqual(results[0]['booking'].table, self.table_4)
+
+    def test_invalid_items_do_not_block_the_batch(self):
+        results = create_bookings_in_bulk([
+            self.item(seating_type_id=999),
+            self.item(booking_datetime=self.dinner.replace(hour=10)),
+            self.item(booking_datetime=self.dinner - timedelta(days=30)),
+            self.item(),
+        ], default_user=self.user)
+
+        self.assertIn('seating_type_id', results[0]['errors'])
+        self.assertIn('booking_datetime', results[1]['errors'])
+        self.assertIn('booking_datetime', results[2]['errors'])
+        self.assertIn('booking', results[3])
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        create_bookings_in_bulk([self.item()], default_user=self.user)  # warm the slot cache
+        Booking.objects.all().delete()
+
+        items = [self.item(booking_datetime=self.dinner + timedelta(days=day)) for day in range(10)]
+        with CaptureQueriesContext(connection) as queries:
+            results = create_bookings_in_bulk(items, default_user=self.user)
+        self.assertTrue(all('booking' in result for result in results))
+        # Seating types, locked tables, overlapping bookings, one INSERT and the reporting
+        # refresh check and INSERT, plus the savepoint.
+        self.assertLessEqual(len(queries), 8)
+
+    def test_availability_index_sees_the_new_bookings(self):
+        find_available_table(self.dinner, 2, self.seating.id)  # load the index
+        with self.captureOnCommitCallbacks(execute=True):
+            create_bookings_in_bulk([self.item(), self.item()], default_user=self.user)
+        self.assertTrue(availability_index.covers(self.dinner, self.dinner + timedelta(hours=2)))
+        self.assertIsNone(find_available_table(self.dinner, 2, self.seating.id))
+
+    def test_dry_run_saves_nothing(self):
+        results = create_bookings_in_bulk([self.item(), self.item()], default_user=self.user, dry_run=True)
+        self.assertEqual([result['booking'].table for result in results], [self.table_2, self.table_4])
+        self.assertFalse(Booking.objects.exists())
+
+    def test_endpoint_returns_per_item_results(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post('/api/bookings/bulk/', {'bookings': [
+            self.item(booking_datetime=self.dinner.isoformat()),
+            {'number_of_guests': 0},
+            self.item(booking_datetime=self.dinner.isoformat(), user_id=self.customer.id),
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual(response.data['succeeded'], 1)
+        self.assertEqual(results[0]['booking']['table']['id'], self.table_2.id)
+        self.assertEqual(results[0]['booking']['user']['email'], self.user.email)
+        self.assertIn('number_of_guests', results[1]['errors'])
+        self.assertIn('user_id', results[2]['errors'])
+
+    def test_staff_can_book_for_customers(self):
+        client = APIClient()
+        client.force_authenticate(self.staff)
+        response = client.post('/api/bookings/bulk/', {'bookings': [
+            self.item(booking_datetime=self.dinner.isoformat(), user_id=self.customer.id),
+        ]}, format='json')
+
+        self.assertEqual(response.data['succeeded'], 1)
+        self.assertTrue(Booking.objects.filter(user=self.customer).exists())
+
+    def test_import_command(self):
+        mixed_case = CustomUser.objects.create_user(
+            email='Mixed.Case@example.com', password='password123', first_name='Mixed', last_name='Case'
+        )
+        rows = [
+            {'email': self.customer.email, **self.item(booking_datetime=self.dinner.isoformat())},
+            {'email': 'nobody@example.com', **self.item(booking_datetime=self.dinner.isoformat())},
+            {'email': 'mixed.case@EXAMPLE.com', **self.item(booking_datetime=self.dinner.isoformat())},
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as source:
+            json.dump(rows, source)
+        self.addCleanup(os.remove, source.name)
+
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_bookings', source.name, stdout=stdout, stderr=stderr)
+        self.assertIn("Created 2 bookings; 1 rows failed.", stdout.getvalue())
+        self.assertIn("Row 2: unknown user nobody@example.com.", stderr.getvalue())
+        self.assertEqual(
+            set(Booking.objects.values_list('user_id', flat=True)), {self.customer.id, mixed_case.id}
+        )
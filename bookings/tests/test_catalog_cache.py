@@ -0,0 +1,111 @@
+from datetime import time
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..models import Occasion, SeatingType, Table, TimeSlot
+from .utils import clear_process_caches
+
+
+class CatalogCacheTests(TestCase):
+    """
+    Test suite for the cached public catalog endpoints.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.occasion = Occasion.objects.create(name='Birthday')
+        cls.seating = SeatingType.objects.create(name="Standard", price_multiplier=Decimal('1.00'))
+        cls.table = Table.objects.create(table_number='C1', seating_type=cls.seating, capacity=4)
+        TimeSlot.objects.create(start_time=time(18, 0), end_time=time(22, 0), label="Dinner")
+
+    def setUp(self):
+        clear_process_caches()
+        self.client = APIClient()
+
+    def get(self, url, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, **headers)
+        return response, len(queries)
+
+    def test_second_request_runs_no_queries(self):
+        for url in ('/api/occasions/', '/api/seating-types/', '/api/time-slots/', '/api/tables/'):
+            first, first_queries = self.get(url)
+            second, second_queries = self.get(url)
+            self.assertEqual(first.status_code, 200)
+            self.assertGreater(first_queries, 0)
+            self.assertEqual(second_queries, 0, url)
+            self.assertEqual(first.content, second.content)
+            self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_query_string_is_part_of_the_key(self):
+        first, _ = self.get('/api/tables/')
+        self.get('/api/tables/?page=1')
+        _, queries = self.get('/api/tables/?page=1')
+        self.assertEqual(queries, 0)
+        detail, _ = self.get(f'/api/tables/{self.table.id}/')
+        self.assertNotEqual(first.content, detail.content)
+        self.assertEqual(detail.json()['table_number'], 'C1')
+
+    def test_etag_and_last_modified_return_304(self):
+        response, _ = self.get('/api/occasions/')
+        not_modified, queries = self.get('/api/occasions/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+        self.assertEqual(queries, 0)
+
+        not_modified, _ = self.get('/api/occasions/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_save_invalidates_own_model(self):
+        response, _ = self.get('/api/occasions/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Occasion.objects.create(name='Anniversary')
+        updated, queries = self.get('/api/occasions/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(updated.status_code, 200)
+        self.assertGreater(queries, 0)
+        self.assertEqual(updated.json()['count'], 2)
+
+    def test_delete_invalidates_own_model(self):
+        self.get('/api/tables/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Table.objects.filter(pk=self.table.pk).get().delete()
+        response, _ = self.get('/api/tables/')
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_nested_model_invalidates_tables(self):
+        self.get('/api/tables/')
+        self.seating.name = 'Garden'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.seating.save()
+        response, _ = self.get('/api/tables/')
+        self.assertEqual(response.json()['results'][0]['seating_type']['name'], 'Garden')
+
+    def test_rolled_back_change_keeps_cache(self):
+        self.get('/api/occasions/')
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Occasion.objects.create(name='Anniversary')
+            raise RuntimeError("Roll back the occasion")
+        _, queries = self.get('/api/occasions/')
+        self.assertEqual(queries, 0)
+
+    def test_unrelated_change_keeps_cache(self):
+        self.get('/api/occasions/')
+        TimeSlot.objects.create(start_time=time(12, 0), end_time=time(15, 0), label="Lunch")
+        _, queries = self.get('/api/occasions/')
+        self.assertEqual(queries, 0)
+
+    def test_browsable_api_bypasses_cache(self):
+        self.get('/api/occasions/', HTTP_ACCEPT='text/html')
+        response, queries = self.get('/api/occasions/', HTTP_ACCEPT='text/html')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(queries, 0)
+        self.assertNotIn('ETag', response)
+
+    def test_missing_object_is_not_cached(self):
+        response, _ = self.get('/api/tables/999999/')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response)
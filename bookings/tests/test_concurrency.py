@@ -0,0 +1,118 @@
+import threading
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import CustomUser, SeatingType, Table, Booking, TimeSlot
+from ..availability import allocate_booking
+from .utils import clear_process_caches
+
+
+class AllocateBookingTests(TestCase):
+    """
+    Test suite for allocate_booking and the booking create endpoint that uses it.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='allocuser@example.com',
+            password='password123',
+            first_name='Alloc',
+            last_name='User'
+        )
+        cls.seating = SeatingType.objects.create(name="Standard", price_multiplier=Decimal('1.00'))
+        cls.table_2 = Table.objects.create(table_number='A1', seating_type=cls.seating, capacity=2)
+        cls.table_4 = Table.objects.create(table_number='A2', seating_type=cls.seating, capacity=4)
+        TimeSlot.objects.create(start_time=time(18, 0), end_time=time(22, 0), base_price_per_guest=Decimal('10.00'))
+        cls.booking_time = (timezone.now() + timedelta(days=3)).replace(hour=19, minute=0, second=0, microsecond=0)
+
+    def setUp(self):
+        clear_process_caches()
+
+    def test_falls_back_to_next_table_when_index_is_stale(self):
+        # Simulate a booking written by another worker: the index is loaded first and
+        # never hears about the new row.
+        self.assertIsNotNone(allocate_booking(self.booking_time, 2, self.seating.id, user=self.user))
+        Booking.objects.filter(table=self.table_2).delete()
+        Booking.objects.bulk_create([
+            Booking(
+                user=self.user,
+                number_of_guests=2,
+                booking_datetime=self.booking_time,
+                booking_end_datetime=self.booking_time + timedelta(hours=2),
+                table=self.table_2
+            )
+        ])
+
+        booking = allocate_booking(self.booking_time, 2, self.seating.id, user=self.user)
+        self.assertEqual(booking.table, self.table_4)
+        self.assertIsNone(allocate_booking(self.booking_time, 2, self.seating.id, user=self.user))
+
+    def test_create_endpoint_allocates_and_prices(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post('/api/bookings/', {
+            'number_of_guests': 2,
+            'booking_datetime': self.booking_time.isoformat(),
+            'seating_type_id': self.seating.id,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        booking = Booking.objects.get(pk=response.data['id'])
+        self.assertEqual(booking.table, self.table_2)
+        self.assertEqual(booking.total_price, Decimal('20.00'))
+
+
+class ConcurrentAllocationStressTests(TransactionTestCase):
+    """
+    Fire parallel booking creates at the same slot against the test database and check
+    that no table ends up double booked.
+    """
+
+    THREADS = 8
+    TABLES = 3
+
+    def setUp(self):
+        clear_process_caches()
+        self.users = [
+            CustomUser.objects.create_user(
+                email=f'stress{i}@example.com',
+                password='password123',
+                first_name='Stress',
+                last_name=str(i)
+            )
+            for i in range(self.THREADS)
+        ]
+        self.seating = SeatingType.objects.create(name="Standard", price_multiplier=Decimal('1.00'))
+        for i in range(self.TABLES):
+            Table.objects.create(table_number=f'T{i}', seating_type=self.seating, capacity=4)
+        self.booking_time = datetime.combine(timezone.now().date() + timedelta(days=2), time(19, 0))
+
+    def test_parallel_creates_never_double_book(self):
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+
+        def create(user):
+            try:
+                barrier.wait()
+                booking = allocate_booking(self.booking_time, 2, self.seating.id, user=user)
+                results.append(booking.table_id if booking else None)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=create, args=(user,)) for user in self.users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        booked_tables = [table_id for table_id in results if table_id is not None]
+        self.assertEqual(len(results), self.THREADS)
+        self.assertGreater(len(booked_tables), 0)
+        self.assertEqual(len(booked_tables), len(set(booked_tables)), "A table was double booked.")
+        self.assertEqual(Booking.objects.count(), len(booked_tables))
+        self.assertLessEqual(len(booked_tables), self.TABLES)
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..models import CustomUser, SeatingType, Table, Booking, Payment
+from .utils import clear_process_caches
+
+
+class ConditionalGetTests(TestCase):
+    """
+    Test suite for ETag/Last-Modified handling on the booking and payment endpoints.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='polluser@example.com',
+            password='password123',
+            first_name='Poll',
+            last_name='User'
+        )
+        cls.other_user = CustomUser.objects.create_user(
+            email='otherpoll@example.com',
+            password='password123',
+            first_name='Other',
+            last_name='User'
+        )
+        cls.seating = SeatingType.objects.create(name="Standard", price_multiplier=Decimal('1.00'))
+        cls.table = Table.objects.create(table_number='P1', seating_type=cls.seating, capacity=4)
+        cls.booking = cls.create_booking(cls.user, 0)
+        cls.payment = Payment.objects.create(booking=cls.booking, user=cls.user, amount=Decimal('20.00'), method='stripe')
+
+    @classmethod
+    def create_booking(cls, user, days):
+        return Booking.objects.create(
+            user=user,
+            number_of_guests=2,
+            booking_datetime=datetime(2030, 1, 1, 19, 0) + timedelta(days=days),
+            table=cls.table,
+            total_price=Decimal('20.00')
+        )
+
+    def setUp(self):
+        clear_process_caches()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, **headers)
+        return response, len(queries)
+
+    def test_unchanged_list_returns_304_with_one_query(self):
+        for url in ('/api/bookings/', '/api/payments/'):
+            response, _ = self.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response['ETag'].startswith('W/'))
+            self.assertIn('Last-Modified', response)
+
+            not_modified, queries = self.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(not_modified.status_code, 304, url)
+            self.assertEqual(not_modified.content, b'')
+            self.assertEqual(queries, 1)
+
+    def test_unchanged_detail_returns_304(self):
+        url = f'/api/bookings/{self.booking.id}/'
+        response, _ = self.get(url)
+        not_modified, _ = self.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        not_modified, _ = self.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_update_changes_etag(self):
+        response, _ = self.get('/api/bookings/')
+        self.booking.special_request = 'Window seat'
+        self.booking.save()
+        updated, _ = self.get('/api/bookings/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(updated.status_code, 200)
+        self.assertNotEqual(updated['ETag'], response['ETag'])
+
+    def test_delete_changes_etag(self):
+        extra = self.create_booking(self.user, 1)
+        response, _ = self.get('/api/bookings/')
+        extra.delete()
+        updated, _ = self.get('/api/bookings/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(updated.status_code, 200)
+        self.assertEqual(updated.json()['count'], 1)
+
+    def test_other_users_bookings_do_not_change_etag(self):
+        response, _ = self.get('/api/bookings/')
+        self.create_booking(self.other_user, 2)
+        not_modified, _ = self.get('/api/bookings/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_query_string_changes_etag(self):
+        first, _ = self.get('/api/bookings/')
+        cursor, _ = self.get('/api/bookings/?pagination=cursor', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cursor.status_code, 200)
+        self.assertNotEqual(first['ETag'], cursor['ETag'])
+
+    def test_empty_list_has_etag(self):
+        self.client.force_authenticate(self.other_user)
+        response, _ = self.get('/api/payments/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+        not_modified, _ = self.get('/api/payments/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
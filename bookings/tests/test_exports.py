@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from ..models import CustomUser, SeatingType, Table, Booking, Payment
+from ..exports import iter_export
+from .utils import clear_process_caches
+
+
+class ExportTests(TestCase):
+    """
+    Test suite for the streaming booking and payment exports.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_superuser(
+            email='exportadmin@example.com',
+            password='password123',
+            first_name='Export',
+            last_name='Admin'
+        )
+        cls.user = CustomUser.objects.create_user(
+            email='exportuser@example.com',
+            password='password123',
+            first_name='Export',
+            last_name='User'
+        )
+        seating = SeatingType.objects.create(name="Standard", price_multiplier=Decimal('1.00'))
+        table = Table.objects.create(table_number='E1', seating_type=seating, capacity=4)
+        cls.bookings = [
+            Booking.objects.create(
+                user=cls.user,
+                number_of_guests=2,
+                booking_datetime=datetime(2030, 1, 1 + i, 19, 0),
+                table=table,
+                total_price=Decimal('20.00')
+            )
+            for i in range(5)
+        ]
+        Payment.objects.create(booking=cls.bookings[0], user=cls.user, amount=Decimal('20.00'), method='stripe')
+
+    def setUp(self):
+        clear_process_caches()
+
+    def test_csv_respects_date_range(self):
+        content = ''.join(iter_export('bookings', 'csv', start_date=date(2030, 1, 2), end_date=date(2030, 1, 3), chunk_size=1))
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([int(row['id']) for row in rows], [self.bookings[1].id, self.bookings[2].id])
+        self.assertEqual(rows[0]['user__email'], 'exportuser@example.com')
+        self.assertEqual(rows[0]['table__table_number'], 'E1')
+
+    def test_ndjson(self):
+        lines = ''.join(iter_export('payments', 'ndjson')).splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['amount'], '20.00')
+
+    def test_endpoint_streams_and_is_staff_only(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(client.get('/api/admin/export/bookings/').status_code, 403)
+
+        client.force_authenticate(self.admin)
+        response = client.get('/api/admin/export/bookings/', {'file_format': 'ndjson'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 5)
+
+        self.assertEqual(client.get('/api/admin/export/bookings/', {'file_format': 'xml'}).status_code, 400)
+        self.assertEqual(client.get('/api/admin/export/bookings/', {'start_date': 'nope'}).status_code, 400)
+        self.assertEqual(client.get('/api/admin/export/users/').status_code, 404)
+
+    def test_management_command(self):
+        out = io.StringIO()
+        call_command('export_bookings', '--dataset', 'bookings', '--start-date', '2030-01-05', stdout=out)
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual([int(row['id']) for row in rows], [self.bookings[4].id])
+        self.assertEqual(rows[0]['booking_datetime'], str(datetime(2030, 1, 5, 19, 0)))
@@ -0,0 +1,103 @@
+from datetime import datetime, time
+from decimal import Decimal
+
+from asgiref.sync import iscoroutinefunction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..instrumentation import performance_registry, PerformanceMiddleware, RequestRecorder
+from ..models import CustomUser, SeatingType, Table, Booking, TimeSlot
+from .utils import clear_process_caches
+
+
+@override_settings(PERFORMANCE_INSTRUMENTATION=True, SLOW_REQUEST_THRESHOLD_MS=10_000)
+class PerformanceMiddlewareTests(TestCase):
+    """
+    Test suite for PerformanceMiddleware and the performance stats endpoint.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_superuser(
+            email='perfadmin@example.com',
+            password='password123',
+            first_name='Perf',
+            last_name='Admin'
+        )
+        cls.seating = SeatingType.objects.create(name="Standard", price_multiplier=Decimal('1.00'))
+        cls.table = Table.objects.create(table_number='M1', seating_type=cls.seating, capacity=4)
+        TimeSlot.objects.create(start_time=time(18, 0), end_time=time(22, 0))
+        Booking.objects.create(user=cls.admin, number_of_guests=2, booking_datetime=datetime(2030, 1, 1, 19, 0), table=cls.table)
+
+    def setUp(self):
+        clear_process_caches()
+        performance_registry.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def route(self, name, method='GET'):
+        return next(route for route in performance_registry.as_json()['routes'] if route['route'] == name and route['method'] == method)
+
+    def test_records_route_queries_and_serializer_time(self):
+        self.client.get('/api/bookings/')
+        self.client.get('/api/bookings/')
+        stats = self.route('booking-list')
+        self.assertEqual(stats['count'], 2)
+        self.assertGreater(stats['queries'], 0)
+        self.assertGreater(stats['db_time_seconds'], 0)
+        self.assertGreater(stats['serializer_time_seconds'], 0)
+        self.assertEqual(stats['duration_buckets']['10.0'], 2)
+
+    def test_function_view_route_name(self):
+        self.client.post('/api/check-availability/', {
+            'seating_type_id': self.seating.id, 'number_of_guests': 2, 'booking_datetime': '2030-01-02T19:00:00'
+        }, format='json')
+        self.assertEqual(self.route('find_available_table', 'POST')['count'], 1)
+
+    def test_prometheus_and_json_output(self):
+        self.client.get('/api/tables/')
+        response = self.client.get('/api/admin/performance/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('bookings_request_duration_seconds_bucket{route="table-list",method="GET",le="+Inf"} 1', body)
+        self.assertIn('bookings_request_queries_total{route="table-list",method="GET"}', body)
+
+        response = self.client.get('/api/admin/performance/?output=json')
+        self.assertIn('table-list', [route['route'] for route in response.json()['routes']])
+        self.assertEqual(self.client.get('/api/admin/performance/?output=xml').status_code, 400)
+
+    def test_stats_require_staff(self):
+        user = CustomUser.objects.create_user(email='perfuser@example.com', password='password123', first_name='Perf', last_name='User')
+        client = APIClient()
+        client.force_authenticate(user)
+        self.assertEqual(client.get('/api/admin/performance/').status_code, 403)
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0)
+    def test_slow_requests_are_logged_with_sql(self):
+        with self.assertLogs('bookings.instrumentation', level='WARNING') as logs:
+            self.client.get('/api/bookings/')
+        self.assertIn('booking-list', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    @override_settings(PERFORMANCE_INSTRUMENTATION=False)
+    def test_disabled_records_nothing(self):
+        self.client.get('/api/bookings/')
+        self.assertEqual(performance_registry.as_json(), {'routes': []})
+
+    def test_async_views_stay_async(self):
+        async def get_response(request):
+            return None
+
+        self.assertTrue(iscoroutinefunction(PerformanceMiddleware(get_response)))
+        self.assertFalse(iscoroutinefunction(PerformanceMiddleware(lambda request: None)))
+
+    async def test_async_view_is_recorded(self):
+        await self.async_client.post('/api/async/get-price/', {}, content_type='application/json')
+        self.assertEqual(self.route('async_get_total_price', 'POST')['count'], 1)
+
+    def test_duplicate_queries(self):
+        recorder = RequestRecorder()
+        for sql in ('SELECT 1', 'SELECT 2', 'SELECT 1', 'SELECT 1'):
+            recorder(lambda *args: None, sql, (), False, {})
+        self.assertEqual(recorder.duplicate_queries, 2)
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..models import CustomUser, SeatingType, Table, Booking, Payment
+from .utils import clear_process_caches
+
+
+class CursorPaginationTests(TestCase):
+    """
+    Test suite for the opt-in cursor mode on the booking, payment and user list endpoints.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_superuser(
+            email='pageadmin@example.com',
+            password='password123',
+            first_name='Page',
+            last_name='Admin'
+        )
+        cls.seating = SeatingType.objects.create(name="Standard", price_multiplier=Decimal('1.00'))
+        table = Table.objects.create(table_number='C1', seating_type=cls.seating, capacity=4)
+        start = datetime(2030, 1, 1, 19, 0)
+        # Two bookings per timestamp so the id tie-breaker matters.
+        Booking.objects.bulk_create([
+            Booking(
+                user=cls.admin,
+                number_of_guests=2,
+                booking_datetime=start + timedelta(days=i // 2),
+                booking_end_datetime=start + timedelta(days=i // 2, hours=2),
+                table=table
+            )
+            for i in range(25)
+        ])
+        Payment.objects.bulk_create([
+            Payment(booking=booking, user=cls.admin, amount=Decimal('10.00'), method='stripe')
+            for booking in Booking.objects.all()
+        ])
+
+    def setUp(self):
+        clear_process_caches()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def walk(self, url, params):
+        ids = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            ids.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def test_booking_cursor_pages_cover_history_once(self):
+        ids = self.walk('/api/bookings/', {'pagination': 'cursor'})
+        expected = list(Booking.objects.order_by('-booking_datetime', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_page_number_mode_is_unchanged(self):
+        response = self.client.get('/api/bookings/')
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_cursor_page_runs_no_count(self):
+        first = self.client.get('/api/admin/bookings/', {'pagination': 'cursor'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(first.data['next'])
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(len(queries), 1)
+
+    def test_payment_and_user_endpoints(self):
+        ids = self.walk('/api/admin/payments/', {'pagination': 'cursor', 'page_size': 7})
+        self.assertEqual(len(ids), 25)
+        self.assertEqual(len(set(ids)), 25)
+
+        self.assertEqual(self.walk('/api/payments/', {'pagination': 'cursor'}), ids)
+        self.assertEqual(self.walk('/api/admin/users/', {'pagination': 'cursor'}), [self.admin.id])
+
+    def test_user_endpoint_is_read_only(self):
+        response = self.client.post('/api/admin/users/', {}, format='json')
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(CustomUser.objects.count(), 1)
@@ -0,0 +1,157 @@
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from ..models import CustomUser, SeatingType, TimeSlot
+from ..pricing import calculate_booking_price, MAX_QUOTES_PER_REQUEST
+from ..slots import TimeSlotCache, TimeSlotTable, TIME_SLOT_VERSION_KEY, get_time_slot
+from .utils import clear_process_caches
+
+
+class TimeSlotTableTests(TestCase):
+    """
+    Test suite for the sorted time slot lookup table.
+    """
+
+    def setUp(self):
+        self.lunch = TimeSlot(id=1, start_time=time(12, 0), end_time=time(15, 0))
+        self.dinner = TimeSlot(id=2, start_time=time(18, 0), end_time=time(22, 0))
+        self.table = TimeSlotTable([self.dinner, self.lunch])
+
+    def test_lookup_inside_and_outside_slots(self):
+        self.assertEqual(self.table.lookup(time(13, 0)), [self.lunch])
+        self.assertEqual(self.table.lookup(time(22, 0)), [self.dinner])
+        self.assertEqual(self.table.lookup(time(16, 0)), [])
+        self.assertEqual(self.table.lookup(time(9, 0)), [])
+
+    def test_lookup_reports_overlapping_slots(self):
+        all_day = TimeSlot(id=3, start_time=time(10, 0), end_time=time(23, 0))
+        table = TimeSlotTable([self.lunch, self.dinner, all_day])
+        self.assertEqual(len(table.lookup(time(19, 0))), 2)
+
+
+class CachedPricingTests(TestCase):
+    """
+    Test suite for pricing through the cached time slot table.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seating = SeatingType.objects.create(name="VIP", price_multiplier=Decimal('1.50'))
+        cls.dinner = TimeSlot.objects.create(
+            start_time=time(18, 0),
+            end_time=time(22, 0),
+            label="Dinner",
+            base_price_per_guest=Decimal('20.00')
+        )
+        cls.booking_datetime = datetime(2030, 1, 1, 19, 0)
+
+    def setUp(self):
+        clear_process_caches()
+
+    def test_price_calculation(self):
+        self.assertEqual(calculate_booking_price(2, self.booking_datetime, self.seating), Decimal('60.00'))
+
+    def test_no_queries_once_loaded(self):
+        calculate_booking_price(2, self.booking_datetime, self.seating)
+        with self.assertNumQueries(0):
+            calculate_booking_price(4, self.booking_datetime, self.seating)
+
+    def test_time_outside_slots_is_rejected(self):
+        with self.assertRaises(ValidationError):
+            calculate_booking_price(2, datetime(2030, 1, 1, 9, 0), self.seating)
+
+    def test_time_slot_changes_invalidate_the_table(self):
+        self.assertEqual(get_time_slot(self.booking_datetime).base_price_per_guest, Decimal('20.00'))
+
+        self.dinner.base_price_per_guest = Decimal('30.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dinner.save()
+        self.assertEqual(get_time_slot(self.booking_datetime).base_price_per_guest, Decimal('30.00'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dinner.delete()
+        with self.assertRaises(TimeSlot.DoesNotExist):
+            get_time_slot(self.booking_datetime)
+
+    def test_version_is_bumped_on_commit(self):
+        get_time_slot(self.booking_datetime)
+        version = cache.get(TIME_SLOT_VERSION_KEY)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.dinner.base_price_per_guest = Decimal('30.00')
+            self.dinner.save()
+            self.assertEqual(cache.get(TIME_SLOT_VERSION_KEY), version)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(cache.get(TIME_SLOT_VERSION_KEY), version)
+
+    def test_shared_version_change_is_picked_up(self):
+        slot_cache = TimeSlotCache(check_interval=0)
+        self.assertEqual(slot_cache.get_table().lookup(time(19, 0))[0].base_price_per_guest, Decimal('20.00'))
+
+        # Simulate another worker changing the configuration: this process receives no signal,
+        # only the shared version key moves.
+        TimeSlot.objects.filter(pk=self.dinner.pk).update(base_price_per_guest=Decimal('25.00'))
+        cache.set(TIME_SLOT_VERSION_KEY, 'changed-elsewhere')
+        self.assertEqual(slot_cache.get_table().lookup(time(19, 0))[0].base_price_per_guest, Decimal('25.00'))
+
+
+class PriceQuoteTests(TestCase):
+    """
+    Test suite for the batch price quote endpoint.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='quoteuser@example.com',
+            password='password123',
+            first_name='Quote',
+            last_name='User'
+        )
+        cls.standard = SeatingType.objects.create(name="Standard", price_multiplier=Decimal('1.00'))
+        cls.vip = SeatingType.objects.create(name="VIP", price_multiplier=Decimal('1.50'))
+        TimeSlot.objects.create(start_time=time(18, 0), end_time=time(22, 0), base_price_per_guest=Decimal('20.00'))
+
+    def setUp(self):
+        clear_process_caches()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_batch_returns_prices_and_per_item_errors(self):
+        quotes = [
+            {'number_of_guests': 2, 'booking_datetime': '2030-01-01T19:00:00', 'seating_type_id': self.standard.id},
+            {'number_of_guests': 2, 'booking_datetime': '2030-01-01T19:00:00', 'seating_type_id': self.vip.id},
+            {'number_of_guests': 2, 'booking_datetime': '2030-01-01T09:00:00', 'seating_type_id': self.vip.id},
+            {'number_of_guests': 0, 'booking_datetime': '2030-01-01T19:00:00', 'seating_type_id': self.vip.id},
+            {'number_of_guests': 2, 'booking_datetime': '2030-01-01T19:00:00', 'seating_type_id': 9999},
+        ]
+        response = self.client.post('/api/price-quotes/', {'quotes': quotes}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        results = response.data['results']
+        self.assertEqual([result['index'] for result in results], [0, 1, 2, 3, 4])
+        self.assertEqual(results[0]['total_price'], Decimal('40.00'))
+        self.assertEqual(results[1]['total_price'], Decimal('60.00'))
+        self.assertIn('booking_datetime', results[2]['errors'])
+        self.assertIn('number_of_guests', results[3]['errors'])
+        self.assertIn('seating_type_id', results[4]['errors'])
+
+    def test_batch_runs_one_query(self):
+        quotes = [
+            {'number_of_guests': guests, 'booking_datetime': '2030-01-01T19:00:00', 'seating_type_id': seating_type.id}
+            for guests in range(1, 11) for seating_type in (self.standard, self.vip)
+        ]
+        self.client.post('/api/price-quotes/', {'quotes': quotes[:1]}, format='json')  # Loads the slot table
+        with self.assertNumQueries(1):
+            response = self.client.post('/api/price-quotes/', {'quotes': quotes}, format='json')
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_batch_size_is_limited(self):
+        quote = {'number_of_guests': 2, 'booking_datetime': '2030-01-01T19:00:00', 'seating_type_id': self.standard.id}
+        response = self.client.post('/api/price-quotes/', {'quotes': [quote] * (MAX_QUOTES_PER_REQUEST + 1)}, format='json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from ..models import CustomUser, Occasion, SeatingType, Table, Booking, Payment
+from .utils import QueryBudgetMixin, clear_process_caches
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """
+    Every list and detail endpoint must run a fixed number of queries, however many rows it returns.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_superuser(
+            email='admin@example.com',
+            password='password123',
+            first_name='Admin',
+            last_name='User'
+        )
+        cls.user = CustomUser.objects.create_user(
+            email='budgetuser@example.com',
+            password='password123',
+            first_name='Budget',
+            last_name='User'
+        )
+        cls.occasion = Occasion.objects.create(name='Birthday')
+        cls.seating = SeatingType.objects.create(name="Standard", capacity=4, price_multiplier=Decimal('1.00'))
+        cls.booking = cls.create_booking(0)
+
+    @classmethod
+    def create_booking(cls, i):
+        table = Table.objects.create(table_number=f'Q{i}', seating_type=cls.seating, capacity=4)
+        booking = Booking.objects.create(
+            user=cls.user,
+            number_of_guests=2,
+            booking_datetime=datetime(2030, 1, 1, 19, 0) + timedelta(days=i),
+            occasion=cls.occasion,
+            table=table,
+            total_price=Decimal('20.00')
+        )
+        Payment.objects.create(booking=booking, user=cls.user, amount=Decimal('20.00'), method='stripe')
+        return booking
+
+    def add_rows(self):
+        for i in range(1, 10):
+            self.create_booking(i)
+
+    def setUp(self):
+        clear_process_caches()
+        self.admin_client = APIClient()
+        self.admin_client.force_authenticate(self.admin)
+        self.user_client = APIClient()
+        self.user_client.force_authenticate(self.user)
+
+    def test_admin_booking_list(self):
+        self.assertQueryBudget(self.admin_client, '/api/admin/bookings/', 2, self.add_rows)
+
+    def test_admin_booking_detail(self):
+        self.assertQueryBudget(self.admin_client, f'/api/admin/bookings/{self.booking.id}/', 1)
+
+    def test_admin_table_list(self):
+        self.assertQueryBudget(self.admin_client, '/api/admin/tables/', 2, self.add_rows)
+
+    def test_admin_payment_list(self):
+        self.assertQueryBudget(self.admin_client, '/api/admin/payments/', 2, self.add_rows)
+
+    def test_booking_list(self):
+        # Validator aggregate for conditional GET, then count and page.
+        self.assertQueryBudget(self.user_client, '/api/bookings/', 3, self.add_rows)
+
+    def test_booking_detail(self):
+        self.assertQueryBudget(self.user_client, f'/api/bookings/{self.booking.id}/', 1)
+
+    def test_table_list(self):
+        self.assertQueryBudget(self.user_client, '/api/tables/', 2, self.add_rows)
+
+    def test_payment_list(self):
+        self.assertQueryBudget(self.user_client, '/api/payments/', 3, self.add_rows)
+
+    def assertChangelistBudget(self, url):
+        self.client.force_login(self.admin)
+        # Session, user and the changelist's own count/select queries; no per-row lookups.
+        self.assertQueryBudget(self.client, url, 8, self.add_rows)
+
+    def test_django_admin_booking_changelist(self):
+        self.assertChangelistBudget('/admin/bookings/booking/')
+
+    def test_django_admin_table_changelist(self):
+        self.assertChangelistBudget('/admin/bookings/table/')
+
+    def test_django_admin_payment_changelist(self):
+        self.assertChangelistBudget('/admin/bookings/payment/')
@@ -0,0 +1,128 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import CustomUser, SeatingType, Table, Booking, TimeSlot, DailyBookingSummary, Task, TaskStatus, BookingStatus, PaymentStatus
+from ..reporting import rebuild_daily_summaries, refresh_daily_summary
+from ..taskqueue import run_due_tasks
+from .utils import clear_process_caches
+
+
+class DailySummaryTests(TestCase):
+    """
+    Test suite for the daily occupancy and revenue rollup.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='reports@example.com', password='password123', first_name='Re', last_name='Ports'
+        )
+        cls.admin = CustomUser.objects.create_user(
+            email='manager@example.com', password='password123', first_name='Ad', last_name='Min', is_staff=True
+        )
+        cls.standard = SeatingType.objects.create(name="Standard", price_multiplier=Decimal('1.00'))
+        cls.vip = SeatingType.objects.create(name="VIP", price_multiplier=Decimal('1.50'))
+        cls.tables = [Table.objects.create(table_number=f'S{i}', seating_type=cls.standard, capacity=4) for i in range(4)]
+        cls.vip_table = Table.objects.create(table_number='V1', seating_type=cls.vip, capacity=4)
+        cls.lunch = TimeSlot.objects.create(start_time=time(12, 0), end_time=time(15, 0), label="Lunch")
+        cls.dinner = TimeSlot.objects.create(start_time=time(18, 0), end_time=time(22, 0), label="Dinner")
+        cls.day = timezone.now().date() + timedelta(days=5)
+
+    def setUp(self):
+        clear_process_caches()
+
+    def book(self, hour, table, guests=2, price='40.00', day=None, **fields):
+        return Booking.objects.create(
+            user=self.user,
+            number_of_guests=guests,
+            booking_datetime=datetime.combine(day or self.day, time(hour, 0)),
+            table=table,
+            total_price=Decimal(price),
+            **fields
+        )
+
+    def test_rollup_by_time_slot_and_seating_type(self):
+        self.book(19, self.tables[0], guests=2, price='40.00', payment_status=PaymentStatus.PAID)
+        self.book(20, self.tables[1], guests=4, price='80.00')
+        self.book(13, self.tables[0], guests=3, price='45.00')
+        self.book(19, self.vip_table, guests=2, price='60.00')
+        self.book(19, self.tables[2], status=BookingStatus.CANCELLED)
+
+        self.assertEqual(refresh_daily_summary(self.day), 3)
+
+        dinner = DailyBookingSummary.objects.get(date=self.day, time_slot=self.dinner, seating_type=self.standard)
+        self.assertEqual((dinner.bookings, dinner.guests, dinner.paid_bookings), (2, 6, 1))
+        self.assertEqual(dinner.revenue, Decimal('120.00'))
+        self.assertEqual(dinner.paid_revenue, Decimal('40.00'))
+        self.assertEqual((dinner.tables_used, dinner.tables_available), (2, 4))
+
+        lunch = DailyBookingSummary.objects.get(date=self.day, time_slot=self.lunch)
+        self.assertEqual(lunch.guests, 3)
+
+    def test_refresh_replaces_the_day(self):
+        booking = self.book(19, self.tables[0])
+        refresh_daily_summary(self.day)
+        booking.delete()
+        refresh_daily_summary(self.day)
+        self.assertFalse(DailyBookingSummary.objects.exists())
+
+    def test_booking_changes_queue_one_refresh_per_day(self):
+        self.book(19, self.tables[0])
+        self.book(20, self.tables[1])
+        refreshes = Task.objects.filter(name='refresh_daily_summary')
+        self.assertEqual([task.payload for task in refreshes], [{'day': self.day.isoformat()}])
+
+        refreshes.update(run_after=timezone.now())
+        run_due_tasks()
+        self.assertEqual(refreshes.get().status, TaskStatus.SUCCEEDED)
+        self.assertEqual(DailyBookingSummary.objects.get().bookings, 2)
+
+    def test_moving_a_booking_refreshes_both_days(self):
+        booking = Booking.objects.get(pk=self.book(19, self.tables[0]).pk)
+        Task.objects.all().delete()
+        booking.booking_datetime += timedelta(days=1)
+        booking.save()
+        days = sorted(task.payload['day'] for task in Task.objects.filter(name='refresh_daily_summary'))
+        self.assertEqual(days, [self.day.isoformat(), (self.day + timedelta(days=1)).isoformat()])
+
+    def test_report_reads_only_summary_rows(self):
+        for offset in range(3):
+            self.book(19, self.tables[0], day=self.day + timedelta(days=offset), payment_status=PaymentStatus.PAID)
+            self.book(19, self.tables[1], day=self.day + timedelta(days=offset))
+        rebuild_daily_summaries(self.day, self.day + timedelta(days=2))
+
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/admin/reports/daily/', {
+                'start_date': self.day.isoformat(),
+                'end_date': (self.day + timedelta(days=2)).isoformat(),
+            })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(len(response.data['days']), 3)
+        day = response.data['days'][0]
+        self.assertEqual((day['bookings'], day['revenue'], day['unpaid_revenue']), (2, Decimal('80.00'), Decimal('40.00')))
+        self.assertEqual(day['rows'][0]['utilisation'], 0.5)
+
+    def test_report_requires_staff(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get('/api/admin/reports/daily/', {'start_date': self.day.isoformat()})
+        self.assertEqual(response.status_code, 403)
+
+    def test_rebuild_command(self):
+        self.book(19, self.tables[0])
+        self.book(19, self.tables[0], day=self.day + timedelta(days=40))
+        stderr = StringIO()
+        call_command('rebuild_booking_summaries', '--window-days', '7', stderr=stderr)
+        self.assertIn("Wrote 2 summary rows", stderr.getvalue())
+        self.assertEqual(DailyBookingSummary.objects.count(), 2)
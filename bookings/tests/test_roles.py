@@ -0,0 +1,104 @@
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..models import CustomUser, Occasion
+from ..roles import is_manager, MANAGER_GROUP
+from ..serializers import MyTokenObtainPairSerializer
+from .utils import clear_process_caches
+
+
+class ManagerRoleTests(TestCase):
+    """
+    Test suite for the cached Manager group check behind permissions.IsManager.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name=MANAGER_GROUP)
+        cls.manager = CustomUser.objects.create_user(
+            email='manager@example.com',
+            password='password123',
+            first_name='Man',
+            last_name='Ager'
+        )
+        cls.manager.groups.add(cls.group)
+        cls.user = CustomUser.objects.create_user(
+            email='plainuser@example.com',
+            password='password123',
+            first_name='Plain',
+            last_name='User'
+        )
+        cls.occasion = Occasion.objects.create(name='Birthday')
+
+    def setUp(self):
+        clear_process_caches()
+
+    def group_queries(self, queries):
+        return [query['sql'] for query in queries.captured_queries if 'auth_group' in query['sql']]
+
+    def test_role_is_cached_across_calls(self):
+        self.assertTrue(is_manager(self.manager))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(is_manager(self.manager))
+            self.assertFalse(is_manager(self.user))
+            self.assertFalse(is_manager(self.user))
+        self.assertEqual(len(self.group_queries(queries)), 1)
+
+    def test_object_request_runs_one_group_query(self):
+        client = APIClient()
+        client.force_authenticate(self.manager)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(f'/api/admin/occasions/{self.occasion.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.group_queries(queries)), 1)
+
+    def test_membership_changes_invalidate(self):
+        self.assertFalse(is_manager(self.user))
+        self.user.groups.add(self.group)
+        self.assertTrue(is_manager(self.user))
+        self.user.groups.remove(self.group)
+        self.assertFalse(is_manager(self.user))
+
+        self.group.user_set.add(self.user)
+        self.assertTrue(is_manager(self.user))
+        self.group.user_set.clear()
+        self.assertFalse(is_manager(self.user))
+        self.assertFalse(is_manager(self.manager))
+
+    def test_user_side_clear_invalidates(self):
+        self.assertTrue(is_manager(self.manager))
+        self.manager.groups.clear()
+        self.assertFalse(is_manager(self.manager))
+
+    def test_group_rename_and_delete_invalidate(self):
+        self.assertTrue(is_manager(self.manager))
+        self.group.name = 'Former Managers'
+        self.group.save()
+        self.assertFalse(is_manager(self.manager))
+
+        self.group.name = MANAGER_GROUP
+        self.group.save()
+        self.assertTrue(is_manager(self.manager))
+        self.group.delete()
+        self.assertFalse(is_manager(self.manager))
+
+    def test_manager_loses_access_after_removal(self):
+        client = APIClient()
+        client.force_authenticate(self.manager)
+        self.assertEqual(client.get('/api/admin/occasions/').status_code, 200)
+        self.manager.groups.remove(self.group)
+        self.assertEqual(client.get('/api/admin/occasions/').status_code, 403)
+
+    def test_token_carries_manager_claim(self):
+        self.assertTrue(MyTokenObtainPairSerializer.get_token(self.manager)['is_manager'])
+        token = MyTokenObtainPairSerializer.get_token(self.user)
+        self.assertFalse(token['is_manager'])
+        self.assertEqual(token['username'], self.user.email)
+
+    def test_login_issues_manager_claim(self):
+        response = APIClient().post('/auth/jwt/create/', {'email': 'manager@example.com', 'password': 'password123'}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['user']['email'], 'manager@example.com')
@@ -0,0 +1,127 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..availability import availability_index, find_available_table
+from ..models import CustomUser, SeatingType, Table, Booking, Payment, BookingStatus, PaymentStatus
+from ..sweeper import stale_pending_bookings, sweep_bookings
+from .utils import clear_process_caches
+
+
+class BookingSweeperTests(TestCase):
+    """
+    Test suite for the expiry and no-show sweep, and for availability ignoring released bookings.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='sweeper@example.com', password='password123', first_name='Sweep', last_name='Er'
+        )
+        cls.seating = SeatingType.objects.create(name="Standard", price_multiplier=Decimal('1.00'))
+        cls.table = Table.objects.create(table_number='S1', seating_type=cls.seating, capacity=4)
+        cls.other_table = Table.objects.create(table_number='S2', seating_type=cls.seating, capacity=4)
+        cls.future = datetime.combine(timezone.now().date() + timedelta(days=3), time(19, 0))
+        cls.past = timezone.now() - timedelta(hours=3)
+
+    def setUp(self):
+        clear_process_caches()
+
+    def book(self, start, table=None, made_ago=timedelta(0), **fields):
+        booking = Booking.objects.create(
+            user=self.user, number_of_guests=2, booking_datetime=start, table=table or self.table, **fields
+        )
+        Booking.objects.filter(pk=booking.pk).update(created_at=timezone.now() - made_ago)
+        return booking
+
+    def status(self, booking):
+        booking.refresh_from_db()
+        return booking.status
+
+    def test_expires_unpaid_pending_bookings_past_the_hold(self):
+        stale = self.book(self.future, made_ago=timedelta(hours=2))
+        fresh = self.book(self.future, table=self.other_table)
+        started = self.book(self.past, table=self.other_table)
+        paid = self.book(self.future, made_ago=timedelta(hours=2), payment_status=PaymentStatus.PAID)
+
+        counts = sweep_bookings()
+
+        self.assertEqual(counts['expired'], 2)
+        self.assertEqual(self.status(stale), BookingStatus.EXPIRED)
+        self.assertEqual(self.status(started), BookingStatus.EXPIRED)
+        self.assertEqual(self.status(fresh), BookingStatus.PENDING)
+        self.assertEqual(self.status(paid), BookingStatus.PENDING)
+
+    def test_payment_awaiting_verification_keeps_the_booking(self):
+        booking = self.book(self.future, made_ago=timedelta(hours=2))
+        Payment.objects.create(
+            booking=booking, user=self.user, amount=Decimal('40.00'), method='stripe', status=PaymentStatus.PAID
+        )
+        self.assertEqual(sweep_bookings()['expired'], 0)
+        self.assertEqual(self.status(booking), BookingStatus.PENDING)
+
+    def test_payment_in_flight_keeps_the_booking(self):
+        in_flight = self.book(self.future, made_ago=timedelta(hours=2))
+        Payment.objects.create(booking=in_flight, user=self.user, amount=Decimal('40.00'), method='stripe', transaction_id='pi_1')
+        rejected = self.book(self.future, table=self.other_table, made_ago=timedelta(hours=2))
+        Payment.objects.create(
+            booking=rejected, user=self.user, amount=Decimal('40.00'), method='stripe', transaction_id='pi_2', verified=True
+        )
+        no_reference = self.book(self.future + timedelta(days=1), made_ago=timedelta(hours=2))
+        Payment.objects.create(booking=no_reference, user=self.user, amount=Decimal('40.00'), method='local_bank')
+
+        self.assertEqual(sweep_bookings()['expired'], 2)
+        self.assertEqual(self.status(in_flight), BookingStatus.PENDING)
+        self.assertEqual(self.status(rejected), BookingStatus.EXPIRED)
+        self.assertEqual(self.status(no_reference), BookingStatus.EXPIRED)
+
+    def test_marks_past_confirmed_bookings_as_no_show(self):
+        past = self.book(self.past, status=BookingStatus.CONFIRMED)
+        upcoming = self.book(self.future, status=BookingStatus.CONFIRMED)
+
+        self.assertEqual(sweep_bookings()['no_show'], 1)
+        self.assertEqual(self.status(past), BookingStatus.NO_SHOW)
+        self.assertEqual(self.status(upcoming), BookingStatus.CONFIRMED)
+
+    def test_sweep_is_three_updates(self):
+        self.book(self.future, made_ago=timedelta(hours=2))
+        self.book(self.past, status=BookingStatus.CONFIRMED)
+        with CaptureQueriesContext(connection) as queries:
+            sweep_bookings()
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 3)
+
+    def test_expiry_uses_the_status_indexes(self):
+        overdue, started = stale_pending_bookings(timezone.now())
+        self.assertIn('booking_status_created_idx', overdue.explain())
+        self.assertIn('booking_status_datetime_idx', started.explain())
+
+    def test_expired_bookings_free_their_table(self):
+        self.book(self.future, made_ago=timedelta(hours=2))
+        self.book(self.future, table=self.other_table, status=BookingStatus.CANCELLED)
+        self.assertEqual(find_available_table(self.future, 2, self.seating.id), self.other_table)
+
+        sweep_bookings()
+        self.assertEqual(find_available_table(self.future, 2, self.seating.id), self.table)
+
+    def test_index_drops_bookings_cancelled_through_save(self):
+        booking = self.book(self.future)
+        find_available_table(self.future, 2, self.seating.id)  # load the index
+        self.assertFalse(availability_index.is_table_free(self.table.id, self.future, self.future + timedelta(hours=1)))
+
+        booking.status = BookingStatus.CANCELLED
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.assertTrue(availability_index.is_table_free(self.table.id, self.future, self.future + timedelta(hours=1)))
+
+    def test_command(self):
+        self.book(self.future, made_ago=timedelta(hours=2))
+        stdout = StringIO()
+        call_command('sweep_bookings', stdout=stdout)
+        self.assertIn("Expired 1 bookings, marked 0 as no-show.", stdout.getvalue())
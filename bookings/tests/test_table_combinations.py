@@ -0,0 +1,161 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..alternatives import suggest_alternatives
+from ..assignment import plan_table_assignments
+from ..availability import (
+    availability_index, allocate_booking, build_availability_grid, find_available_table, find_table_combination
+)
+from ..bulk import create_bookings_in_bulk
+from ..combinations import TableCombinations, table_combination_cache
+from ..models import CustomUser, SeatingType, Table, Booking, BookingTable, TimeSlot, BookingStatus, DailyBookingSummary
+from ..reporting import rebuild_daily_summaries
+from ..serializers import MyTokenObtainPairSerializer
+from .utils import clear_process_caches
+
+
+class TableCombinationTests(TestCase):
+    """
+    Test suite for seating large parties on combinations of adjacent tables.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='party@example.com', password='password123', first_name='Big', last_name='Party'
+        )
+        cls.seating = SeatingType.objects.create(name="Standard", price_multiplier=Decimal('1.00'))
+        # S1 - S2 - S3 stand in a row; S4 stands alone
+        cls.s1, cls.s2, cls.s3, cls.s4 = [
+            Table.objects.create(table_number=f'S{i}', seating_type=cls.seating, capacity=4) for i in range(1, 5)
+        ]
+        cls.s1.adjacent_tables.add(cls.s2)
+        cls.s2.adjacent_tables.add(cls.s3)
+        TimeSlot.objects.create(
+            start_time=time(17, 0), end_time=time(22, 0), label="Dinner", base_price_per_guest=Decimal('10.00')
+        )
+        cls.dinner = datetime.combine(timezone.now().date() + timedelta(days=3), time(19, 0))
+
+    def setUp(self):
+        clear_process_caches()
+
+    def test_combinations_follow_adjacency(self):
+        combinations = table_combination_cache.get()
+        self.assertEqual(combinations.count, 3)
+        self.assertEqual(
+            list(combinations.candidates(self.seating.id, 5)),
+            [(self.s1.id, self.s2.id), (self.s2.id, self.s3.id), (self.s1.id, self.s2.id, self.s3.id)]
+        )
+        self.assertEqual(list(combinations.candidates(self.seating.id, 9)), [(self.s1.id, self.s2.id, self.s3.id)])
+        self.assertEqual(list(combinations.candidates(self.seating.id, 13)), [])
+
+    def test_enumeration_is_capped(self):
+        tables = [self.s1, self.s2, self.s3, self.s4]
+        adjacency = {table.id: {other.id for other in tables if other != table} for table in tables}
+        self.assertEqual(TableCombinations(tables, adjacency).count, 11)
+        self.assertEqual(TableCombinations(tables, adjacency, limit=6).count, 6)  # only the pairs
+
+    def test_fewest_free_tables_are_chosen(self):
+        self.assertEqual(find_table_combination(self.dinner, 6, self.seating.id), [self.s1, self.s2])
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.create(user=self.user, number_of_guests=2, booking_datetime=self.dinner, table=self.s1)
+        self.assertEqual(find_table_combination(self.dinner, 6, self.seating.id), [self.s2, self.s3])
+        self.assertIsNone(find_table_combination(self.dinner, 9, self.seating.id))
+
+    def test_combined_booking_holds_every_table(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post('/api/bookings/', {
+                'number_of_guests': 12,
+                'booking_datetime': self.dinner.isoformat(),
+                'seating_type_id': self.seating.id,
+            }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+
+        booking = Booking.objects.get(pk=response.data['id'])
+        self.assertEqual(booking.table, self.s1)
+        self.assertEqual(set(booking.additional_tables.values_list('table_id', flat=True)), {self.s2.id, self.s3.id})
+        self.assertEqual(booking.total_price, Decimal('120.00'))
+
+        # The additional tables are taken, both from the database and from the index
+        self.assertEqual(find_available_table(self.dinner + timedelta(days=90), 2, self.seating.id), self.s1)
+        self.assertEqual(find_available_table(self.dinner, 2, self.seating.id), self.s4)
+        self.assertTrue(availability_index.covers(self.dinner, self.dinner + timedelta(hours=2)))
+        availability_index.clear()
+        self.assertEqual(find_available_table(self.dinner, 2, self.seating.id), self.s4)
+
+    def test_cancelling_frees_the_combination(self):
+        find_available_table(self.dinner, 2, self.seating.id)  # Loads the index
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = allocate_booking(self.dinner, 12, self.seating.id, user=self.user)
+        self.assertEqual(BookingTable.objects.filter(booking=booking).count(), 2)
+        self.assertIsNone(allocate_booking(self.dinner, 5, self.seating.id, user=self.user))
+
+        booking.status = BookingStatus.CANCELLED
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.assertEqual(find_table_combination(self.dinner, 12, self.seating.id), [self.s1, self.s2, self.s3])
+
+        # Moving the booking keeps all of its tables in the index
+        booking.status = BookingStatus.PENDING
+        booking.booking_datetime += timedelta(hours=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.assertEqual(find_available_table(self.dinner + timedelta(hours=1), 2, self.seating.id), self.s4)
+
+    def test_adjacency_changes_rebuild_combinations(self):
+        self.assertEqual(table_combination_cache.get().count, 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.s3.adjacent_tables.add(self.s4)
+        self.assertEqual(table_combination_cache.get().count, 6)
+
+    def test_grid_counts_free_combinations(self):
+        def max_party_size():
+            [day] = build_availability_grid(self.dinner.date(), self.dinner.date())
+            return day['time_slots'][0]['seating_types'][0]['max_party_size']
+
+        self.assertEqual(max_party_size(), 12)
+        lunch = datetime.combine(self.dinner.date(), time(17, 0))
+        Booking.objects.create(user=self.user, number_of_guests=2, booking_datetime=lunch, table=self.s2)
+        self.assertEqual(max_party_size(), 4)
+
+    def test_alternatives_offer_combinations(self):
+        [option] = suggest_alternatives(self.dinner, 12, self.seating.id, max_results=1)
+        self.assertEqual(option['booking_datetime'], self.dinner)
+        self.assertEqual(option['table_ids'], [self.s1.id, self.s2.id, self.s3.id])
+        self.assertEqual(option['capacity'], 12)
+
+    async def test_async_check_availability_offers_combinations(self):
+        token = str((await sync_to_async(MyTokenObtainPairSerializer.get_token)(self.user)).access_token)
+        response = await self.async_client.post('/api/async/check-availability/', {
+            'seating_type_id': self.seating.id,
+            'number_of_guests': 6,
+            'booking_datetime': self.dinner.isoformat(),
+        }, content_type='application/json', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.json()['table_ids'], [self.s1.id, self.s2.id])
+
+    def test_bulk_bookings_use_combinations(self):
+        item = {'number_of_guests': 12, 'booking_datetime': self.dinner, 'seating_type_id': self.seating.id}
+        results = create_bookings_in_bulk([item, dict(item, number_of_guests=2)], default_user=self.user)
+        combined, single = results[0]['booking'], results[1]['booking']
+        self.assertEqual(combined.table, self.s1)
+        self.assertEqual(set(combined.additional_tables.values_list('table_id', flat=True)), {self.s2.id, self.s3.id})
+        self.assertEqual(single.table, self.s4)
+
+    def test_report_counts_every_table_of_a_combination(self):
+        allocate_booking(self.dinner, 12, self.seating.id, user=self.user)
+        rebuild_daily_summaries(self.dinner.date(), self.dinner.date())
+        self.assertEqual(DailyBookingSummary.objects.get().tables_used, 3)
+
+    def test_table_optimizer_leaves_combined_bookings_alone(self):
+        combined = allocate_booking(self.dinner, 12, self.seating.id, user=self.user)
+        Booking.objects.create(user=self.user, number_of_guests=2, booking_datetime=self.dinner, table=self.s4)
+        plan = plan_table_assignments(self.dinner.date())
+        self.assertNotIn(combined.id, plan.assignments)
+        self.assertEqual(plan.moves, [])
@@ -0,0 +1,202 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..gateways import PAYMENT_FAILED, PAYMENT_PENDING, get_payment_gateway, reset_payment_gateway
+from ..models import CustomUser, SeatingType, Table, Booking, Payment, Task, TaskStatus, BookingStatus, PaymentStatus
+from ..taskqueue import RetryTask, claim_tasks, enqueue, retry_delay, run_due_tasks, task, TASK_LOCK_TIMEOUT
+from .utils import clear_process_caches
+
+CALLS = []
+
+
+@task('test_flaky', max_attempts=2)
+def flaky(fail=False, retry=False):
+    CALLS.append((fail, retry))
+    if retry:
+        raise RetryTask("not yet", delay=timedelta(seconds=5))
+    if fail:
+        raise RuntimeError("boom")
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class TaskQueueTests(TestCase):
+    """
+    Test suite for the database-backed task queue.
+    """
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_successful_task(self):
+        queued = enqueue('test_flaky')
+        [(claimed, status)] = run_due_tasks()
+
+        self.assertEqual(claimed.pk, queued.pk)
+        self.assertEqual(status, TaskStatus.SUCCEEDED)
+        self.assertEqual(Task.objects.get().status, TaskStatus.SUCCEEDED)
+        self.assertEqual(run_due_tasks(), [])
+
+    def test_failures_back_off_then_give_up(self):
+        enqueue('test_flaky', fail=True)
+        run_due_tasks()
+
+        queued = Task.objects.get()
+        self.assertEqual(queued.status, TaskStatus.QUEUED)
+        self.assertEqual(queued.attempts, 1)
+        self.assertIn("boom", queued.last_error)
+        self.assertGreater(queued.run_after, timezone.now() + retry_delay(1) - timedelta(seconds=5))
+        self.assertEqual(run_due_tasks(), [])  # not due yet
+
+        Task.objects.update(run_after=timezone.now())
+        run_due_tasks()
+        self.assertEqual(Task.objects.get().status, TaskStatus.FAILED)
+        self.assertEqual(len(CALLS), 2)
+
+    def test_retry_delay_doubles_and_is_capped(self):
+        self.assertEqual(retry_delay(2), retry_delay(1) * 2)
+        self.assertEqual(retry_delay(100), retry_delay(200))
+
+    def test_retry_task_uses_its_delay(self):
+        enqueue('test_flaky', retry=True)
+        run_due_tasks()
+        queued = Task.objects.get()
+        self.assertEqual(queued.status, TaskStatus.QUEUED)
+        self.assertLessEqual(queued.run_after, timezone.now() + timedelta(seconds=5))
+
+    def test_claimed_tasks_are_not_claimed_twice(self):
+        enqueue('test_flaky')
+        self.assertEqual(len(claim_tasks(10, 'a')), 1)
+        self.assertEqual(claim_tasks(10, 'b'), [])
+
+        # A claim older than the lock timeout belongs to a dead worker
+        Task.objects.update(locked_at=timezone.now() - TASK_LOCK_TIMEOUT - timedelta(seconds=1))
+        self.assertEqual(len(claim_tasks(10, 'b')), 1)
+
+    def test_unknown_task_name(self):
+        with self.assertRaises(ValueError):
+            enqueue('no_such_task')
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    PAYMENT_GATEWAY='bookings.gateways.FakePaymentGateway',
+)
+class PaymentTaskTests(TestCase):
+    """
+    Test suite for payment verification and booking emails through the fake gateway.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='payer@example.com', password='password123', first_name='Pay', last_name='Er'
+        )
+        seating = SeatingType.objects.create(name="Standard", price_multiplier=Decimal('1.00'))
+        table = Table.objects.create(table_number='S1', seating_type=seating, capacity=4)
+        cls.booking = Booking.objects.create(
+            user=cls.user,
+            number_of_guests=2,
+            booking_datetime=datetime.combine(timezone.now().date() + timedelta(days=3), time(19, 0)),
+            table=table
+        )
+
+    def setUp(self):
+        clear_process_caches()
+        reset_payment_gateway()
+        self.addCleanup(reset_payment_gateway)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def pay(self):
+        response = self.client.post('/api/payments/', {
+            'booking': self.booking.id, 'amount': '40.00', 'method': 'stripe', 'status': 'paid', 'transaction_id': 'pi_1'
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return Payment.objects.get(pk=response.data['id'])
+
+    def test_payment_without_transaction_is_left_for_staff(self):
+        response = self.client.post('/api/payments/', {
+            'booking': self.booking.id, 'amount': '40.00', 'method': 'local_bank', 'status': 'paid', 'verified': True
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['status'], PaymentStatus.UNPAID)
+        self.assertFalse(response.data['verified'])
+        self.assertFalse(Task.objects.filter(name='verify_payment').exists())
+
+        run_due_tasks()
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, BookingStatus.PENDING)
+
+    @override_settings(PAYMENT_GATEWAY='')
+    def test_payment_is_left_unverified_without_gateway(self):
+        payment = self.pay()
+        run_due_tasks()
+        payment.refresh_from_db()
+        self.booking.refresh_from_db()
+        self.assertFalse(payment.verified)
+        self.assertEqual(payment.status, PaymentStatus.UNPAID)
+        self.assertEqual(self.booking.status, BookingStatus.PENDING)
+
+    def test_payment_request_only_queues_work(self):
+        self.pay()
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, BookingStatus.PENDING)
+        self.assertEqual(Task.objects.filter(name='verify_payment').count(), 1)
+        self.assertEqual(mail.outbox, [])
+
+    def test_worker_confirms_booking_and_sends_email(self):
+        payment = self.pay()
+        stdout = StringIO()
+        call_command('run_tasks', '--once', stdout=stdout, stderr=StringIO())
+
+        payment.refresh_from_db()
+        self.booking.refresh_from_db()
+        self.assertTrue(payment.verified)
+        self.assertIsNotNone(payment.paid_at)
+        self.assertEqual(self.booking.status, BookingStatus.CONFIRMED)
+        self.assertEqual(self.booking.payment_status, PaymentStatus.PAID)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.user.email])
+        self.assertIn("Confirmed", mail.outbox[0].subject)
+        self.assertEqual(get_payment_gateway().verified, [payment.pk])
+        self.assertIn("send_booking_status_email", stdout.getvalue())
+
+    @override_settings(FAKE_PAYMENT_GATEWAY_RESULT=PAYMENT_PENDING)
+    def test_pending_payment_is_retried(self):
+        self.pay()
+        run_due_tasks()
+        queued = Task.objects.get(name='verify_payment')
+        self.assertEqual(queued.status, TaskStatus.QUEUED)
+        self.assertGreater(queued.run_after, timezone.now())
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, BookingStatus.PENDING)
+
+    @override_settings(FAKE_PAYMENT_GATEWAY_RESULT=PAYMENT_FAILED)
+    def test_failed_payment_leaves_booking_pending(self):
+        payment = self.pay()
+        run_due_tasks()
+        payment.refresh_from_db()
+        self.booking.refresh_from_db()
+        self.assertEqual(payment.status, PaymentStatus.UNPAID)
+        self.assertTrue(payment.verified)  # Checked, and not paid
+        self.assertEqual(self.booking.status, BookingStatus.PENDING)
+        self.assertEqual(mail.outbox, [])
+
+    def test_payment_for_expired_booking_is_flagged_for_refund(self):
+        payment = self.pay()
+        Booking.objects.filter(pk=self.booking.pk).update(status=BookingStatus.EXPIRED)
+        run_due_tasks()
+        payment.refresh_from_db()
+        self.booking.refresh_from_db()
+        self.assertTrue(payment.verified)
+        self.assertEqual(self.booking.status, BookingStatus.EXPIRED)
+        self.assertEqual(self.booking.payment_status, PaymentStatus.UNPAID)
+        self.assertIn("refund", self.booking.staff_note)
+        self.assertEqual(mail.outbox, [])
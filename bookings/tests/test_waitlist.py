@@ -0,0 +1,144 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import CustomUser, SeatingType, Table, Booking, BookingTable, TimeSlot, Task, WaitlistEntry, WaitlistStatus, BookingStatus
+from ..sweeper import sweep_bookings
+from ..taskqueue import run_due_tasks
+from ..waitlist import match_waitlist
+from .utils import clear_process_caches
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class WaitlistTests(TestCase):
+    """
+    Test suite for the waitlist API and the matcher that books released tables.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.holder = CustomUser.objects.create_user(
+            email='holder@example.com', password='password123', first_name='Table', last_name='Holder'
+        )
+        cls.waiter = CustomUser.objects.create_user(
+            email='waiter@example.com', password='password123', first_name='Still', last_name='Waiting'
+        )
+        cls.seating = SeatingType.objects.create(name="Standard", price_multiplier=Decimal('1.00'))
+        cls.table = Table.objects.create(table_number='S1', seating_type=cls.seating, capacity=4)
+        TimeSlot.objects.create(
+            start_time=time(17, 0), end_time=time(22, 0), label="Dinner", base_price_per_guest=Decimal('20.00')
+        )
+        cls.dinner = datetime.combine(timezone.now().date() + timedelta(days=3), time(19, 0))
+
+    def setUp(self):
+        clear_process_caches()
+        self.booking = Booking.objects.create(
+            user=self.holder, number_of_guests=2, booking_datetime=self.dinner, table=self.table
+        )
+
+    def wait(self, guests=2, booking_datetime=None):
+        return WaitlistEntry.objects.create(
+            user=self.waiter, number_of_guests=guests, booking_datetime=booking_datetime or self.dinner, seating_type=self.seating
+        )
+
+    def test_join_only_when_nothing_is_free(self):
+        client = APIClient()
+        client.force_authenticate(self.waiter)
+        request = {'number_of_guests': 2, 'booking_datetime': self.dinner.isoformat(), 'seating_type_id': self.seating.id}
+
+        response = client.post('/api/waitlist/', request, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['status'], WaitlistStatus.WAITING)
+
+        request['booking_datetime'] = (self.dinner - timedelta(days=1)).isoformat()
+        response = client.post('/api/waitlist/', request, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_leaving_the_waitlist(self):
+        entry = self.wait()
+        client = APIClient()
+        client.force_authenticate(self.waiter)
+        response = client.delete(f'/api/waitlist/{entry.pk}/')
+        self.assertEqual(response.status_code, 204)
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, WaitlistStatus.CANCELLED)
+
+    def test_waitlist_in_admin(self):
+        entry = self.wait()
+        admin = CustomUser.objects.create_superuser(
+            email='admin@example.com', password='password123', first_name='Ad', last_name='Min'
+        )
+        self.client.force_login(admin)
+        response = self.client.get('/admin/bookings/waitlistentry/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, f'/admin/bookings/waitlistentry/{entry.pk}/change/')
+
+    def test_cancellation_books_the_first_party_that_fits(self):
+        too_big = self.wait(guests=6)
+        first = self.wait()
+        second = self.wait()
+
+        self.booking.status = BookingStatus.CANCELLED
+        self.booking.save()
+        self.assertEqual(Task.objects.filter(name='match_waitlist').count(), 1)
+        run_due_tasks()
+
+        for entry in (too_big, first, second):
+            entry.refresh_from_db()
+        self.assertEqual(too_big.status, WaitlistStatus.WAITING)
+        self.assertEqual(first.status, WaitlistStatus.BOOKED)
+        self.assertEqual(second.status, WaitlistStatus.WAITING)
+        self.assertEqual(first.booking.table, self.table)
+        self.assertEqual(first.booking.user, self.waiter)
+        self.assertEqual(first.booking.total_price, Decimal('40.00'))
+
+    def test_saving_a_released_booking_again_does_not_queue(self):
+        self.booking.status = BookingStatus.CANCELLED
+        self.booking.save()
+        self.booking.save()
+        Booking.objects.get(pk=self.booking.pk).save()
+        self.assertEqual(Task.objects.filter(name='match_waitlist').count(), 1)
+
+    def test_deletion_and_expiry_release_the_table(self):
+        self.booking.delete()
+        self.assertEqual(Task.objects.filter(name='match_waitlist').count(), 1)
+
+        Task.objects.all().delete()
+        booking = Booking.objects.create(user=self.holder, number_of_guests=2, booking_datetime=self.dinner, table=self.table)
+        Booking.objects.filter(pk=booking.pk).update(created_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(sweep_bookings()['expired'], 1)
+        self.assertEqual(Task.objects.filter(name='match_waitlist').count(), 1)
+
+    def test_combined_booking_releases_every_table(self):
+        other = Table.objects.create(table_number='S2', seating_type=self.seating, capacity=4)
+        BookingTable.objects.create(booking=self.booking, table=other)
+        self.booking.delete()
+        self.assertEqual(
+            sorted(task.payload['table_id'] for task in Task.objects.filter(name='match_waitlist')),
+            [self.table.id, other.id]
+        )
+
+        Task.objects.all().delete()
+        booking = Booking.objects.create(user=self.holder, number_of_guests=6, booking_datetime=self.dinner, table=self.table)
+        BookingTable.objects.create(booking=booking, table=other)
+        Booking.objects.filter(pk=booking.pk).update(created_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(sweep_bookings()['expired'], 1)
+        self.assertEqual(
+            sorted(task.payload['table_id'] for task in Task.objects.filter(name='match_waitlist')),
+            [self.table.id, other.id]
+        )
+
+    def test_match_only_considers_the_released_window(self):
+        day_before = self.wait(booking_datetime=self.dinner - timedelta(days=1))
+        after = self.wait(booking_datetime=self.dinner + timedelta(hours=2))  # Starts as the released booking ends
+        overlapping = self.wait(booking_datetime=self.dinner + timedelta(minutes=30))
+        Booking.objects.filter(pk=self.booking.pk).update(status=BookingStatus.CANCELLED)
+
+        promoted = match_waitlist(self.table.id, self.dinner, self.dinner + timedelta(hours=2))
+        self.assertEqual(promoted, [overlapping])
+        self.assertEqual(
+            set(WaitlistEntry.objects.filter(status=WaitlistStatus.WAITING)), {day_before, after}
+        )
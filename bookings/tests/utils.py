@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..availability import availability_index
+from ..combinations import table_combination_cache
+from ..slots import time_slot_cache
+from ..caching import catalog_cache
+
+
+def clear_process_caches():
+    """
+    Reset the process-local availability index, time slot table, table combinations, catalog
+    response cache and cached manager roles.
+
+    Test transactions are rolled back without sending model signals, so state cached
+    by one test would otherwise leak into the next.
+    """
+    availability_index.clear()
+    time_slot_cache.clear()
+    table_combination_cache.clear()
+    catalog_cache.clear()
+    cache.clear()
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin that holds endpoints to a fixed query budget.
+
+    assertQueryBudget requests a URL, lets the test add more rows, and requests it again.
+    Both requests must run the same number of queries, and no more than the budget, so an
+    N+1 introduced in a serializer or queryset fails the test whatever the page size.
+    """
+
+    def assertQueryBudget(self, client, url, budget, add_rows=None):
+        with CaptureQueriesContext(connection) as before:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, f"GET {url} returned {response.status_code}")
+
+        if add_rows is not None:
+            # Run the rows' on-commit signal handlers, as a committed write would
+            with self.captureOnCommitCallbacks(execute=True):
+                add_rows()
+
+        with CaptureQueriesContext(connection) as after:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, f"GET {url} returned {response.status_code}")
+
+        queries = '\n'.join(query['sql'] for query in after.captured_queries)
+        self.assertEqual(
+            len(before), len(after),
+            f"GET {url} ran {len(before)} queries before adding rows and {len(after)} after:\n{queries}"
+        )
+        self.assertLessEqual(len(after), budget, f"GET {url} ran {len(after)} queries, budget is {budget}:\n{queries}")
@@ -9,6 +9,8 @@ from .views import (
     BookingViewSet,
     TableViewSet,
     PaymentViewSet,
+    WaitlistViewSet,
+    UserAdminViewSet,
     OccasionAdminViewSet,
     SeatingTypeAdminViewSet,
     TimeSlotAdminViewSet,
@@ -16,10 +18,16 @@ from .views import (
     TableAdminViewSet,
     PaymentAdminViewSet,
     check_availability,
-    get_total_price
+    availability_grid,
+    get_total_price,
+    get_price_quotes,
+    export_data,
+    daily_report,
+    performance_stats
 )
 
 from .availability import find_available_table
+from . import async_views
 
 # DefaultRouter automatically handles the URL routing for ViewSets.
 # It creates the standard list, create, retrieve, update, destroy routes.
@@ -37,8 +45,10 @@ router.register(r'seating-types', SeatingTypeViewSet, basename='seatingtypes')
 router.register(r'time-slots', TimeSlotViewSet, basename='timeslot')
 router.register(r'tables', TableViewSet, basename='table')
 router.register(r'payments', PaymentViewSet, basename='payment')
+router.register(r'waitlist', WaitlistViewSet, basename='waitlist')
 
 admin_router = DefaultRouter()
+admin_router.register(r'users', UserAdminViewSet, basename='admin-users')
 admin_router.register(r'occasions', OccasionAdminViewSet, basename='admin-occasion')
 admin_router.register(r'seating-types', SeatingTypeAdminViewSet, basename='admin-seatingtypes')
 admin_router.register(r'time-slots', TimeSlotAdminViewSet, basename='admin-timeslot')
@@ -51,7 +61,15 @@ admin_router.register(r'payments', PaymentAdminViewSet, basename='admin-payments
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('admin/export/<str:dataset>/', export_data, name='export_data'),
+    path('admin/performance/', performance_stats, name='performance_stats'),
+    path('admin/reports/daily/', daily_report, name='daily_report'),
     path('admin/', include(admin_router.urls)),
     path("check-availability/", check_availability, name="find_available_table"),
+    path("availability-grid/", availability_grid, name="availability_grid"),
     path('get-price/', get_total_price, name='get_total_price'),
+    path('price-quotes/', get_price_quotes, name='get_price_quotes'),
+    # Async-native versions for ASGI workers (see bookings/async_views.py).
+    path('async/check-availability/', async_views.check_availability, name='async_check_availability'),
+    path('async/get-price/', async_views.get_total_price, name='async_get_total_price'),
 ]
\ No newline at end of file
@@ -4,20 +4,30 @@ from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Prefetch
 from .filters import BookingFilter
-from .pricing import calculate_booking_price
+from .pricing import calculate_booking_price, quote_booking_prices
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
 from .permissions import IsManager
-from .availability import find_available_table
-from rest_framework.decorators import api_view
-from django.utils.dateparse import parse_datetime
+from .pagination import CursorPaginationMixin
+from .caching import CachedCatalogMixin, ConditionalGetMixin
+from .availability import find_available_table, find_table_combination, build_availability_grid, MAX_GRID_DAYS
+from .slots import get_time_slots
+from .alternatives import suggest_alternatives
+from rest_framework.decorators import api_view, permission_classes
+from django.http import StreamingHttpResponse, HttpResponse
+from .exports import iter_export, EXPORT_DATASETS, EXPORT_FORMATS
+from .instrumentation import performance_registry
+from .bulk import create_bookings_in_bulk
+from .reporting import build_daily_report, MAX_REPORT_DAYS
+from .roles import request_is_manager
+from django.utils.dateparse import parse_datetime, parse_date
 from rest_framework.exceptions import ValidationError
 from datetime import datetime
 
 
 
-from .models import CustomUser, Occasion, SeatingType, Booking, TimeSlot, Table, Payment
+from .models import CustomUser, Occasion, SeatingType, Booking, TimeSlot, Table, Payment, WaitlistEntry, WaitlistStatus
 from .serializers import (
     UserRegistrationSerializer,
     OccasionSerializer,
@@ -25,9 +35,14 @@ from .serializers import (
     BookingSerializer,
     TimeSlotSerializer,
     PriceCalculationSerializer,
+    PriceQuoteSerializer,
+    PriceQuoteItemSerializer,
+    BulkBookingSerializer,
+    BulkBookingItemSerializer,
     UserSerializer,
     TableSerializer,
-    PaymentSerializer
+    PaymentSerializer,
+    WaitlistEntrySerializer
 )
 
 class UserRegistrationView(generics.CreateAPIView):
@@ -41,14 +56,17 @@ class UserRegistrationView(generics.CreateAPIView):
     serializer_class = UserRegistrationSerializer
     permission_classes = [AllowAny]
 
-class UserAdminViewSet(viewsets.ModelViewSet):
+class UserAdminViewSet(CursorPaginationMixin, viewsets.ReadOnlyModelViewSet):
     """
-    Admin-only viewset for managing users.
+    Admin-only viewset for listing users.
 
-    Provides full CRUD operations on CustomUser instances.
+    Provides list and retrieve of CustomUser instances; UserSerializer is read-only, so users
+    are created through registration and edited in the Django admin.
     Access is restricted to users with admin privileges (is_staff=True).
+    Newest users first; `?pagination=cursor` switches to count-free cursor pages.
     """
-    queryset = CustomUser.objects.all()
+    queryset = CustomUser.objects.order_by('-created_at', '-id')
+    cursor_ordering = ('-created_at', '-id')
     serializer_class = UserSerializer
     permission_classes = [IsAdminUser]
 
@@ -107,7 +125,7 @@ class TimeSlotAdminViewSet(viewsets.ModelViewSet):
     serializer_class = TimeSlotSerializer
     permission_classes = [IsAdminUser]
 
-class BookingAdminViewSet(viewsets.ModelViewSet):
+class BookingAdminViewSet(CursorPaginationMixin, viewsets.ModelViewSet):
     """
     Admin and Manager endpoint for full CRUD operations on Booking instances.
     
@@ -121,8 +139,17 @@ class BookingAdminViewSet(viewsets.ModelViewSet):
         - Create new bookings
         - Update existing bookings
         - Delete bookings
+
+    Queryset:
+        - Joins user, occasion and table with its seating type, which BookingSerializer nests,
+          so a page of bookings is fetched in a single query.
+
+    Pagination:
+        - Ordered by (-booking_datetime, -id). `?pagination=cursor` switches to count-free
+          cursor pages served from booking_datetime_id_idx.
     """
-    queryset = Booking.objects.all()
+    queryset = Booking.objects.select_related('user', 'occasion', 'table__seating_type').order_by('-booking_datetime', '-id')
+    cursor_ordering = ('-booking_datetime', '-id')
     serializer_class = BookingSerializer
     permission_classes = [IsAdminUser | IsManager]
 
@@ -140,12 +167,15 @@ class TableAdminViewSet(viewsets.ModelViewSet):
         - Create new tables
         - Update existing tables
         - Delete tables
+
+    Queryset:
+        - Joins the seating type nested by TableSerializer.
     """
-    queryset = Table.objects.all()
+    queryset = Table.objects.select_related('seating_type')
     serializer_class = TableSerializer
     permission_classes = [IsAdminUser | IsManager]
 
-class PaymentAdminViewSet(viewsets.ModelViewSet):
+class PaymentAdminViewSet(CursorPaginationMixin, viewsets.ModelViewSet):
     """
     Admin and Manager endpoint for full CRUD operations on Payment records.
 
@@ -159,12 +189,19 @@ class PaymentAdminViewSet(viewsets.ModelViewSet):
         - Create new payments
         - Update existing payments
         - Delete payments
+
+    Queryset:
+        - PaymentSerializer renders booking and user as primary keys only, so no joins are needed.
+
+    Pagination:
+        - Newest first. `?pagination=cursor` switches to count-free cursor pages.
     """
-    queryset = Payment.objects.all()
+    queryset = Payment.objects.order_by('-created_at', '-id')
+    cursor_ordering = ('-created_at', '-id')
     serializer_class = PaymentSerializer
     permission_classes = [IsAdminUser | IsManager]
 
-class OccasionViewSet(viewsets.ReadOnlyModelViewSet):
+class OccasionViewSet(CachedCatalogMixin, viewsets.ReadOnlyModelViewSet):
     """
     Public endpoint to list and retrieve active occasions.
     Read-only: no creation, update, or delete allowed.
@@ -174,12 +211,15 @@ class OccasionViewSet(viewsets.ReadOnlyModelViewSet):
 
     Queryset:
         - Only occasions marked as active (`is_active=True`) are included.
+
+    Caching:
+        - Rendered JSON is cached until an Occasion changes, with ETag/Last-Modified support.
     """
     queryset = Occasion.objects.filter(is_active=True)
     serializer_class = OccasionSerializer
     permission_classes = [AllowAny]
 
-class SeatingTypeViewSet(viewsets.ReadOnlyModelViewSet):
+class SeatingTypeViewSet(CachedCatalogMixin, viewsets.ReadOnlyModelViewSet):
     """
     Public endpoint to list and retrieve active seating types.
     Read-only: no create, update, or delete allowed.
@@ -189,54 +229,82 @@ class SeatingTypeViewSet(viewsets.ReadOnlyModelViewSet):
 
     Queryset:
         - Only seating types marked as active (`is_active=True`) are included.
+
+    Caching:
+        - Rendered JSON is cached until a SeatingType changes, with ETag/Last-Modified support.
     """
     queryset = SeatingType.objects.filter(is_active=True)
     serializer_class = SeatingTypeSerializer
     permission_classes = [AllowAny]
 
-class TimeSlotViewSet(viewsets.ReadOnlyModelViewSet):
+class TimeSlotViewSet(CachedCatalogMixin, viewsets.ReadOnlyModelViewSet):
     """
-    Public endpoint to list available time slots.
-    Currently returns all time slots ordered by start time.
-    
-    Can be extended to filter slots by date or availability.
-    
+    Public endpoint to list time slots, ordered by start time.
+
+    Query params:
+        - date (YYYY-MM-DD): Optional. Return every slot of that day, unpaginated, each with the
+          free tables, free seats and largest seatable party per seating type.
+
     Permissions:
         - Accessible by any user (authenticated or anonymous).
+
+    Caching:
+        - Rendered JSON is cached per query string until a TimeSlot changes. Responses for a
+          date depend on bookings and are never cached.
     """
     queryset = TimeSlot.objects.all().order_by('start_time')
     serializer_class = TimeSlotSerializer
     permission_classes = [AllowAny]
 
-    # Optional example: filter by date query param to show slots on a specific date
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        date = self.request.query_params.get('date')
-        if date:
-            # Assuming you have a date field on TimeSlot or related model to filter by
-            # Adjust this filtering logic based on your model's date fields
-            queryset = queryset.filter(start_time__date=date)
-        return queryset
+    def list(self, request, *args, **kwargs):
+        date_param = request.query_params.get('date')
+        if date_param is None:
+            return super().list(request, *args, **kwargs)
+
+        day = parse_date(date_param)
+        if day is None:
+            return Response({"detail": "date must be a valid date (YYYY-MM-DD)."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # One pass over the day's bookings for all slots (see build_availability_grid)
+        grid = build_availability_grid(day, day)
+        availability = {cell['time_slot_id']: cell['seating_types'] for entry in grid for cell in entry['time_slots']}
+        time_slots = TimeSlotSerializer(get_time_slots(), many=True).data
+        for time_slot in time_slots:
+            time_slot['seating_types'] = availability.get(time_slot['id'], [])
+        return Response({"date": day, "time_slots": time_slots})
 
-class TableViewSet(viewsets.ReadOnlyModelViewSet):
+class TableViewSet(CachedCatalogMixin, viewsets.ReadOnlyModelViewSet):
     """
     Public endpoint to list all tables.
     Read-only access for all users.
+
+    Queryset:
+        - Joins the seating type nested by TableSerializer.
+
+    Caching:
+        - Rendered JSON is cached until a Table or SeatingType changes, since the seating
+          type is nested in every row.
     """
-    queryset = Table.objects.all()
+    queryset = Table.objects.select_related('seating_type')
+    cache_models = (Table, SeatingType)
     serializer_class = TableSerializer
     permission_classes = [AllowAny]
 
-class BookingViewSet(viewsets.ModelViewSet):
+class BookingViewSet(ConditionalGetMixin, CursorPaginationMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing bookings.
     - Users can see and manage their own bookings.
     - Staff can see all bookings but should not modify via this API.
+    - Ordered by (-booking_datetime, -id); `?pagination=cursor` pages by keyset instead of
+      page number, without the COUNT(*), so deep pages of the history stay cheap.
+    - List and detail responses carry an ETag and Last-Modified built from updated_at; polls
+      with a matching If-None-Match/If-Modified-Since get 304 without serializing anything.
     """
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_class = BookingFilter 
+    cursor_ordering = ('-booking_datetime', '-id')
 
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
     def calculate_price(self, request):
@@ -260,11 +328,59 @@ class BookingViewSet(viewsets.ModelViewSet):
                 return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def bulk(self, request):
+        """
+        Create up to MAX_BULK_BOOKINGS bookings in one call.
+
+        Request body:
+            {"bookings": [{"number_of_guests": 2, "booking_datetime": "...", "seating_type_id": 1}, ...],
+             "dry_run": false}
+
+        The whole batch is checked against one availability snapshot and saved with a single
+        INSERT (see create_bookings_in_bulk). Returns the number of items that succeeded and
+        one result per item, in request order: the created booking (unsaved on a dry run), or
+        an "errors" entry for items that failed validation or found no free table.
+
+        Admins and managers may set "user_id" on an item to book on a customer's behalf.
+        """
+        serializer = BulkBookingSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['bookings']
+        may_book_for_others = request.user.is_staff or request_is_manager(request)
+
+        results = [None] * len(items)
+        valid_indexes = []
+        valid_items = []
+        for index, item in enumerate(items):
+            item_serializer = BulkBookingItemSerializer(data=item)
+            if not item_serializer.is_valid():
+                results[index] = {'index': index, 'errors': item_serializer.errors}
+            elif item_serializer.validated_data.get('user_id') and not may_book_for_others:
+                results[index] = {'index': index, 'errors': {'user_id': "Only staff can book for other users."}}
+            else:
+                valid_indexes.append(index)
+                valid_items.append(item_serializer.validated_data)
+
+        succeeded = 0
+        bulk_results = create_bookings_in_bulk(
+            valid_items, default_user=request.user, dry_run=serializer.validated_data['dry_run']
+        ) if valid_items else []
+        for index, result in zip(valid_indexes, bulk_results):
+            result['index'] = index
+            if 'booking' in result:
+                result['booking'] = BookingSerializer(result.pop('booking')).data
+                succeeded += 1
+            results[index] = result
+
+        return Response({'succeeded': succeeded, 'results': results})
+
     def get_queryset(self):
         user = self.request.user
         if user.is_staff:
-            return Booking.objects.all().select_related('user', 'occasion', 'table__seating_type').order_by('-booking_datetime')
-        return Booking.objects.filter(user=user).select_related('user', 'occasion', 'table__seating_type').order_by('-booking_datetime')
+            return Booking.objects.all().select_related('user', 'occasion', 'table__seating_type').order_by('-booking_datetime', '-id')
+        # Filter on user_id so a claims-only request user is never loaded.
+        return Booking.objects.filter(user_id=user.pk).select_related('user', 'occasion', 'table__seating_type').order_by('-booking_datetime', '-id')
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -276,20 +392,50 @@ class BookingViewSet(viewsets.ModelViewSet):
         #     raise PermissionDenied("Cannot modify a booking less than 24 hours in advance.")
         serializer.save(user=self.request.user)
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(ConditionalGetMixin, CursorPaginationMixin, viewsets.ModelViewSet):
+    """
+    ViewSet for a user's own payments.
+    - Create and read only; PATCH, PUT and DELETE are disabled.
+    - Unchanged list and detail polls get 304 Not Modified (see ConditionalGetMixin).
+    """
     serializer_class = PaymentSerializer
+    cursor_ordering = ('-created_at', '-id')
     permission_classes = [IsAuthenticated]
     http_method_names = ['get', 'post', 'head', 'options']  # disables PATCH, PUT, DELETE
 
     def get_queryset(self):
         # Users can only see their own payments
-        return Payment.objects.filter(user=self.request.user)
+        return Payment.objects.filter(user_id=self.request.user.pk).order_by('-created_at', '-id')
 
     def perform_create(self, serializer):
         # Automatically assign the logged-in user to the payment
         serializer.save(user=self.request.user)
 
 
+class WaitlistViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet for a user's own waitlist entries.
+    - Create, list, retrieve and leave (DELETE); PATCH and PUT are disabled.
+    - Leaving marks a waiting entry cancelled; entries that were already booked are kept.
+    - When a matching table is released the entry is booked automatically (see bookings/waitlist.py).
+    """
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = [IsAuthenticated]
+    http_method_names = ['get', 'post', 'delete', 'head', 'options']  # disables PATCH, PUT
+
+    def get_queryset(self):
+        return WaitlistEntry.objects.filter(user_id=self.request.user.pk).order_by('-created_at', '-id')
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def perform_destroy(self, instance):
+        if instance.status != WaitlistStatus.WAITING:
+            raise ValidationError("Only waiting entries can be cancelled.")
+        instance.status = WaitlistStatus.CANCELLED
+        instance.save(update_fields=['status', 'updated_at'])
+
+
 @api_view(["POST"])
 def check_availability(request):
     try:
@@ -317,15 +463,57 @@ def check_availability(request):
                 "table_id": available_table.id,
                 "capacity": available_table.capacity,
             })
+
+        combination = find_table_combination(booking_datetime, int(number_of_guests), int(seating_type_id))
+        if combination:
+            # Adjacent tables pushed together; table_id is the largest of them
+            return Response({
+                "available": True,
+                "table_id": combination[0].id,
+                "capacity": sum(table.capacity for table in combination),
+                "table_ids": [table.id for table in combination],
+            })
         else:
             return Response({
                 "available": False,
-                "detail": "No available table for the selected time and criteria."
+                "detail": "No available table for the selected time and criteria.",
+                # The nearest bookable options, so clients do not probe other times one by one
+                "alternatives": suggest_alternatives(booking_datetime, int(number_of_guests), int(seating_type_id)),
             })
 
     except Exception as e:
         return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+@api_view(["GET"])
+def availability_grid(request):
+    """
+    Return the availability matrix for a date range in a single call.
+
+    Query params:
+        - start_date (YYYY-MM-DD): First day of the range. Required.
+        - end_date (YYYY-MM-DD): Last day of the range, inclusive. Defaults to start_date.
+
+    For every day and time slot, each seating type reports its free tables, free seats and the
+    largest party that can still be seated, so the booking calendar does not have to probe
+    check-availability once per cell.
+    """
+    start_date = parse_date(request.query_params.get('start_date') or '')
+    end_param = request.query_params.get('end_date')
+    end_date = parse_date(end_param) if end_param else start_date
+
+    if start_date is None or end_date is None:
+        return Response({"detail": "start_date and end_date must be valid dates (YYYY-MM-DD)."}, status=status.HTTP_400_BAD_REQUEST)
+    if end_date < start_date:
+        return Response({"detail": "end_date cannot be before start_date."}, status=status.HTTP_400_BAD_REQUEST)
+    if (end_date - start_date).days >= MAX_GRID_DAYS:
+        return Response({"detail": f"The date range cannot exceed {MAX_GRID_DAYS} days."}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        "start_date": start_date,
+        "end_date": end_date,
+        "days": build_availability_grid(start_date, end_date),
+    })
+
 @api_view(['POST'])
 def get_total_price(request):
     try:
@@ -344,4 +532,126 @@ def get_total_price(request):
     except SeatingType.DoesNotExist:
         raise ValidationError("Invalid seating type.")
     except Exception as e:
-        raise ValidationError(str(e))
\ No newline at end of file
+        raise ValidationError(str(e))
+
+@api_view(['POST'])
+def get_price_quotes(request):
+    """
+    Price a batch of booking requests in one call.
+
+    Request body:
+        {"quotes": [{"number_of_guests": 2, "booking_datetime": "...", "seating_type_id": 1}, ...]}
+
+    Returns one result per quote, in request order. Items that fail validation or pricing
+    carry an "errors" entry instead of a price; the other items are still priced.
+    """
+    serializer = PriceQuoteSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    results = [None] * len(serializer.validated_data['quotes'])
+    valid_indexes = []
+    valid_quotes = []
+    for index, item in enumerate(serializer.validated_data['quotes']):
+        item_serializer = PriceQuoteItemSerializer(data=item)
+        if item_serializer.is_valid():
+            valid_indexes.append(index)
+            valid_quotes.append(item_serializer.validated_data)
+        else:
+            results[index] = {'index': index, 'errors': item_serializer.errors}
+
+    for index, result in zip(valid_indexes, quote_booking_prices(valid_quotes)):
+        result['index'] = index
+        results[index] = result
+
+    return Response({'results': results})
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser | IsManager])
+def export_data(request, dataset):
+    """
+    Stream every booking or payment as CSV or NDJSON.
+
+    URL:
+        - dataset: 'bookings' or 'payments'.
+
+    Query params:
+        - file_format: 'csv' (default) or 'ndjson'. ('format' is reserved by DRF for renderer selection.)
+        - start_date (YYYY-MM-DD): Only rows on or after this day (booking date for bookings,
+          creation date for payments).
+        - end_date (YYYY-MM-DD): Only rows on or before this day.
+
+    The response is written from a generator over values() rows read in chunks,
+    so memory use stays flat however many rows are exported.
+    """
+    if dataset not in EXPORT_DATASETS:
+        return Response({"detail": f"Unknown dataset. Choose from: {', '.join(EXPORT_DATASETS)}."}, status=status.HTTP_404_NOT_FOUND)
+
+    file_format = request.query_params.get('file_format', 'csv')
+    if file_format not in EXPORT_FORMATS:
+        return Response({"detail": f"file_format must be one of: {', '.join(EXPORT_FORMATS)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+    dates = {}
+    for param in ('start_date', 'end_date'):
+        value = request.query_params.get(param)
+        if value:
+            dates[param] = parse_date(value)
+            if dates[param] is None:
+                return Response({"detail": f"{param} must be a valid date (YYYY-MM-DD)."}, status=status.HTTP_400_BAD_REQUEST)
+
+    response = StreamingHttpResponse(
+        iter_export(dataset, file_format, **dates),
+        content_type=EXPORT_FORMATS[file_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{dataset}.{file_format}"'
+    return response
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser | IsManager])
+def daily_report(request):
+    """
+    Covers, revenue and table utilisation per day, time slot and seating type.
+
+    Query params:
+        - start_date (YYYY-MM-DD): First day of the range. Required.
+        - end_date (YYYY-MM-DD): Last day of the range, inclusive. Defaults to start_date.
+
+    Served from the DailyBookingSummary rollup, so the response time depends on the range,
+    not on how many bookings exist. The rollup is refreshed by the task worker a few seconds
+    after bookings or payments change.
+    """
+    start_date = parse_date(request.query_params.get('start_date') or '')
+    end_param = request.query_params.get('end_date')
+    end_date = parse_date(end_param) if end_param else start_date
+
+    if start_date is None or end_date is None:
+        return Response({"detail": "start_date and end_date must be valid dates (YYYY-MM-DD)."}, status=status.HTTP_400_BAD_REQUEST)
+    if end_date < start_date:
+        return Response({"detail": "end_date cannot be before start_date."}, status=status.HTTP_400_BAD_REQUEST)
+    if (end_date - start_date).days >= MAX_REPORT_DAYS:
+        return Response({"detail": f"The date range cannot exceed {MAX_REPORT_DAYS} days."}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        "start_date": start_date,
+        "end_date": end_date,
+        "days": build_daily_report(start_date, end_date),
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser | IsManager])
+def performance_stats(request):
+    """
+    Per-route request statistics collected by PerformanceMiddleware in this worker process.
+
+    Query params:
+        - output: 'prometheus' (default, text exposition format) or 'json'.
+
+    Reports request counts and duration histograms, database and serializer time, query
+    counts and repeated queries for each route name. Empty unless
+    PERFORMANCE_INSTRUMENTATION is enabled.
+    """
+    output = request.query_params.get('output', 'prometheus')
+    if output == 'json':
+        return Response(performance_registry.as_json())
+    if output != 'prometheus':
+        return Response({"detail": "output must be 'prometheus' or 'json'."}, status=status.HTTP_400_BAD_REQUEST)
+    return HttpResponse(performance_registry.as_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
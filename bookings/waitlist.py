@@ -0,0 +1,117 @@
+# bookings/waitlist.py
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .availability import DEFAULT_BOOKING_DURATION, TableIntervals, held_table_intervals
+from .models import Booking, Table, TimeSlot, WaitlistEntry, WaitlistStatus
+from .pricing import calculate_booking_price
+from .slots import time_slot_cache
+from .taskqueue import enqueue, enqueue_many
+import logging
+logger = logging.getLogger(__name__)
+
+# Most waiting entries considered for one released table, oldest first. Bounds the matcher's
+# work however long the waitlist of a busy night grows.
+WAITLIST_MATCH_LIMIT = getattr(settings, 'WAITLIST_MATCH_LIMIT', 50)
+
+
+def queue_waitlist_match(releases):
+    """
+    Queue a match_waitlist task for every released (table_id, start, end) interval still in the future.
+
+    Called in the transaction that released the tables, so the tasks commit or roll back with it.
+    """
+    now = timezone.now()
+    payloads = [
+        {'table_id': table_id, 'start': start.isoformat(), 'end': end.isoformat()}
+        for table_id, start, end in releases
+        if table_id and start and end and end > now
+    ]
+    if payloads:
+        enqueue_many('match_waitlist', payloads)
+
+
+def match_waitlist(table_id, start, end, now=None):
+    """
+    Book waiting parties onto a table released for [start, end).
+
+    Args:
+        table_id (int): The table whose booking was cancelled, expired or deleted.
+        start (datetime): Start of the released booking.
+        end (datetime): End of the released booking.
+        now (datetime, optional): Entries starting before this are skipped. Defaults to timezone.now().
+
+    Returns:
+        list[WaitlistEntry]: The entries that were booked, in order of arrival.
+
+    Behavior:
+    - Reads at most WAITLIST_MATCH_LIMIT waiting entries of the table's seating type that fit
+      its capacity and would overlap the released interval, oldest first. The
+      (status, seating_type, booking_datetime) index narrows the query to that window, so
+      its cost does not depend on the size of the waitlist.
+    - Locks the table row and loads its bookings around the candidates, then books every
+      candidate the table is still free for, first come first served. Each promoted booking
+      is added to the snapshot, so later candidates cannot overlap it.
+    - Promoted bookings are created PENDING and unpaid, and the party is emailed. If they do
+      not pay within the booking sweeper's payment hold the booking expires, which releases
+      the table to the next party in line.
+    """
+    now = now or timezone.now()
+    table = Table.objects.select_related('seating_type').filter(
+        pk=table_id, is_active=True, seating_type__is_active=True
+    ).first()
+    if table is None:
+        return []
+
+    slot_table = time_slot_cache.get_table()
+    longest = max([slot.booking_duration for slot in slot_table.slots if slot.booking_duration] + [DEFAULT_BOOKING_DURATION])
+    candidates = list(
+        WaitlistEntry.objects.filter(
+            status=WaitlistStatus.WAITING,
+            seating_type_id=table.seating_type_id,
+            booking_datetime__gt=max(start - longest, now),
+            booking_datetime__lt=end,
+            number_of_guests__lte=table.capacity,
+        ).order_by('created_at', 'id')[:WAITLIST_MATCH_LIMIT]
+    )
+    if not candidates:
+        return []
+
+    windows = {entry.pk: TimeSlot.get_booking_duration(entry.booking_datetime, slot_table) for entry in candidates}
+    promoted = []
+    with transaction.atomic():
+        Table.objects.select_for_update().only('id').get(pk=table.pk)
+        intervals = TableIntervals()
+        for booking_id, _, booked_start, booked_end in held_table_intervals(
+            min(entry.booking_datetime for entry in candidates),
+            max(entry.booking_datetime + windows[entry.pk] for entry in candidates),
+            table_ids=[table.pk],
+        ):
+            intervals.add(booking_id, booked_start, booked_end)
+
+        for entry in candidates:
+            entry_start = entry.booking_datetime
+            entry_end = entry_start + windows[entry.pk]
+            matches = slot_table.lookup(entry_start.time(), limit=2)
+            if len(matches) != 1 or not intervals.is_free(entry_start, entry_end):
+                continue
+
+            booking = Booking.objects.create(
+                user_id=entry.user_id,
+                number_of_guests=entry.number_of_guests,
+                booking_datetime=entry_start,
+                table=table,
+                occasion_id=entry.occasion_id,
+                special_request=entry.special_request,
+                base_price_per_guest=matches[0].base_price_per_guest,
+                total_price=calculate_booking_price(entry.number_of_guests, entry_start, table.seating_type),
+            )
+            intervals.add(booking.pk, entry_start, entry_end)
+            entry.status = WaitlistStatus.BOOKED
+            entry.booking = booking
+            entry.save(update_fields=['status', 'booking', 'updated_at'])
+            enqueue('send_booking_status_email', booking_id=booking.pk)
+            promoted.append(entry)
+
+    logger.info(f"Waitlist match for table {table.pk}: {len(promoted)} of {len(candidates)} candidates booked")
+    return promoted
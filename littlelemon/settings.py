@@ -50,6 +50,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'bookings.instrumentation.PerformanceMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -102,13 +103,34 @@ DATABASES = {
     }
 }
 
+# Cache
+# The time slot configuration version lives here, so point this at a shared backend
+# (e.g. django.core.cache.backends.redis.RedisCache) when running several workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    },
+    # Rendered responses of the public catalog endpoints (occasions, seating types, time slots, tables).
+    'catalog': {
+        'BACKEND': config('CATALOG_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CATALOG_CACHE_LOCATION', default='catalog'),
+    },
+}
+
+# Seconds a rendered catalog response stays cached; model changes invalidate it sooner.
+CATALOG_CACHE_TIMEOUT = 60 * 60
+
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': (
         'rest_framework.renderers.JSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # bookings.authentication.StatelessJWTAuthentication skips the per-request user query
+        # by trusting the token's role claims.
+        config('JWT_AUTHENTICATION_CLASS', default='rest_framework_simplejwt.authentication.JWTAuthentication'),
 
     ),
     'DEFAULT_PERMISSION_CLASSES': (
@@ -145,6 +167,7 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,           # optionally rotate refresh tokens on use
     'BLACKLIST_AFTER_ROTATION': True,        # if using token blacklist
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_OBTAIN_SERIALIZER': 'bookings.serializers.MyTokenObtainPairSerializer',  # adds email/username/is_manager claims
 }
 
 EMAIL_BACKEND = config('EMAIL_BACKEND')
@@ -155,8 +178,31 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL')
 
+# Payment verification runs in the background task worker (python manage.py run_tasks).
+# Without a gateway, payments stay unverified until staff confirm them in the admin. The fake
+# gateway reports FAKE_PAYMENT_GATEWAY_RESULT for every payment; set
+# PAYMENT_GATEWAY=bookings.gateways.FakePaymentGateway together with
+# EMAIL_BACKEND=django.core.mail.backends.console.EmailBackend to run everything locally.
+PAYMENT_GATEWAY = config('PAYMENT_GATEWAY', default='')
+FAKE_PAYMENT_GATEWAY_RESULT = config('FAKE_PAYMENT_GATEWAY_RESULT', default='succeeded')
+STRIPE_API_KEY = config('STRIPE_API_KEY', default='')
+
 AUTH_USER_MODEL = 'bookings.CustomUser'
 
+# Per-request timing and query statistics (bookings/instrumentation.py), served at
+# /api/admin/performance/. Off by default; the middleware removes itself when disabled.
+PERFORMANCE_INSTRUMENTATION = config('PERFORMANCE_INSTRUMENTATION', default=False, cast=bool)
+SLOW_REQUEST_THRESHOLD_MS = config('SLOW_REQUEST_THRESHOLD_MS', default=500, cast=int)
+SLOW_REQUEST_SAMPLE_RATE = config('SLOW_REQUEST_SAMPLE_RATE', default=1.0, cast=float)
+
+# How long a booking holds its table when its time slot does not set a booking_duration
+BOOKING_DURATION = timedelta(hours=2)
+
+# Used by the sweep_bookings command: unpaid pending bookings expire this long after they
+# were made, and confirmed bookings become no-shows this long after their start time.
+BOOKING_PAYMENT_HOLD = timedelta(hours=1)
+NO_SHOW_GRACE = timedelta(minutes=30)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 